@@ -0,0 +1,13 @@
+// Generated by scripts/facet_bitmaps.py - do not edit.
+export const facetLoaders = {
+  hsk1: () => require('./hsk1.json'),
+  hsk2: () => require('./hsk2.json'),
+  kanji1: () => require('./kanji1.json'),
+  kanji2: () => require('./kanji2.json'),
+  sentences: () => require('./sentences.json'),
+  tocfl1: () => require('./tocfl1.json'),
+  tocfl2: () => require('./tocfl2.json'),
+  tocfl3: () => require('./tocfl3.json'),
+  tocfl4: () => require('./tocfl4.json'),
+  tocfl5: () => require('./tocfl5.json'),
+};
@@ -0,0 +1,352 @@
+// Vocabulary data shared by all screens.
+// Datasets are split into small columnar shards (generated from the JSON files in
+// this folder by scripts/data_shards.py). A shard is only loaded and decoded the
+// first time a screen needs it, and the manifest's facets let a filter skip shards
+// it cannot match. HSK and TOCFL shards point into a shared lexicon of unique words.
+// Search uses the prebuilt indexes from scripts/search_index.py, filters the facet
+// bitmaps from scripts/facet_bitmaps.py, example sentences scripts/sentence_xref.py.
+import { manifest, shardLoaders } from './shards';
+import { searchIndexLoaders } from './search';
+import { facetLoaders } from './facets';
+import { sentenceXrefLoader } from './xref';
+
+// Must match COLUMNAR_SCHEMA_VERSION in scripts/columnar_format.py
+export const COLUMNAR_SCHEMA_VERSION = 1;
+
+const decodeColumn = (column, count) => {
+  if (Array.isArray(column)) {
+    return column;
+  }
+  if (column.start !== undefined) {
+    // Consecutive integers (ids)
+    return Array.from({ length: count }, (_, i) => column.start + i);
+  }
+  // Interned strings
+  return column.index.map((i) => column.strings[i]);
+};
+
+// Turn { fields, columns } back into the list of entry objects
+export const decodeColumnar = (data) => {
+  if (data.format !== 'columnar' || data.version !== COLUMNAR_SCHEMA_VERSION) {
+    throw new Error(
+      `Unsupported data file (format ${data.format}, version ${data.version}); ` +
+        `expected columnar version ${COLUMNAR_SCHEMA_VERSION}`
+    );
+  }
+  const { count, fields } = data;
+  const columns = data.columns.map((column) => decodeColumn(column, count));
+  const entries = new Array(count);
+  for (let row = 0; row < count; row++) {
+    const entry = {};
+    for (let f = 0; f < fields.length; f++) {
+      entry[fields[f]] = columns[f][row];
+    }
+    entries[row] = entry;
+  }
+  return entries;
+};
+
+const shardCache = new Map();
+const datasetCache = new Map();
+
+// HSK/TOCFL words are stored once in the lexicon shards (scripts/build_lexicon.py)
+const lexiconRecord = (lexiconId) => {
+  const shardSize = manifest.shardSize;
+  const shard = manifest.lexicon.shards[Math.floor(lexiconId / shardSize)];
+  return loadShard(shard.id)[lexiconId - shard.start];
+};
+
+// A vocabulary shard only holds lexicon ids plus the fields that differ
+const expandLexiconIds = (data) =>
+  data.ids.map((lexiconId, i) => ({
+    id: data.start + i + 1,
+    ...lexiconRecord(lexiconId),
+    ...data.overrides[i],
+  }));
+
+export const loadShard = (id) => {
+  if (!shardCache.has(id)) {
+    const data = shardLoaders[id]();
+    shardCache.set(id, data.format === 'lexicon-ids' ? expandLexiconIds(data) : decodeColumnar(data));
+  }
+  return shardCache.get(id);
+};
+
+const shardMatches = (shard, filter) =>
+  Object.entries(filter).every(([facet, wanted]) => {
+    if (facet === 'characterCount') {
+      // 'single' or 'multi'
+      const counts = Object.keys(shard.facets.characterCount || {}).map(Number);
+      return wanted === 'single' ? counts.includes(1) : counts.some((count) => count > 1);
+    }
+    const values = shard.facets[facet];
+    return !values || values.some((value) => wanted.includes(value));
+  });
+
+// Shards of a dataset that may contain entries matching the filter,
+// e.g. selectShards('sentences', { tocfl_level: ['1'] })
+export const selectShards = (dataset, filter = {}) => {
+  const info = manifest.datasets[dataset];
+  if (!info) {
+    return [];
+  }
+  return info.shards.filter((shard) => shardMatches(shard, filter));
+};
+
+// Entries of the matching shards, in dataset order. Shards are whole, so callers
+// still apply their own filters to the entries.
+export const loadEntries = (dataset, filter = {}) =>
+  selectShards(dataset, filter).flatMap((shard) => loadShard(shard.id));
+
+// Every entry of a dataset (hsk1, hsk2, tocfl1, kanji1, kanji2, sentences, ...)
+export const loadDataset = (dataset) => {
+  if (!datasetCache.has(dataset)) {
+    datasetCache.set(dataset, loadEntries(dataset));
+  }
+  return datasetCache.get(dataset);
+};
+
+// --- Search ---
+
+// Must match SEARCH_INDEX_VERSION and CJK_START in scripts/search_index.py
+export const SEARCH_INDEX_VERSION = 1;
+const CJK_START = 0x2e80;
+
+const searchIndexCache = new Map();
+
+const loadSearchIndex = (dataset) => {
+  if (!searchIndexCache.has(dataset)) {
+    const index = searchIndexLoaders[dataset] ? searchIndexLoaders[dataset]() : null;
+    if (index && index.version !== SEARCH_INDEX_VERSION) {
+      throw new Error(`Unsupported search index version ${index.version} for ${dataset}`);
+    }
+    searchIndexCache.set(dataset, index && { ...index, decoded: new Map() });
+  }
+  return searchIndexCache.get(dataset);
+};
+
+// Same as fold_char in scripts/search_index.py, for characters the table lacks
+const foldChar = (char) => {
+  if (char === 'đ') return 'd';
+  return char.normalize('NFD').replace(/\p{M}/gu, '') || char;
+};
+
+// Lowercase and remove diacritics with the index's fold table
+const foldText = (text, fold) => {
+  let folded = '';
+  for (const char of String(text).toLowerCase()) {
+    folded += fold[char] ?? (char < '\u0080' ? char : foldChar(char));
+  }
+  return folded;
+};
+
+// Bigrams plus single CJK characters (by code point, like the Python side)
+const textGrams = (folded) => {
+  const chars = Array.from(folded);
+  const grams = new Set();
+  for (let i = 0; i < chars.length - 1; i++) {
+    grams.add(chars[i] + chars[i + 1]);
+  }
+  chars.forEach((char) => {
+    if (char.codePointAt(0) >= CJK_START) {
+      grams.add(char);
+    }
+  });
+  return grams;
+};
+
+const gramPositions = (index, gram) => {
+  if (!index.decoded.has(gram)) {
+    // Postings are delta-encoded
+    const positions = [];
+    let total = 0;
+    (index.postings[gram] || []).forEach((delta) => {
+      total += delta;
+      positions.push(total);
+    });
+    index.decoded.set(gram, positions);
+  }
+  return index.decoded.get(gram);
+};
+
+const sortedIncludes = (list, value) => {
+  let low = 0;
+  let high = list.length - 1;
+  while (low <= high) {
+    const middle = (low + high) >> 1;
+    if (list[middle] === value) {
+      return true;
+    }
+    if (list[middle] < value) {
+      low = middle + 1;
+    } else {
+      high = middle - 1;
+    }
+  }
+  return false;
+};
+
+// Positions (indexes into loadDataset(dataset)) of the entries with a field
+// containing the query, ignoring case and diacritics
+export const searchDataset = (dataset, query) => {
+  const index = loadSearchIndex(dataset);
+  const entries = loadDataset(dataset);
+  const folded = index ? foldText(query.trim(), index.fold) : '';
+  if (!index || !folded) {
+    return new Set(entries.keys());
+  }
+  const matches = (position) =>
+    index.fields.some((field) => foldText(entries[position][field] ?? '', index.fold).includes(folded));
+
+  const grams = textGrams(folded);
+  if (grams.size === 0) {
+    // A single Latin letter matches most entries anyway: scan
+    return new Set([...entries.keys()].filter(matches));
+  }
+  // Start from the rarest gram and binary-search the others
+  const lists = [...grams].map((gram) => gramPositions(index, gram)).sort((a, b) => a.length - b.length);
+  let candidates = lists[0];
+  for (let i = 1; i < lists.length && candidates.length > 0; i++) {
+    candidates = candidates.filter((position) => sortedIncludes(lists[i], position));
+  }
+  if (Array.from(folded).length <= 2) {
+    // The postings are exact for a single bigram or character
+    return new Set(candidates);
+  }
+  return new Set(candidates.filter(matches));
+};
+
+// --- Facet bitmaps ---
+// One bitset per facet and dataset (scripts/facet_bitmaps.py): bit i is set when
+// entry i of loadDataset(dataset) has the facet, e.g. 'single', 'multi',
+// 'characterCount:2', 'has:hanviet', 'tocfl_level:1'. In memory a bitset is a
+// Uint32Array (bit i is bit i % 32 of word i / 32), so filters combine 32 entries
+// per operation; the little-endian bytes of the files map onto it directly.
+
+// Must match FACETS_VERSION in scripts/facet_bitmaps.py
+export const FACETS_VERSION = 1;
+
+const BASE64_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/';
+const BASE64_VALUES = new Map(Array.from(BASE64_ALPHABET, (char, value) => [char, value]));
+
+// Decoded bytes, zero-padded to whole 32-bit words
+const decodeBase64 = (text) => {
+  const clean = text.replace(/=+$/, '');
+  const length = Math.floor((clean.length * 3) / 4);
+  const bytes = new Uint8Array((length + 3) & ~3);
+  let buffer = 0;
+  let bits = 0;
+  let offset = 0;
+  for (const char of clean) {
+    buffer = (buffer << 6) | BASE64_VALUES.get(char);
+    bits += 6;
+    if (bits >= 8) {
+      bits -= 8;
+      bytes[offset++] = (buffer >> bits) & 0xff;
+    }
+  }
+  return bytes;
+};
+
+const facetCache = new Map();
+
+const wordCount = (count) => (count + 31) >> 5;
+
+// Bitset (Uint32Array) of a facet; all zeros when no entry has it
+export const loadFacet = (dataset, facet) => {
+  const key = `${dataset}/${facet}`;
+  if (!facetCache.has(key)) {
+    const document = facetLoaders[dataset]();
+    if (document.version !== FACETS_VERSION) {
+      throw new Error(`Unsupported facet file version ${document.version} for ${dataset}`);
+    }
+    const encoded = document.facets[facet];
+    facetCache.set(
+      key,
+      encoded ? new Uint32Array(decodeBase64(encoded).buffer) : new Uint32Array(wordCount(document.count))
+    );
+  }
+  return facetCache.get(key);
+};
+
+export const bitsHas = (bits, position) => ((bits[position >> 5] >>> (position & 31)) & 1) !== 0;
+
+// Bitset of `count` entries with every bit set
+export const fullBits = (count) => {
+  const bits = new Uint32Array(wordCount(count)).fill(0xffffffff);
+  if (count & 31) {
+    bits[bits.length - 1] = (1 << (count & 31)) - 1;
+  }
+  return bits;
+};
+
+// Bitset of `count` entries with the given positions set
+export const bitsFromPositions = (count, positions) => {
+  const bits = new Uint32Array(wordCount(count));
+  for (const position of positions) {
+    bits[position >> 5] |= 1 << (position & 31);
+  }
+  return bits;
+};
+
+export const andBits = (...bitsets) =>
+  bitsets.reduce((result, bits) => result.map((word, i) => word & bits[i]));
+
+export const orBits = (...bitsets) =>
+  bitsets.reduce((result, bits) => result.map((word, i) => word | bits[i]));
+
+// Entries in bits but not in excluded
+export const andNotBits = (bits, excluded) => bits.map((word, i) => word & ~excluded[i]);
+
+// Positions set in a bitset, ascending
+export const bitsPositions = (bits) => {
+  const positions = [];
+  bits.forEach((word, i) => {
+    while (word !== 0) {
+      const lowest = word & -word;
+      positions.push(i * 32 + 31 - Math.clz32(lowest));
+      word ^= lowest;
+    }
+  });
+  return positions;
+};
+
+// Entries of a dataset having every listed facet
+export const entriesWithFacets = (dataset, facets) => {
+  const entries = loadDataset(dataset);
+  return bitsPositions(andBits(...facets.map((facet) => loadFacet(dataset, facet)))).map(
+    (position) => entries[position]
+  );
+};
+
+// --- Example sentences ---
+// Cross-reference from scripts/sentence_xref.py: for each headword (simplifiedChinese
+// of an HSK/TOCFL entry), the positions of the sentences containing it, easiest first.
+
+// Must match XREF_VERSION in scripts/sentence_xref.py
+export const XREF_VERSION = 1;
+
+let sentenceXref = null;
+
+const loadSentenceXref = () => {
+  if (!sentenceXref) {
+    sentenceXref = sentenceXrefLoader();
+    if (sentenceXref.version !== XREF_VERSION) {
+      throw new Error(`Unsupported sentence cross-reference version ${sentenceXref.version}`);
+    }
+  }
+  return sentenceXref;
+};
+
+// Sentences of loadDataset('sentences') using a word, ranked by level and length
+export const exampleSentences = (word, limit = 5) => {
+  const info = loadSentenceXref().words[word];
+  if (!info) {
+    return [];
+  }
+  const sentences = loadDataset('sentences');
+  return info.sentences.slice(0, limit).map((position) => sentences[position]);
+};
+
+// How often a word occurs in the app's sentences
+export const wordFrequency = (word) => loadSentenceXref().words[word]?.frequency ?? 0;
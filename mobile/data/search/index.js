@@ -0,0 +1,14 @@
+// Generated by scripts/search_index.py - do not edit.
+// Each index is only evaluated the first time its loader is called.
+export const searchIndexLoaders = {
+  hsk1: () => require('./hsk1.json'),
+  hsk2: () => require('./hsk2.json'),
+  kanji1: () => require('./kanji1.json'),
+  kanji2: () => require('./kanji2.json'),
+  sentences: () => require('./sentences.json'),
+  tocfl1: () => require('./tocfl1.json'),
+  tocfl2: () => require('./tocfl2.json'),
+  tocfl3: () => require('./tocfl3.json'),
+  tocfl4: () => require('./tocfl4.json'),
+  tocfl5: () => require('./tocfl5.json'),
+};
@@ -0,0 +1,83 @@
+// Generated by scripts/data_shards.py - do not edit.
+// Each shard is only evaluated the first time its loader is called.
+import manifest from './manifest.json';
+
+export { manifest };
+
+export const shardLoaders = {
+  'lexicon-000': () => require('./lexicon-000.json'),
+  'lexicon-001': () => require('./lexicon-001.json'),
+  'lexicon-002': () => require('./lexicon-002.json'),
+  'lexicon-003': () => require('./lexicon-003.json'),
+  'lexicon-004': () => require('./lexicon-004.json'),
+  'lexicon-005': () => require('./lexicon-005.json'),
+  'lexicon-006': () => require('./lexicon-006.json'),
+  'lexicon-007': () => require('./lexicon-007.json'),
+  'lexicon-008': () => require('./lexicon-008.json'),
+  'lexicon-009': () => require('./lexicon-009.json'),
+  'lexicon-010': () => require('./lexicon-010.json'),
+  'lexicon-011': () => require('./lexicon-011.json'),
+  'lexicon-012': () => require('./lexicon-012.json'),
+  'lexicon-013': () => require('./lexicon-013.json'),
+  'lexicon-014': () => require('./lexicon-014.json'),
+  'lexicon-015': () => require('./lexicon-015.json'),
+  'lexicon-016': () => require('./lexicon-016.json'),
+  'lexicon-017': () => require('./lexicon-017.json'),
+  'lexicon-018': () => require('./lexicon-018.json'),
+  'lexicon-019': () => require('./lexicon-019.json'),
+  'lexicon-020': () => require('./lexicon-020.json'),
+  'lexicon-021': () => require('./lexicon-021.json'),
+  'lexicon-022': () => require('./lexicon-022.json'),
+  'lexicon-023': () => require('./lexicon-023.json'),
+  'lexicon-024': () => require('./lexicon-024.json'),
+  'lexicon-025': () => require('./lexicon-025.json'),
+  'lexicon-026': () => require('./lexicon-026.json'),
+  'lexicon-027': () => require('./lexicon-027.json'),
+  'lexicon-028': () => require('./lexicon-028.json'),
+  'lexicon-029': () => require('./lexicon-029.json'),
+  'lexicon-030': () => require('./lexicon-030.json'),
+  'lexicon-031': () => require('./lexicon-031.json'),
+  'lexicon-032': () => require('./lexicon-032.json'),
+  'hsk1-000': () => require('./hsk1-000.json'),
+  'hsk1-001': () => require('./hsk1-001.json'),
+  'hsk2-000': () => require('./hsk2-000.json'),
+  'hsk2-001': () => require('./hsk2-001.json'),
+  'hsk2-002': () => require('./hsk2-002.json'),
+  'hsk2-003': () => require('./hsk2-003.json'),
+  'kanji1-000': () => require('./kanji1-000.json'),
+  'kanji2-000': () => require('./kanji2-000.json'),
+  'sentences-000': () => require('./sentences-000.json'),
+  'tocfl1-000': () => require('./tocfl1-000.json'),
+  'tocfl1-001': () => require('./tocfl1-001.json'),
+  'tocfl2-000': () => require('./tocfl2-000.json'),
+  'tocfl2-001': () => require('./tocfl2-001.json'),
+  'tocfl3-000': () => require('./tocfl3-000.json'),
+  'tocfl3-001': () => require('./tocfl3-001.json'),
+  'tocfl3-002': () => require('./tocfl3-002.json'),
+  'tocfl3-003': () => require('./tocfl3-003.json'),
+  'tocfl3-004': () => require('./tocfl3-004.json'),
+  'tocfl3-005': () => require('./tocfl3-005.json'),
+  'tocfl3-006': () => require('./tocfl3-006.json'),
+  'tocfl4-000': () => require('./tocfl4-000.json'),
+  'tocfl4-001': () => require('./tocfl4-001.json'),
+  'tocfl4-002': () => require('./tocfl4-002.json'),
+  'tocfl4-003': () => require('./tocfl4-003.json'),
+  'tocfl4-004': () => require('./tocfl4-004.json'),
+  'tocfl4-005': () => require('./tocfl4-005.json'),
+  'tocfl4-006': () => require('./tocfl4-006.json'),
+  'tocfl4-007': () => require('./tocfl4-007.json'),
+  'tocfl4-008': () => require('./tocfl4-008.json'),
+  'tocfl4-009': () => require('./tocfl4-009.json'),
+  'tocfl5-000': () => require('./tocfl5-000.json'),
+  'tocfl5-001': () => require('./tocfl5-001.json'),
+  'tocfl5-002': () => require('./tocfl5-002.json'),
+  'tocfl5-003': () => require('./tocfl5-003.json'),
+  'tocfl5-004': () => require('./tocfl5-004.json'),
+  'tocfl5-005': () => require('./tocfl5-005.json'),
+  'tocfl5-006': () => require('./tocfl5-006.json'),
+  'tocfl5-007': () => require('./tocfl5-007.json'),
+  'tocfl5-008': () => require('./tocfl5-008.json'),
+  'tocfl5-009': () => require('./tocfl5-009.json'),
+  'tocfl5-010': () => require('./tocfl5-010.json'),
+  'tocfl5-011': () => require('./tocfl5-011.json'),
+};
@@ -0,0 +1,2 @@
+// Generated by scripts/sentence_xref.py - do not edit.
+export const sentenceXrefLoader = () => require('./sentences.json');
@@ -1,12 +1,7 @@
 import React, { useState, useMemo, useEffect, useRef, useCallback } from 'react';
 import { View, Text, TouchableOpacity, StyleSheet, FlatList, TextInput, KeyboardAvoidingView, Platform } from 'react-native';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import hskLevel1Data from '../data/hsk_level1.json';
-import hskLevel2Data from '../data/hsk_level2.json';
-import tocflData from '../data/tocfl_level1.json';
-import kanjiGrade1Data from '../data/kanji_grade1.json';
-import kanjiGrade2Data from '../data/kanji_grade2.json';
-import sentencesData from '../data/sentances.json';
+import { andBits, andNotBits, bitsFromPositions, bitsPositions, fullBits, loadDataset, loadFacet, searchDataset } from '../data';
 import { useSettings } from '../context/SettingsContext';
 
 const HSK_DISABLED_STORAGE_KEY = '@kanji_viet_hsk_disabled';
@@ -14,6 +9,14 @@ const TOCFL_DISABLED_STORAGE_KEY = '@kanji_viet_tocfl_disabled';
 const KANJI_DISABLED_STORAGE_KEY = '@kanji_viet_kanji_disabled';
 const SENTENCES_DISABLED_STORAGE_KEY = '@kanji_viet_sentences_disabled';
 
+// Dataset of an item, for the prebuilt search index and facet bitmaps
+const DATASET_OF = {
+    hsk: item => `hsk${item.level}`,
+    tocfl: () => 'tocfl1',
+    kanji: item => `kanji${item.level}`,
+    sentences: () => 'sentences',
+};
+
 export default function CharacterListScreen() {
     const { settings } = useSettings();
     const [selectedType, setSelectedType] = useState('hsk'); // 'hsk', 'tocfl', 'kanji', 'sentences'
@@ -27,30 +30,47 @@ export default function CharacterListScreen() {
     const [disabledKanji, setDisabledKanji] = useState(new Set());
     const [disabledSentences, setDisabledSentences] = useState(new Set());
 
+    // Datasets are loaded the first time their type (and level) is selected
+
     // Combine HSK level 1 and 2 data
     const hskData = useMemo(() => {
-        const level1 = (hskLevel1Data || []).map(word => ({ ...word, level: 1 }));
-        const level2 = (hskLevel2Data || []).map(word => ({ ...word, level: 2 }));
+        if (selectedType !== 'hsk') {
+            return [];
+        }
+        const level1 = selectedLevels.includes(1) ? loadDataset('hsk1').map((word, datasetIndex) => ({ ...word, level: 1, datasetIndex })) : [];
+        const level2 = selectedLevels.includes(2) ? loadDataset('hsk2').map((word, datasetIndex) => ({ ...word, level: 2, datasetIndex })) : [];
         return [...level1, ...level2];
-    }, []);
+    }, [selectedType, selectedLevels]);
+
+    // datasetIndex is the entry's position in its dataset, used to match search results
+    const tocflData = useMemo(() => (
+        selectedType === 'tocfl' ? loadDataset('tocfl1').map((word, datasetIndex) => ({ ...word, datasetIndex })) : []
+    ), [selectedType]);
+
+    const sentencesData = useMemo(() => (
+        selectedType === 'sentences' ? loadDataset('sentences').map((sentence, datasetIndex) => ({ ...sentence, datasetIndex })) : []
+    ), [selectedType]);
 
     // Flatten Kanji data by grade (grade 1 and 2)
     const allKanji = useMemo(() => {
         const flattened = [];
+        if (selectedType !== 'kanji') {
+            return flattened;
+        }
         // Add grade 1 kanji with level property
-        if (kanjiGrade1Data) {
-            kanjiGrade1Data.forEach(kanji => {
-                flattened.push({ ...kanji, level: 1 });
+        if (selectedLevels.includes(1)) {
+            loadDataset('kanji1').forEach((kanji, datasetIndex) => {
+                flattened.push({ ...kanji, level: 1, datasetIndex });
             });
         }
         // Add grade 2 kanji with level property
-        if (kanjiGrade2Data) {
-            kanjiGrade2Data.forEach(kanji => {
-                flattened.push({ ...kanji, level: 2 });
+        if (selectedLevels.includes(2)) {
+            loadDataset('kanji2').forEach((kanji, datasetIndex) => {
+                flattened.push({ ...kanji, level: 2, datasetIndex });
             });
         }
         return flattened;
-    }, []);
+    }, [selectedType, selectedLevels]);
 
     // Load disabled items from AsyncStorage on mount
     useEffect(() => {
@@ -117,7 +137,7 @@ export default function CharacterListScreen() {
 
     // Create a map for sentence indices to avoid O(n²) lookup (only create once)
     const sentenceIndexMapRef = useRef(null);
-    if (!sentenceIndexMapRef.current && sentencesData) {
+    if (!sentenceIndexMapRef.current && sentencesData.length > 0) {
         const map = new Map();
         sentencesData.forEach((sentence, index) => {
             const key = `${sentence.simplified}|${sentence.traditional}`;
@@ -126,7 +146,59 @@ export default function CharacterListScreen() {
         sentenceIndexMapRef.current = map;
     }
 
-    // Get filtered data based on selected type, levels, and search query
+    // Items of the selected type per dataset, in dataset order: items[i] is entry i of
+    // the dataset, so facet bitmaps and search results address them directly
+    const datasetGroups = useMemo(() => {
+        const data = { hsk: hskData, tocfl: tocflData, kanji: allKanji, sentences: sentencesData }[selectedType] || [];
+        const datasetOf = DATASET_OF[selectedType];
+        const groups = new Map();
+        data.forEach(item => {
+            const dataset = datasetOf(item);
+            if (!groups.has(dataset)) {
+                groups.set(dataset, []);
+            }
+            groups.get(dataset)[item.datasetIndex] = item;
+        });
+        return groups;
+    }, [selectedType, hskData, tocflData, allKanji, sentencesData]);
+
+    // Disabled-set key -> [[dataset, position], ...] of the items, built once per loaded data
+    const keyPositions = useMemo(() => {
+        const keyOf = {
+            hsk: item => `${item.level}-${item.id}`,
+            tocfl: item => item.id,
+            kanji: item => item.kanji,
+            sentences: item => `sentence-${sentenceIndexMapRef.current?.get(`${item.simplified}|${item.traditional}`)}`,
+        }[selectedType];
+        const positions = new Map();
+        datasetGroups.forEach((items, dataset) => {
+            items.forEach((item, position) => {
+                const key = keyOf(item);
+                if (!positions.has(key)) {
+                    positions.set(key, []);
+                }
+                positions.get(key).push([dataset, position]);
+            });
+        });
+        return positions;
+    }, [selectedType, datasetGroups]);
+
+    // Disabled items as one bitset per dataset (the saved sets are keyed by id)
+    const disabledBits = useMemo(() => {
+        const disabled = { hsk: disabledHSK, tocfl: disabledTOCFL, kanji: disabledKanji, sentences: disabledSentences }[selectedType];
+        const positions = new Map(Array.from(datasetGroups.keys(), dataset => [dataset, []]));
+        disabled?.forEach(key => {
+            (keyPositions.get(key) || []).forEach(([dataset, position]) => positions.get(dataset).push(position));
+        });
+        return new Map(Array.from(positions, ([dataset, list]) => [
+            dataset,
+            bitsFromPositions(datasetGroups.get(dataset).length, list),
+        ]));
+    }, [selectedType, datasetGroups, keyPositions, disabledHSK, disabledTOCFL, disabledKanji, disabledSentences]);
+
+    // Get filtered data based on selected type, levels, and search query: each filter
+    // is a bitset per dataset (facet bitmaps, disabled items, search matches) and they
+    // are combined a 32-bit word at a time
     const getFilteredData = () => {
         if (!selectedType) {
             return [];
@@ -135,133 +207,33 @@ export default function CharacterListScreen() {
         if (selectedType !== 'sentences' && selectedLevels.length === 0) {
             return [];
         }
-
-        let data = [];
-        if (selectedType === 'hsk') {
-            data = hskData.filter(word => selectedLevels.includes(word.level));
-        } else if (selectedType === 'tocfl') {
-            // TOCFL data is only level 1, so filter based on selectedLevels including 1
-            if (selectedLevels.includes(1)) {
-                data = tocflData;
-            } else {
-                return [];
-            }
-        } else if (selectedType === 'kanji') {
-            data = allKanji.filter(kanji => selectedLevels.includes(kanji.level));
-        } else if (selectedType === 'sentences') {
-            // Sentences don't have levels, so return all
-            data = sentencesData || [];
-        } else {
+        // TOCFL data is only level 1, so filter based on selectedLevels including 1
+        if (selectedType === 'tocfl' && !selectedLevels.includes(1)) {
             return [];
         }
 
-        // Apply character filter for HSK and TOCFL
-        if ((selectedType === 'hsk' || selectedType === 'tocfl') && characterFilter !== 'all') {
-            if (characterFilter === 'single') {
-                data = data.filter(item => item.characterCount === 1);
-            } else if (characterFilter === 'multi') {
-                data = data.filter(item => item.characterCount > 1);
-            }
-        }
-
-        // Apply enabled/disabled filter
-        if (enabledFilter !== 'all') {
-            if (selectedType === 'hsk') {
-                if (enabledFilter === 'enabled') {
-                    data = data.filter(item => !disabledHSK.has(`${item.level}-${item.id}`));
-                } else if (enabledFilter === 'disabled') {
-                    data = data.filter(item => disabledHSK.has(`${item.level}-${item.id}`));
-                }
-            } else if (selectedType === 'tocfl') {
-                if (enabledFilter === 'enabled') {
-                    data = data.filter(item => !disabledTOCFL.has(item.id));
-                } else if (enabledFilter === 'disabled') {
-                    data = data.filter(item => disabledTOCFL.has(item.id));
-                }
-            } else if (selectedType === 'kanji') {
-                if (enabledFilter === 'enabled') {
-                    data = data.filter(item => !disabledKanji.has(item.kanji));
-                } else if (enabledFilter === 'disabled') {
-                    data = data.filter(item => disabledKanji.has(item.kanji));
-                }
-            } else if (selectedType === 'sentences') {
-                const sentenceIndexMap = sentenceIndexMapRef.current;
-                if (sentenceIndexMap) {
-                    if (enabledFilter === 'enabled') {
-                        data = data.filter(item => {
-                            const key = `${item.simplified}|${item.traditional}`;
-                            const originalIndex = sentenceIndexMap.get(key);
-                            return originalIndex !== undefined && !disabledSentences.has(`sentence-${originalIndex}`);
-                        });
-                    } else if (enabledFilter === 'disabled') {
-                        data = data.filter(item => {
-                            const key = `${item.simplified}|${item.traditional}`;
-                            const originalIndex = sentenceIndexMap.get(key);
-                            return originalIndex !== undefined && disabledSentences.has(`sentence-${originalIndex}`);
-                        });
-                    }
-                }
+        const query = searchQuery.trim();
+        const data = [];
+        datasetGroups.forEach((items, dataset) => {
+            // Character filter for HSK and TOCFL ('single' and 'multi' are facet bitmaps)
+            let bits = (selectedType === 'hsk' || selectedType === 'tocfl') && characterFilter !== 'all'
+                ? loadFacet(dataset, characterFilter)
+                : fullBits(items.length);
+
+            // Apply enabled/disabled filter
+            if (enabledFilter === 'enabled') {
+                bits = andNotBits(bits, disabledBits.get(dataset));
+            } else if (enabledFilter === 'disabled') {
+                bits = andBits(bits, disabledBits.get(dataset));
             }
-        }
 
-        // Apply search filter if query exists
-        if (searchQuery.trim()) {
-            const query = searchQuery.toLowerCase().trim();
-            if (selectedType === 'hsk' || selectedType === 'tocfl') {
-                data = data.filter(item => {
-                    const simplified = (item.simplifiedChinese || '').toLowerCase();
-                    const traditional = (item.traditionalChinese || '').toLowerCase();
-                    const pinyin = (item.pinyin || '').toLowerCase();
-                    const jyutping = (item.jyutping || '').toLowerCase();
-                    const hanviet = (item.hanviet || '').toLowerCase();
-                    const vietnamese = (item.vietnamese || '').toLowerCase();
-                    const english = (item.english || '').toLowerCase();
-
-                    return simplified.includes(query) ||
-                        traditional.includes(query) ||
-                        pinyin.includes(query) ||
-                        jyutping.includes(query) ||
-                        hanviet.includes(query) ||
-                        vietnamese.includes(query) ||
-                        english.includes(query);
-                });
-            } else if (selectedType === 'kanji') {
-                data = data.filter(item => {
-                    const kanji = (item.kanji || '').toLowerCase();
-                    const onyomi = (item.onyomi || '').toLowerCase();
-                    const kunyomi = (item.kunyomi || '').toLowerCase();
-                    const hanviet = (item.hanviet || '').toLowerCase();
-                    const viet = (item.viet || '').toLowerCase();
-                    const english = (item.english || '').toLowerCase();
-
-                    return kanji.includes(query) ||
-                        onyomi.includes(query) ||
-                        kunyomi.includes(query) ||
-                        hanviet.includes(query) ||
-                        viet.includes(query) ||
-                        english.includes(query);
-                });
-            } else if (selectedType === 'sentences') {
-                data = data.filter(item => {
-                    const simplified = (item.simplified || '').toLowerCase();
-                    const traditional = (item.traditional || '').toLowerCase();
-                    const pinyin = (item.pinyin || '').toLowerCase();
-                    const jyutping = (item.jyutping || '').toLowerCase();
-                    const hanviet = (item.hanviet || '').toLowerCase();
-                    const viet = (item.viet || '').toLowerCase();
-                    const english = (item.english || '').toLowerCase();
-
-                    return simplified.includes(query) ||
-                        traditional.includes(query) ||
-                        pinyin.includes(query) ||
-                        jyutping.includes(query) ||
-                        hanviet.includes(query) ||
-                        viet.includes(query) ||
-                        english.includes(query);
-                });
+            // Apply search filter if query exists (prebuilt index per dataset, see scripts/search_index.py)
+            if (query) {
+                bits = andBits(bits, bitsFromPositions(items.length, searchDataset(dataset, searchQuery)));
             }
-        }
 
+            bitsPositions(bits).forEach(position => data.push(items[position]));
+        });
         return data;
     };
 
@@ -553,7 +525,7 @@ export default function CharacterListScreen() {
     // Memoize filtered data to prevent recalculation on every render
     const filteredData = useMemo(() => {
         return getFilteredData();
-    }, [selectedType, selectedLevels, characterFilter, enabledFilter, searchQuery, disabledHSK, disabledTOCFL, disabledKanji, disabledSentences, hskData, tocflData, allKanji, sentencesData]);
+    }, [selectedType, selectedLevels, characterFilter, enabledFilter, searchQuery, datasetGroups, disabledBits]);
 
     const renderItem = ({ item, index }) => {
         if (selectedType === 'hsk') {
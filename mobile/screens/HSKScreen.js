@@ -2,8 +2,7 @@ import React, { useState, useMemo, useEffect } from 'react';
 import { View, Text, TouchableOpacity, StyleSheet, ScrollView, Alert } from 'react-native';
 import * as Clipboard from 'expo-clipboard';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import hskLevel1Data from '../data/hsk_level1.json';
-import hskLevel2Data from '../data/hsk_level2.json';
+import { loadDataset } from '../data';
 import { useSettings } from '../context/SettingsContext';
 import { usePractice } from '../context/PracticeContext';
 
@@ -26,8 +25,8 @@ export default function HSKScreen() {
 
   // Combine level 1 and 2 data, adding level property to each word
   const hskData = useMemo(() => {
-    const level1 = (hskLevel1Data || []).map(word => ({ ...word, level: 1 }));
-    const level2 = (hskLevel2Data || []).map(word => ({ ...word, level: 2 }));
+    const level1 = loadDataset('hsk1').map(word => ({ ...word, level: 1 }));
+    const level2 = loadDataset('hsk2').map(word => ({ ...word, level: 2 }));
     return [...level1, ...level2];
   }, []);
 
@@ -2,8 +2,7 @@ import React, { useState, useEffect, useMemo } from 'react';
 import { View, Text, TouchableOpacity, StyleSheet, ScrollView, Alert } from 'react-native';
 import * as Clipboard from 'expo-clipboard';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import kanjiGrade1Data from '../data/kanji_grade1.json';
-import kanjiGrade2Data from '../data/kanji_grade2.json';
+import { loadDataset } from '../data';
 import { useSettings } from '../context/SettingsContext';
 import { usePractice } from '../context/PracticeContext';
 
@@ -23,6 +22,8 @@ export default function KanjiScreen() {
 
   // Combine all kanji data (grade 1 and 2)
   const allKanji = useMemo(() => {
+    const kanjiGrade1Data = loadDataset('kanji1');
+    const kanjiGrade2Data = loadDataset('kanji2');
     const combined = [];
     // Add grade 1 kanji with level property
     if (kanjiGrade1Data) {
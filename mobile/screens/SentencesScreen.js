@@ -2,7 +2,7 @@ import React, { useState, useMemo, useEffect } from 'react';
 import { View, Text, TouchableOpacity, StyleSheet, ScrollView, Alert } from 'react-native';
 import * as Clipboard from 'expo-clipboard';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import sentencesData from '../data/sentances.json';
+import { loadDataset } from '../data';
 import { useSettings } from '../context/SettingsContext';
 import { usePractice } from '../context/PracticeContext';
 
@@ -11,6 +11,7 @@ const SENTENCES_DISABLED_STORAGE_KEY = '@kanji_viet_sentences_disabled';
 export default function SentencesScreen() {
   const { settings } = useSettings();
   const { currentSentence, setCurrentSentence } = usePractice();
+  const sentencesData = useMemo(() => loadDataset('sentences'), []);
   const [showVietnameseTranslation, setShowVietnameseTranslation] = useState(false);
   const [showEnglish, setShowEnglish] = useState(false);
   const [showTraditional, setShowTraditional] = useState(false);
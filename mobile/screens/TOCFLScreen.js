@@ -1,8 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { View, Text, TouchableOpacity, StyleSheet, ScrollView, Alert } from 'react-native';
 import * as Clipboard from 'expo-clipboard';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import tocflData from '../data/tocfl_level1.json';
+import { loadDataset } from '../data';
 import { useSettings } from '../context/SettingsContext';
 import { usePractice } from '../context/PracticeContext';
 
@@ -11,6 +11,7 @@ const TOCFL_DISABLED_STORAGE_KEY = '@kanji_viet_tocfl_disabled';
 export default function TOCFLScreen() {
   const { settings } = useSettings();
   const { currentTOCFLWord, setCurrentTOCFLWord } = usePractice();
+  const tocflData = useMemo(() => loadDataset('tocfl1'), []);
   const [selectedLevels, setSelectedLevels] = useState([1]);
   const currentWord = currentTOCFLWord;
   const [showVietnameseTranslation, setShowVietnameseTranslation] = useState(false);
@@ -7,15 +7,17 @@ https://github.com/ph0ngp/hanviet-pinyin-wordlist
 
 import json
 import csv
-import re
 import os
 import sys
 
+from cjk_text import clean_headword, is_cjk
+
 
 def load_hanviet_csv(csv_file):
     """Load Han Viet CSV data into a lookup dictionary"""
     hanviet_data = {}
     char_pinyin_counts = {}
+    first_key = {}  # char -> first key stored for it, for the character-only fallback
 
     if not os.path.exists(csv_file):
         print(f"❌ Han Viet CSV file not found: {csv_file}")
@@ -46,16 +48,14 @@ def load_hanviet_csv(csv_file):
                 pinyin_key = pinyin if pinyin and pinyin != "*" else "*"
                 key = f"{char}|{pinyin_key}"
                 hanviet_data[key] = hanviet_clean
+                first_key.setdefault(char, key)
 
     # Add character-only entries for all characters
     for char, pinyin_set in char_pinyin_counts.items():
         char_only_key = f"{char}|*"
         if char_only_key not in hanviet_data:
-            # Find any entry for this character to get the hanviet
-            for key, value in hanviet_data.items():
-                if key.startswith(f"{char}|") and key != char_only_key:
-                    hanviet_data[char_only_key] = value
-                    break
+            # Use the first entry for this character to get the hanviet
+            hanviet_data[char_only_key] = hanviet_data[first_key[char]]
 
     print(f"✅ Loaded {len(hanviet_data)} Han Viet entries")
     return hanviet_data
@@ -78,8 +78,7 @@ def find_hanviet_reading_with_multiple(entry, hanviet_data):
         return None
 
     # Clean the Chinese text
-    traditional_clean = traditional.split("｜")[0].split("|")[0]
-    traditional_clean = re.sub(r"[（(].*?[）)]", "", traditional_clean).strip()
+    traditional_clean = clean_headword(traditional)
 
     # For single characters, collect all readings
     if len(traditional_clean) == 1:
@@ -109,6 +108,138 @@ def find_hanviet_reading_with_multiple(entry, hanviet_data):
     return None
 
 
+def is_punctuation_or_latin(char):
+    """Check if character is punctuation, Latin, number, or whitespace"""
+    # Must be a single character
+    if len(char) != 1:
+        return False
+    # Check if it's a Chinese character
+    if is_cjk(char):
+        return False
+    # Check if it's punctuation (common punctuation marks)
+    if char in '，。！？；：、""' "（）【】《》〈〉「」『』〔〕…—–·～":
+        return True
+    # Check if it's Latin, number, or whitespace
+    if char.isalnum() or char.isspace() or ord(char) < 128:
+        return True
+    return False
+
+
+def is_punctuation_or_latin_string(text):
+    """Check if a string (single or multi-char) contains only punctuation/Latin characters"""
+    if not text:
+        return False
+    # If single character, use the single char function
+    if len(text) == 1:
+        return is_punctuation_or_latin(text)
+    # For multi-character strings, check if ALL characters are punctuation/Latin
+    # (e.g., "Muiriel", "123", etc.)
+    return all(is_punctuation_or_latin(c) for c in text)
+
+
+def get_hanviet_with_preserved_chars(traditional, hanviet_data):
+    """
+    Get hanviet reading while preserving punctuation and Latin characters from original text.
+    Processes character-by-character to properly handle mixed punctuation/Latin with Chinese.
+    """
+    if not traditional:
+        return ""
+
+    # Clean traditional text (same as find_hanviet_reading_with_multiple)
+    traditional_clean = clean_headword(traditional)
+
+    if not traditional_clean:
+        return ""
+
+    # Check if we have only Chinese characters (no punctuation/Latin mixed in)
+    has_punctuation_or_latin = any(
+        is_punctuation_or_latin(c) for c in traditional_clean
+    )
+
+    # If no punctuation/Latin, try whole-word lookup first
+    if not has_punctuation_or_latin and len(traditional_clean) > 1:
+        char_only_key = f"{traditional_clean}|*"
+        if char_only_key in hanviet_data:
+            return hanviet_data[char_only_key]
+
+    # Process character by character, preserving punctuation/Latin
+    # Group consecutive Latin/numeral characters together
+    # Store tuples: (part, is_punct_or_latin_flag, is_latin_or_numeral_flag)
+    result_parts = []
+    current_latin_group = []
+
+    for char in traditional_clean:
+        if is_punctuation_or_latin(char):
+            # Check if it's a Latin character or Arabic numeral
+            is_latin_or_numeral = char.isalnum() and ord(char) < 128
+
+            if is_latin_or_numeral:
+                # Group consecutive Latin/numeral characters
+                current_latin_group.append(char)
+            else:
+                # This is punctuation - flush any accumulated Latin group first
+                if current_latin_group:
+                    latin_group = "".join(current_latin_group)
+                    result_parts.append((latin_group, True, True))
+                    current_latin_group = []
+                # Add punctuation
+                result_parts.append((char, True, False))
+        else:
+            # This is a Chinese character - flush any accumulated Latin group first
+            if current_latin_group:
+                latin_group = "".join(current_latin_group)
+                result_parts.append((latin_group, True, True))
+                current_latin_group = []
+
+            # Look up hanviet for Chinese character
+            char_only_key = f"{char}|*"
+            if char_only_key in hanviet_data:
+                result_parts.append((hanviet_data[char_only_key], False, False))
+            else:
+                result_parts.append(("_", False, False))
+
+    # Flush any remaining Latin group
+    if current_latin_group:
+        latin_group = "".join(current_latin_group)
+        result_parts.append((latin_group, True, True))
+
+    # Join with spaces: between hanviet readings, and around Latin/numeral groups (entire words)
+    # Only add spaces "before" each part to avoid duplicates
+    final_parts = []
+    for i, (part, is_punct_or_latin, is_latin_or_numeral) in enumerate(result_parts):
+        if i > 0:
+            prev_part, prev_is_punct_or_latin, prev_is_latin_or_numeral = result_parts[
+                i - 1
+            ]
+
+            # Space between two hanviet readings
+            if (
+                part != "_"
+                and not is_punct_or_latin
+                and prev_part != "_"
+                and not prev_is_punct_or_latin
+            ):
+                final_parts.append(" ")
+            # Space before Latin/numeral group (previous is hanviet reading)
+            elif (
+                is_latin_or_numeral and prev_part != "_" and not prev_is_punct_or_latin
+            ):
+                final_parts.append(" ")
+            # Space after Latin/numeral group (current is hanviet reading, previous is Latin/numeral)
+            elif prev_is_latin_or_numeral and part != "_" and not is_punct_or_latin:
+                final_parts.append(" ")
+            # Space before Latin/numeral (previous is punctuation - only for non-Chinese punctuation)
+            elif is_latin_or_numeral and prev_is_punct_or_latin:
+                # Don't add space after Chinese punctuation marks
+                chinese_punct = '，。！？；：、""' "（）【】《》〈〉「」『』〔〕…—–·～"
+                if prev_part not in chinese_punct:
+                    final_parts.append(" ")
+
+        final_parts.append(part)
+
+    return "".join(final_parts)
+
+
 def process_hsk_with_hanviet(input_file, hanviet_csv, output_file):
     """Process HSK JSON and add Han Viet readings from CSV"""
     # Load Han Viet CSV
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Fault-isolating batch translation.
+- Sends the whole batch in one API call (the normal, fast path)
+- Transient failures (quota/rate limits, timeouts, 5xx) are retried for the
+  whole batch with exponential backoff; splitting would only multiply the calls
+  against a limit that is already exhausted
+- If the call fails because of its content (4xx, malformed response), splits
+  the batch in half and retries each half recursively
+- A single item that is still rejected is written to a dead-letter file together
+  with the error, and gets an empty translation
+- Everything else in the batch lands normally, so one bad segment never
+  discards its neighbours or stops a half-finished run
+
+Usage from a processing script:
+    translations = translate_with_isolation(
+        texts, lambda chunk: request_translations(chunk, "vi"), context={"target": "vi"}
+    )
+where the callable raises on any failure instead of returning placeholders.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+
+from build_metrics import METRICS
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_DEAD_LETTER_FILE = PROJECT_ROOT / "translation_dead_letters.jsonl"
+
+MAX_RETRIES = 5  # Backed-off attempts of a batch after a transient error
+RETRY_DELAY = 2.0  # Seconds before the first retry; doubles per attempt (~1 min total)
+
+# Errors that will fail for every item (bad credentials, wrong project, ...).
+# Bisecting these would only multiply the number of failing calls.
+FATAL_ERROR_NAMES = {
+    "PermissionDenied",
+    "Unauthenticated",
+    "NotFound",
+    "Forbidden",
+    "Unauthorized",
+}
+
+# Errors that say nothing about the batch's content and go away on their own
+TRANSIENT_ERROR_NAMES = {
+    "QuotaExceededError",
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "DeadlineExceeded",
+    "Aborted",
+    "ServerDisconnectedError",
+    "ServerTimeoutError",
+    "ClientConnectorError",
+}
+TRANSIENT_STATUSES = {408, 429}  # Plus every 5xx
+
+
+class FatalTranslationError(Exception):
+    """Raised when a batch fails with an error that bisection cannot fix"""
+
+
+def is_fatal_error(error):
+    """Check whether an exception means every request will fail"""
+    if getattr(error, "fatal", False) or isinstance(error, FatalTranslationError):
+        return True
+    return type(error).__name__ in FATAL_ERROR_NAMES
+
+
+def is_transient_error(error):
+    """Check whether an exception is a rate limit or outage rather than bad input"""
+    while error is not None:
+        if type(error).__name__ in TRANSIENT_ERROR_NAMES:
+            return True
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        status = getattr(error, "status", None) or getattr(error, "code", None)
+        if isinstance(status, int):
+            return status in TRANSIENT_STATUSES or status >= 500
+        # Providers wrap network errors; look at what they wrapped
+        error = error.__cause__
+    return False
+
+
+def _labels(context):
+    """Metric labels of a batch: its target language, when the caller passed one"""
+    return {"target": context["target"]} if context and "target" in context else {}
+
+
+def record_dead_letter(dead_letter_file, text, index, error, context=None):
+    """Append one failed item to the dead-letter file (JSON lines)"""
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "index": index,
+        "text": text,
+        "error": f"{type(error).__name__}: {error}",
+    }
+    if context:
+        record["context"] = context
+
+    path = Path(dead_letter_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_dead_letters(dead_letter_file=DEFAULT_DEAD_LETTER_FILE):
+    """Read all dead-letter records, e.g. to retry them later"""
+    path = Path(dead_letter_file)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _isolate(texts, call, dead_letter_file, context, max_retries, retry_delay, offset):
+    """Shared implementation of the sync and async entry points"""
+    if not texts:
+        return []
+
+    attempt = 0
+    while True:
+        try:
+            results = await call(texts)
+            if results is None or len(results) != len(texts):
+                got = 0 if results is None else len(results)
+                raise ValueError(f"expected {len(texts)} translations, got {got}")
+            return list(results)
+        except Exception as e:
+            if is_fatal_error(e):
+                raise FatalTranslationError(str(e)) from e
+            error = e
+        if not is_transient_error(error):
+            break
+        if attempt >= max_retries:
+            raise FatalTranslationError(
+                f"still failing after {max_retries} retries: {type(error).__name__}: {error}"
+            ) from error
+        delay = retry_delay * 2**attempt * random.uniform(0.5, 1.0)
+        attempt += 1
+        METRICS.increment("retries", **_labels(context))
+        print(
+            f"  ⏳ Batch of {len(texts)} failed ({type(error).__name__}), "
+            f"retry {attempt}/{max_retries} in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+
+    if len(texts) > 1:
+        mid = len(texts) // 2
+        METRICS.increment("batch_splits", **_labels(context))
+        print(
+            f"  ⚠️  Batch of {len(texts)} failed ({type(error).__name__}), "
+            f"splitting into {mid} + {len(texts) - mid}"
+        )
+        args = (call, dead_letter_file, context, max_retries, retry_delay)
+        left, right = await asyncio.gather(
+            _isolate(texts[:mid], *args, offset),
+            _isolate(texts[mid:], *args, offset + mid),
+        )
+        return left + right
+
+    print(f"  ❌ Giving up on item {offset}: '{texts[0][:20]}' ({error})")
+    METRICS.increment("dead_letters", **_labels(context))
+    record_dead_letter(dead_letter_file, texts[0], offset, error, context)
+    return [""]
+
+
+def translate_with_isolation(
+    texts,
+    translate_fn,
+    dead_letter_file=DEFAULT_DEAD_LETTER_FILE,
+    context=None,
+    max_retries=MAX_RETRIES,
+    retry_delay=RETRY_DELAY,
+):
+    """
+    Translate a batch, bisecting on content errors so only the offending items are lost.
+
+    translate_fn(list[str]) -> list[str] must raise on failure.
+    Returns one translation per input text; items that could not be translated
+    are returned as "" and recorded in the dead-letter file.
+    Raises FatalTranslationError for errors that would fail every request,
+    including transient errors that outlast max_retries.
+    """
+    if not texts:
+        return []
+
+    async def call(chunk):
+        return translate_fn(chunk)
+
+    return asyncio.run(
+        _isolate(list(texts), call, dead_letter_file, context, max_retries, retry_delay, 0)
+    )
+
+
+async def translate_with_isolation_async(
+    texts,
+    translate_fn,
+    dead_letter_file=DEFAULT_DEAD_LETTER_FILE,
+    context=None,
+    max_retries=MAX_RETRIES,
+    retry_delay=RETRY_DELAY,
+):
+    """
+    Async version of translate_with_isolation for provider coroutines.
+
+    translate_fn(list[str]) must be a coroutine function returning list[str].
+    Both halves of a split batch are retried concurrently.
+    """
+    return await _isolate(
+        list(texts), translate_fn, dead_letter_file, context, max_retries, retry_delay, 0
+    )
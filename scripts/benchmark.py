@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hot paths of the data pipeline.
+- Micro benchmarks: Han Viet table loading and lookups, character counting,
+  Jyutping conversion and sentence level classification, each over real inputs
+  from vocabCsv/ and mobile/data
+- Macro benchmarks: end-to-end builds of hsk1, tocfl1 and the TOCFL-level-1
+  sentences with the in-process stub translator and an empty in-memory cache,
+  written to a temporary directory (the real data is never touched)
+- Stable runner: one warm-up call, then each sample repeats the benchmark
+  until it takes at least --min-time (timeit's autorange, garbage collection
+  off); the median of the samples is the result
+- Every run is appended to benchmark_history.jsonl. --save-baseline stores it
+  as benchmark_baseline.json, and later runs report every benchmark whose
+  median is more than --threshold slower than the baseline (exit code 1)
+
+Benchmarks that need the Jyutping library are skipped when it is not installed.
+Timings are only comparable on the same machine, so the history and the
+baseline stay out of git.
+
+Usage:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --save-baseline
+    python scripts/benchmark.py hanviet count --quick
+    python scripts/benchmark.py --list
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from add_hanviet_from_csv import (
+    find_hanviet_reading_with_multiple,
+    get_hanviet_with_preserved_chars,
+    load_hanviet_csv,
+)
+from build_pipeline import (
+    DATASETS,
+    HANVIET_FILE,
+    Annotator,
+    BuildOptions,
+    build_dataset,
+    read_records,
+)
+from cjk_text import count_chinese_characters, count_chinese_characters_batch
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+SENTENCES_CSV = PROJECT_ROOT / "vocabCsv" / "sentences.csv"
+HISTORY_FILE = PROJECT_ROOT / "benchmark_history.jsonl"
+BASELINE_FILE = PROJECT_ROOT / "benchmark_baseline.json"
+
+RESULT_VERSION = 1
+DEFAULT_THRESHOLD = 0.2  # Report benchmarks more than 20% slower than the baseline
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2  # Seconds per sample
+CLASSIFY_SENTENCES = 2000  # Corpus prefix the classification benchmarks use
+LOOKUP_WORDS = 1000  # Headwords the Han Viet lookup benchmark uses (it scans the table)
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str  # "micro" or "macro"
+    description: str
+    setup: Callable  # () -> (function to time, items it processes per call)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the progress prints of the functions under test"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+_shared = {}
+
+
+def shared(key, factory):
+    """Inputs several benchmarks use, loaded once per run"""
+    if key not in _shared:
+        with quiet():
+            _shared[key] = factory()
+    return _shared[key]
+
+
+def hanviet_data():
+    return shared("hanviet", lambda: load_hanviet_csv(HANVIET_FILE))
+
+
+def vocabulary_words():
+    """Traditional headwords of every built HSK/TOCFL source"""
+
+    def load():
+        words = []
+        for spec in DATASETS.values():
+            if spec.kind == "tocfl" and spec.input_file.exists():
+                words.extend(r["traditionalChinese"] for r in read_records(spec, BuildOptions()))
+        return words
+
+    return shared("words", load)
+
+
+def app_sentences():
+    def load():
+        with open(MOBILE_DATA_DIR / "sentances.json", "r", encoding="utf-8") as f:
+            return [entry["traditionalChinese"] for entry in json.load(f)]
+
+    return shared("sentences", load)
+
+
+def require_jyutping():
+    try:
+        import pinyin_jyutping  # noqa: F401
+    except ImportError:
+        raise BenchmarkSkipped("pinyin_jyutping is not installed")
+
+
+# --- Micro benchmarks ---
+
+
+def setup_load_hanviet():
+    def run():
+        with quiet():
+            load_hanviet_csv(HANVIET_FILE)
+
+    return run, 1
+
+
+def setup_find_hanviet():
+    data = hanviet_data()
+    entries = [{"traditionalChinese": word} for word in vocabulary_words()[:LOOKUP_WORDS]]
+    return lambda: [find_hanviet_reading_with_multiple(e, data) for e in entries], len(entries)
+
+
+def setup_hanviet_sentences():
+    data = hanviet_data()
+    texts = app_sentences()
+    return lambda: [get_hanviet_with_preserved_chars(t, data) for t in texts], len(texts)
+
+
+def setup_count_characters():
+    words = vocabulary_words()
+    return lambda: [count_chinese_characters(w) for w in words], len(words)
+
+
+def setup_count_characters_batch():
+    words = vocabulary_words()
+    count_chinese_characters_batch(words[:1])  # Import NumPy outside the timing
+    return lambda: count_chinese_characters_batch(words), len(words)
+
+
+def setup_jyutping():
+    require_jyutping()
+    annotator = Annotator()
+    texts = app_sentences()
+    annotator._convert_jyutping(texts[0])  # Load the dictionary outside the timing
+    return lambda: [annotator._convert_jyutping(t) for t in texts], len(texts)
+
+
+def setup_classify(kind):
+    def setup():
+        from sentence_leveler import MAX_LEVELS, classify, lexicon_vocab, longest_word
+        from sentence_xref import read_corpus_sentences
+
+        vocab = shared(f"vocab-{kind}", lambda: lexicon_vocab(MOBILE_DATA_DIR, kind))
+        corpus = shared("corpus", lambda: read_corpus_sentences(SENTENCES_CSV))
+        texts = [text for text, _, _ in corpus[:CLASSIFY_SENTENCES]]
+        longest = longest_word(vocab)
+        return lambda: [classify(t, vocab, MAX_LEVELS[kind], longest) for t in texts], len(texts)
+
+    return setup
+
+
+# --- Macro benchmarks ---
+
+
+def setup_build(dataset, options=None):
+    def setup():
+        require_jyutping()
+        from translation_cache import TranslationCache
+        from translation_providers import StubProvider
+
+        spec = DATASETS[dataset]
+        rows = len(read_records(spec, BuildOptions(**(options or {}))))
+
+        def run():
+            # A fresh cache, provider and annotator per call: every text is translated
+            cache = TranslationCache(":memory:")
+            provider = StubProvider()
+
+            async def build(output_dir):
+                build_options = BuildOptions(**(options or {}), output_dir=Path(output_dir))
+                try:
+                    await build_dataset(spec, provider, cache, Annotator(), build_options)
+                finally:
+                    await provider.close()
+
+            try:
+                with quiet(), tempfile.TemporaryDirectory(prefix="benchmark-") as output_dir:
+                    asyncio.run(build(output_dir))
+            finally:
+                cache.close()
+
+        return run, rows
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("load_hanviet_csv", "micro", "Load vocabCsv/hanviet.csv", setup_load_hanviet),
+    Benchmark(
+        "find_hanviet_reading",
+        "micro",
+        f"find_hanviet_reading_with_multiple over {LOOKUP_WORDS} TOCFL headwords",
+        setup_find_hanviet,
+    ),
+    Benchmark(
+        "hanviet_sentences",
+        "micro",
+        "get_hanviet_with_preserved_chars over the app sentences",
+        setup_hanviet_sentences,
+    ),
+    Benchmark(
+        "count_chinese_characters",
+        "micro",
+        "count_chinese_characters over every TOCFL headword",
+        setup_count_characters,
+    ),
+    Benchmark(
+        "count_chinese_characters_batch",
+        "micro",
+        "count_chinese_characters_batch over every TOCFL headword (NumPy when installed)",
+        setup_count_characters_batch,
+    ),
+    Benchmark("jyutping", "micro", "Jyutping conversion of the app sentences", setup_jyutping),
+    Benchmark(
+        "classify_hsk",
+        "micro",
+        f"HSK level of the first {CLASSIFY_SENTENCES} corpus sentences",
+        setup_classify("hsk"),
+    ),
+    Benchmark(
+        "classify_tocfl",
+        "micro",
+        f"TOCFL level of the first {CLASSIFY_SENTENCES} corpus sentences",
+        setup_classify("tocfl"),
+    ),
+    Benchmark("build_hsk1", "macro", "End-to-end hsk1 build (stub)", setup_build("hsk1")),
+    Benchmark("build_tocfl1", "macro", "End-to-end tocfl1 build (stub)", setup_build("tocfl1")),
+    Benchmark(
+        "build_sentences",
+        "macro",
+        "End-to-end TOCFL-level-1 sentence build (stub)",
+        setup_build("sentences", {"tocfl_level": 1}),
+    ),
+]
+
+
+def select_benchmarks(patterns):
+    """Benchmarks whose name or group contains one of the patterns (all if none)"""
+    if not patterns:
+        return list(BENCHMARKS)
+    return [b for b in BENCHMARKS if any(p == b.group or p in b.name for p in patterns)]
+
+
+def run_benchmark(benchmark, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """Timing of one benchmark: seconds per call (median, min, stdev) over `repeat` samples"""
+    function, items = benchmark.setup()
+    function()  # Warm-up: imports, caches, lazy loads
+    timer = timeit.Timer(function, timer=time.perf_counter)
+    number = 1
+    if benchmark.group == "micro":
+        number, elapsed = timer.autorange()
+        number = max(1, round(number * min_time / elapsed))
+    samples = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(samples)
+    return {
+        "group": benchmark.group,
+        "median": median,
+        "min": min(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": len(samples),
+        "number": number,
+        "items": items,
+        "per_item": median / items if items else median,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(benchmarks, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """One run: {"version", "timestamp", "commit", "machine", "results", "skipped"}"""
+    run = {
+        "version": RESULT_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {},
+        "skipped": {},
+    }
+    for benchmark in benchmarks:
+        try:
+            samples = repeat if benchmark.group == "micro" else max(1, min(repeat, 3))
+            result = run_benchmark(benchmark, samples, min_time)
+        except BenchmarkSkipped as e:
+            run["skipped"][benchmark.name] = str(e)
+            print(f"⏭️  {benchmark.name}: {e}")
+            continue
+        run["results"][benchmark.name] = result
+        print_result(benchmark.name, result)
+    return run
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def print_result(name, result):
+    spread = result["stdev"] / result["median"] if result["median"] else 0.0
+    print(
+        f"⏱️  {name:<30} {format_seconds(result['median']):>10} ±{spread:5.1%}  "
+        f"({result['items']} items, {format_seconds(result['per_item'])}/item)"
+    )
+
+
+def compare(run, baseline):
+    """[(name, baseline median, median, ratio)] of the benchmarks in both runs"""
+    rows = []
+    for name, result in run["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and previous["median"]:
+            ratio = result["median"] / previous["median"]
+            rows.append((name, previous["median"], result["median"], ratio))
+    return rows
+
+
+def print_comparison(rows, baseline, threshold=DEFAULT_THRESHOLD):
+    print(f"📊 Against the baseline of {baseline['timestamp']} (commit {baseline['commit']}):")
+    regressions = []
+    for name, before, after, ratio in rows:
+        if ratio > 1 + threshold:
+            status = "🐢"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "🚀"
+        else:
+            status = "  "
+        print(
+            f"   {status} {name:<30} {format_seconds(before):>10} → "
+            f"{format_seconds(after):>10}  {ratio - 1:+.1%}"
+        )
+    return regressions
+
+
+def append_history(run, path=HISTORY_FILE):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline hot paths.")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help="Benchmark names (substrings) or groups: micro, macro (default: all)",
+    )
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT, help="Samples per benchmark"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help="Minimum seconds per micro benchmark sample (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Fewer, shorter samples (noisier)"
+    )
+    parser.add_argument(
+        "--baseline", default=str(BASELINE_FILE), help="Baseline file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store this run as the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Slowdown reported as a regression (default: %(default)s = 20%%)",
+    )
+    parser.add_argument(
+        "--history", default=str(HISTORY_FILE), help="Result history (default: %(default)s)"
+    )
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run")
+    args = parser.parse_args()
+
+    benchmarks = select_benchmarks(args.benchmarks)
+    if args.list or not benchmarks:
+        for benchmark in benchmarks or BENCHMARKS:
+            print(f"   {benchmark.name:<30} {benchmark.group:<6} {benchmark.description}")
+        if not benchmarks:
+            print(f"❌ No benchmark matches {' '.join(args.benchmarks)}")
+            exit(1)
+        return
+
+    repeat, min_time = args.repeat, args.min_time
+    if args.quick:
+        repeat, min_time = 3, min_time / 4
+    run = run_suite(benchmarks, repeat, min_time)
+
+    if not args.no_history:
+        append_history(run, args.history)
+        print(f"📝 Run appended to {args.history}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"📌 Baseline → {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("ℹ️  No baseline yet: store one with --save-baseline")
+        return
+
+    baseline = load_json(args.baseline)
+    rows = compare(run, baseline)
+    regressions = print_comparison(rows, baseline, args.threshold)
+    if regressions:
+        print(
+            f"❌ Slower than the baseline by more than {args.threshold:.0%}: "
+            f"{', '.join(regressions)}"
+        )
+        exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
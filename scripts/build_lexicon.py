@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Master lexicon of the HSK and TOCFL vocabulary.
+- One record per unique (traditionalChinese, simplifiedChinese, pinyin), with
+  its annotations (jyutping, hanviet, characterCount) and glosses stored once,
+  plus the levels it belongs to: {"hsk": [1], "tocfl": [1, 3]}
+- Each level (hsk1, tocfl3, ...) becomes a thin list of lexicon ids, plus
+  overrides for the few fields where an entry differs from its lexicon record
+  (e.g. HSK and TOCFL glossing the same word differently)
+- expand_level() rebuilds a level's entries exactly as in mobile/data/*.json
+
+Lexicon ids are assigned in dataset order (hsk1, hsk2, ..., tocfl1, ...), so
+the words a level adds to the lexicon sit next to each other. data_shards.py
+shards the lexicon and the id lists instead of the per-level files, and
+--vocab-csv writes the per-level word lists check_all_levels.c classifies
+sentences with (vocabCsv/hsk_level<N>_sorted.csv, tocfl_level<N>_sorted.csv).
+
+Output: vocabCsv/lexicon.json, a build intermediate like sentence_xref.json.
+It is not a dataset list, so it stays out of mobile/data, where the tools glob
+*.json for datasets; the app bundles the lexicon shards instead.
+
+Usage:
+    python scripts/build_lexicon.py
+    python scripts/build_lexicon.py --vocab-csv
+    python scripts/build_lexicon.py --check
+"""
+
+import argparse
+import csv
+import json
+import os
+from pathlib import Path
+
+from build_pipeline import DATASETS
+from cjk_text import ANNOTATION_PATTERN, CJK_PATTERN, VARIANT_PATTERN
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+VOCAB_CSV_DIR = PROJECT_ROOT / "vocabCsv"
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+LEXICON_FILE = VOCAB_CSV_DIR / "lexicon.json"
+
+LEXICON_VERSION = 1
+LEXICON_KINDS = ("hsk", "tocfl")
+WORD_KEY = ("traditionalChinese", "simplifiedChinese", "pinyin")
+
+
+def word_key(entry):
+    return tuple(entry[field] for field in WORD_KEY)
+
+
+def lexicon_specs():
+    """DatasetSpecs of the vocabulary datasets, in lexicon id order"""
+    return [spec for spec in DATASETS.values() if spec.kind in LEXICON_KINDS]
+
+
+def build_lexicon(data_dir=MOBILE_DATA_DIR):
+    """{"version", "entries", "levels"} from the vocabulary files in data_dir"""
+    ids = {}
+    entries = []
+    levels = {}
+    for spec in lexicon_specs():
+        path = Path(data_dir) / spec.output_file.name
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            level_entries = json.load(f)
+
+        level_ids = []
+        overrides = {}
+        for position, entry in enumerate(level_entries):
+            key = word_key(entry)
+            if key not in ids:
+                ids[key] = len(entries)
+                record = {field: value for field, value in entry.items() if field != "id"}
+                record.update({kind: [] for kind in LEXICON_KINDS})
+                entries.append(record)
+            lexicon_id = ids[key]
+            record = entries[lexicon_id]
+            if spec.level not in record[spec.kind]:
+                record[spec.kind].append(spec.level)
+
+            changed = {
+                field: value
+                for field, value in entry.items()
+                if field != "id" and record.get(field) != value
+            }
+            if entry.get("id") != position + 1:
+                changed["id"] = entry.get("id")
+            if changed:
+                overrides[str(position)] = changed
+            level_ids.append(lexicon_id)
+        levels[spec.name] = {"ids": level_ids, "overrides": overrides}
+    return {"version": LEXICON_VERSION, "entries": entries, "levels": levels}
+
+
+def record_entry(record):
+    """Lexicon record without its level memberships"""
+    return {field: value for field, value in record.items() if field not in LEXICON_KINDS}
+
+
+def expand_level(lexicon, dataset):
+    """Entries of one level, identical to its mobile/data file"""
+    level = lexicon["levels"][dataset]
+    overrides = level["overrides"]
+    expanded = []
+    for position, lexicon_id in enumerate(level["ids"]):
+        entry = {"id": position + 1, **record_entry(lexicon["entries"][lexicon_id])}
+        entry.update(overrides.get(str(position), {}))
+        expanded.append(entry)
+    return expanded
+
+
+def load_lexicon(path=LEXICON_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        lexicon = json.load(f)
+    if lexicon.get("version") != LEXICON_VERSION:
+        raise ValueError(f"Lexicon version {lexicon.get('version')} is not supported")
+    return lexicon
+
+
+def write_lexicon(lexicon, path=LEXICON_FILE):
+    os.makedirs(Path(path).parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(lexicon, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def classifier_words(text):
+    """Plain words of a headword: 爸爸｜爸 → 爸爸, 爸; 白（形） → 白; 面¹ → 面
+
+    Variants and annotations are cut with the same patterns as the character count
+    (cjk_text), and alternative spellings (星期天/星期日) become separate words.
+    """
+    words = []
+    for variant in VARIANT_PATTERN.split(text):
+        for spelling in ANNOTATION_PATTERN.sub("", variant).split("/"):
+            word = "".join(CJK_PATTERN.findall(spelling))
+            if word and word not in words:
+                words.append(word)
+    return words
+
+
+def level_words(lexicon, kind, level):
+    """{word: character count} of one level's simplified headwords"""
+    words = {}
+    for record in lexicon["entries"]:
+        if level in record[kind]:
+            for word in classifier_words(record["simplifiedChinese"]):
+                words.setdefault(word, len(word))
+    return words
+
+
+def write_vocab_csv(lexicon, vocab_dir=VOCAB_CSV_DIR):
+    """Write <kind>_level<N>_sorted.csv (simplified,char_count; longest words first)"""
+    Path(vocab_dir).mkdir(parents=True, exist_ok=True)
+    paths = []
+    for kind in LEXICON_KINDS:
+        built = sorted({level for record in lexicon["entries"] for level in record[kind]})
+        for level in built:
+            words = level_words(lexicon, kind, level)
+            path = Path(vocab_dir) / f"{kind}_level{level}_sorted.csv"
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["simplified", "char_count"])
+                for word, count in sorted(words.items(), key=lambda kv: (-kv[1], kv[0])):
+                    writer.writerow([word, count])
+            paths.append(path)
+    return paths
+
+
+def check_lexicon(lexicon, data_dir=MOBILE_DATA_DIR):
+    """Datasets whose file differs from the expanded lexicon"""
+    mismatched = []
+    for spec in lexicon_specs():
+        if spec.name not in lexicon["levels"]:
+            continue
+        with open(Path(data_dir) / spec.output_file.name, "r", encoding="utf-8") as f:
+            if json.load(f) != expand_level(lexicon, spec.name):
+                mismatched.append(spec.name)
+    return mismatched
+
+
+def print_summary(lexicon):
+    total = 0
+    for dataset, level in lexicon["levels"].items():
+        total += len(level["ids"])
+        print(
+            f"   {dataset:<8} {len(level['ids']):>5} words, "
+            f"{len(level['overrides']):>4} with overrides"
+        )
+    shared = sum(1 for r in lexicon["entries"] if len(r["hsk"]) + len(r["tocfl"]) > 1)
+    print(
+        f"✅ {len(lexicon['entries'])} unique words for {total} level entries "
+        f"({shared} in more than one level)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the master HSK/TOCFL lexicon.")
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output", default=str(LEXICON_FILE), help="Lexicon file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--vocab-csv",
+        action="store_true",
+        help="Also write the per-level word lists used by check_all_levels.c",
+    )
+    parser.add_argument(
+        "--vocab-dir", default=str(VOCAB_CSV_DIR), help="Directory for --vocab-csv"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Verify the lexicon rebuilds every level file"
+    )
+    args = parser.parse_args()
+
+    lexicon = build_lexicon(args.data_dir)
+    if args.check:
+        mismatched = check_lexicon(lexicon, args.data_dir)
+        for name in mismatched:
+            print(f"❌ {name} does not match its lexicon expansion")
+        if mismatched:
+            exit(1)
+        print(f"✅ All {len(lexicon['levels'])} levels rebuild from the lexicon")
+        return
+
+    write_lexicon(lexicon, args.output)
+    print_summary(lexicon)
+    print(f"📁 Lexicon → {args.output} ({os.path.getsize(args.output) / 1024:,.0f} KB)")
+    if args.vocab_csv:
+        for path in write_vocab_csv(lexicon, args.vocab_dir):
+            print(f"📝 {path}")
+
+
+if __name__ == "__main__":
+    main()
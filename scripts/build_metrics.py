@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Metrics of a build: counters, timers and latency histograms with labels.
+- Counters: requests, characters and texts sent per provider and target
+  language, request errors, cache hits/misses/writes, batch splits, retries,
+  dead letters, quota failovers, rows read and entries written
+- Timers: total seconds and calls per stage (read, translate, jyutping, hanviet,
+  annotate, write). Concurrent work overlaps, so stage totals can add up to more
+  than the wall time
+- Histograms: request latency per provider and target language (fixed
+  log-spaced buckets, so p50/p95/p99 come from the bucket bounds)
+
+Everything reports into the process-wide METRICS registry; the translation
+providers, the cache, the batch splitter and the pipeline stages do so already.
+Worker processes send their registry back with drain() and the parent merges it.
+build_pipeline.py prints summary_lines() at the end of a build and writes
+run_report() to build_metrics.json.
+
+Usage:
+    python scripts/build_metrics.py build_metrics.json
+"""
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_REPORT_FILE = PROJECT_ROOT / "build_metrics.json"
+
+REPORT_VERSION = 1
+# Upper bounds (seconds) of the latency buckets; the last bucket is unbounded
+LATENCY_BUCKETS = tuple(
+    round(m * 10**e, 4) for e in range(-3, 1) for m in (1, 2.5, 5)
+) + (10.0, 30.0, 60.0)
+
+
+def label_key(labels):
+    """"provider=stub,target=vi" (sorted, so equal labels give equal keys)"""
+    return ",".join(f"{name}={labels[name]}" for name in sorted(labels))
+
+
+def parse_labels(key):
+    return dict(part.split("=", 1) for part in key.split(",")) if key else {}
+
+
+class Histogram:
+    """Bucketed distribution of observed values"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-quantile (capped at the maximum)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "buckets": list(self.buckets),
+        }
+
+    def merge(self, data):
+        for index, count in enumerate(data["buckets"]):
+            self.buckets[index] += count
+        self.count += data["count"]
+        self.sum += data["sum"]
+        for name, pick in (("min", min), ("max", max)):
+            if data[name] is not None:
+                current = getattr(self, name)
+                setattr(self, name, data[name] if current is None else pick(current, data[name]))
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """Registry of labelled counters, stage timers and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}  # name -> {label key: value}
+            self.timers = {}  # name -> {label key: [calls, seconds]}
+            self.histograms = {}  # name -> {label key: Histogram}
+            self.started = time.time()
+
+    def increment(self, name, value=1, **labels):
+        key = label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def add_time(self, name, seconds, **labels):
+        key = label_key(labels)
+        with self._lock:
+            timer = self.timers.setdefault(name, {}).setdefault(key, [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    def timer(self, name, **labels):
+        """Context manager adding the time spent inside it to a stage timer"""
+        return _Timer(self, name, labels)
+
+    def observe(self, name, value, **labels):
+        key = label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def counter(self, name, **labels):
+        """Value of one counter, or the sum over every label set when none are given"""
+        series = self.counters.get(name, {})
+        if labels:
+            return series.get(label_key(labels), 0)
+        return sum(series.values())
+
+    def snapshot(self):
+        """JSON-serializable copy of every metric"""
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "timers": {
+                    name: {key: list(value) for key, value in series.items()}
+                    for name, series in self.timers.items()
+                },
+                "histograms": {
+                    name: {key: histogram.to_dict() for key, histogram in series.items()}
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def drain(self):
+        """Snapshot and reset (how worker processes hand their metrics back)"""
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, series in snapshot.get("counters", {}).items():
+                target = self.counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0) + value
+            for name, series in snapshot.get("timers", {}).items():
+                target = self.timers.setdefault(name, {})
+                for key, (calls, seconds) in series.items():
+                    timer = target.setdefault(key, [0, 0.0])
+                    timer[0] += calls
+                    timer[1] += seconds
+            for name, series in snapshot.get("histograms", {}).items():
+                target = self.histograms.setdefault(name, {})
+                for key, data in series.items():
+                    if key not in target:
+                        target[key] = Histogram()
+                    target[key].merge(data)
+
+
+METRICS = Metrics()
+
+
+def run_report(metrics=METRICS, wall=None, **info):
+    """The JSON run report: run info plus every metric"""
+    return {
+        "version": REPORT_VERSION,
+        "started": datetime.fromtimestamp(metrics.started, timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        "wall": round(wall, 3) if wall is not None else None,
+        **info,
+        **metrics.snapshot(),
+    }
+
+
+def write_report(report, path=DEFAULT_REPORT_FILE):
+    os.makedirs(Path(path).parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def _histogram(data):
+    histogram = Histogram()
+    histogram.merge(data)
+    return histogram
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds * 1e6:.0f}µs"
+
+
+def summary_lines(report):
+    """Concise summary table of a run report (or of a snapshot)"""
+    counters = report.get("counters", {})
+    timers = report.get("timers", {})
+    histograms = report.get("histograms", {})
+    wall = report.get("wall")
+    lines = [f"📊 Build metrics{f' ({wall:.1f}s wall)' if wall else ''}"]
+
+    if timers:
+        lines.append(f"   {'stage':<28}{'calls':>9}{'total':>10}{'mean':>10}")
+        for name in sorted(timers):
+            for key, (calls, seconds) in sorted(timers[name].items()):
+                label = f"{name} {key}".strip()
+                lines.append(
+                    f"   {label:<28}{calls:>9,}{format_seconds(seconds):>10}"
+                    f"{format_seconds(seconds / calls if calls else None):>10}"
+                )
+
+    latency = histograms.get("request_latency", {})
+    if latency:
+        lines.append(
+            f"   {'requests':<28}{'calls':>9}{'chars':>12}{'errors':>8}"
+            f"{'p50':>9}{'p95':>9}{'max':>9}"
+        )
+        for key in sorted(latency):
+            histogram = _histogram(latency[key])
+            labels = parse_labels(key)
+            errors = sum(
+                value
+                for error_key, value in counters.get("request_errors", {}).items()
+                if all(parse_labels(error_key).get(k) == v for k, v in labels.items())
+            )
+            label = f"{labels.get('provider', '')} → {labels.get('target', '')}"
+            lines.append(
+                f"   {label:<28}{histogram.count:>9,}"
+                f"{counters.get('chars_sent', {}).get(key, 0):>12,}{errors:>8}"
+                f"{format_seconds(histogram.percentile(0.5)):>9}"
+                f"{format_seconds(histogram.percentile(0.95)):>9}"
+                f"{format_seconds(histogram.max):>9}"
+            )
+
+    hits = sum(counters.get("cache_hits", {}).values())
+    misses = sum(counters.get("cache_misses", {}).values())
+    if hits or misses:
+        lines.append(
+            f"   cache: {hits:,} hits, {misses:,} misses "
+            f"({hits / (hits + misses):.0%} hit ratio), "
+            f"{sum(counters.get('cache_writes', {}).values()):,} written"
+        )
+    faults = [
+        (name, sum(counters.get(name, {}).values()))
+        for name in ("batch_splits", "retries", "dead_letters", "quota_failovers", "auth_failures")
+    ]
+    if any(value for _, value in faults):
+        lines.append(
+            "   " + ", ".join(f"{value:,} {name.replace('_', ' ')}" for name, value in faults)
+        )
+    return lines
+
+
+def print_summary(report):
+    for line in summary_lines(report):
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the summary of a build metrics report.")
+    parser.add_argument(
+        "report",
+        nargs="?",
+        default=str(DEFAULT_REPORT_FILE),
+        help="Report file (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    with open(args.report, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    print_summary(report)
+
+
+if __name__ == "__main__":
+    main()
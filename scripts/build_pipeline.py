@@ -0,0 +1,835 @@
+#!/usr/bin/env python3
+"""
+Unified build pipeline for the mobile datasets (HSK, TOCFL, kanji, sentences).
+- Reads the source CSVs in vocabCsv/ with the same rules as the per-dataset scripts
+- Translates through the provider layer (credential pool by default, or the
+  in-process stub) with the translation cache and fault-isolating batches
+- Adds Jyutping, Han Viet readings and character counts locally
+- Writes mobile/data/*.json in the same format as the per-dataset scripts
+- Runs reading, translation, annotation and writing as overlapping stages
+  (see staged_pipeline.py); --sequential builds one dataset at a time instead
+
+--plan is a dry run: it reads the inputs, applies the filters, deduplicates the
+texts, packs them into batches and consults the cache, then prints the request
+count, characters per target language, expected wall time and cache hit ratio
+without contacting any translation service.
+
+--profile cpu|mem profiles every stage into a run directory (see
+stage_profiler.py); with --sequential the stages are read, translate-<target>,
+annotate and write, the staged build is profiled as one "build" stage, and the
+--shards/--search-index/... steps each get their own.
+
+Usage:
+    python scripts/build_pipeline.py sentences --plan
+    python scripts/build_pipeline.py sentences --tocfl-level 1 --plan
+    python scripts/build_pipeline.py hsk1 hsk2 tocfl
+    python scripts/build_pipeline.py all --stub --output-dir /tmp/stub_build
+    python scripts/build_pipeline.py hsk1 hsk2 --shards --search-index --facets
+    python scripts/build_pipeline.py hsk tocfl --lexicon
+    python scripts/build_pipeline.py tocfl sentences --enqueue
+    python scripts/build_pipeline.py hsk1 --stub --sequential --profile cpu
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from add_hanviet_from_csv import (
+    load_hanviet_csv,
+    find_hanviet_reading_with_multiple,
+    get_hanviet_with_preserved_chars,
+)
+from batch_splitter import translate_with_isolation_async, FatalTranslationError
+from build_metrics import DEFAULT_REPORT_FILE, METRICS, run_report, write_report
+from build_metrics import print_summary as print_metrics
+from cjk_text import count_chinese_characters
+from quota_scheduler import QuotaScheduler, load_credential_pool, DEFAULT_POOL_FILE
+from stage_profiler import PROFILER, add_profile_arguments, finish_and_print, start_from_args
+from translation_cache import TranslationCache, DEFAULT_CACHE_FILE
+from translation_providers import StubConfig, StubProvider, pack_batches
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+VOCAB_CSV_DIR = PROJECT_ROOT / "vocabCsv"
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+HANVIET_FILE = VOCAB_CSV_DIR / "hanviet.csv"
+
+DEFAULT_REQUEST_LATENCY = 0.5  # Seconds per translation request, for --plan estimates
+
+TOCFL_CSV_FILES = {
+    1: "TOCFL - 入門級.csv",
+    2: "TOCFL - 基礎級.csv",
+    3: "TOCFL - 進階級.csv",
+    4: "TOCFL - 高階級.csv",
+    5: "TOCFL - 流利級.csv",
+}
+
+
+@dataclass(frozen=True)
+class TranslationStep:
+    field: str  # Output field filled by this step
+    source_field: str  # Field holding the text to translate
+    source: str  # Source language code
+    target: str  # Target language code
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    kind: str  # "hsk", "tocfl", "kanji" or "sentences"
+    input_file: Path
+    output_file: Path
+    steps: tuple
+    batch_size: int
+    level: Optional[int] = None
+
+
+@dataclass
+class BuildOptions:
+    tocfl_level: Optional[int] = None  # Only sentences of this TOCFL level
+    max_rows: Optional[int] = None  # Only the first N matching sentences
+    output_dir: Optional[Path] = None  # Write here instead of mobile/data
+    request_latency: float = DEFAULT_REQUEST_LATENCY
+
+
+HSK_STEPS = (
+    TranslationStep("traditionalChinese", "simplifiedChinese", "zh-CN", "zh-TW"),
+    TranslationStep("vietnamese", "simplifiedChinese", "zh-CN", "vi"),
+)
+TOCFL_STEPS = (
+    TranslationStep("simplifiedChinese", "traditionalChinese", "zh-TW", "zh-CN"),
+    TranslationStep("vietnamese", "traditionalChinese", "zh-TW", "vi"),
+    TranslationStep("english", "traditionalChinese", "zh-TW", "en"),
+)
+KANJI_STEPS = (TranslationStep("viet", "english", "en", "vi"),)
+# Traditional is produced first; the remaining steps translate from it
+SENTENCE_STEPS = (
+    TranslationStep("traditionalChinese", "simplifiedChinese", "zh-CN", "zh-TW"),
+    TranslationStep("viet", "traditionalChinese", "zh-TW", "vi"),
+    TranslationStep("english", "traditionalChinese", "zh-TW", "en"),
+    TranslationStep("writtenCantonese", "traditionalChinese", "zh-TW", "yue"),
+)
+
+
+def _build_dataset_specs():
+    specs = {}
+    for level in range(1, 7):
+        specs[f"hsk{level}"] = DatasetSpec(
+            f"hsk{level}",
+            "hsk",
+            VOCAB_CSV_DIR / f"HSK - Level {level}.csv",
+            MOBILE_DATA_DIR / f"hsk_level{level}.json",
+            HSK_STEPS,
+            batch_size=200,
+            level=level,
+        )
+    for level, filename in TOCFL_CSV_FILES.items():
+        specs[f"tocfl{level}"] = DatasetSpec(
+            f"tocfl{level}",
+            "tocfl",
+            VOCAB_CSV_DIR / filename,
+            MOBILE_DATA_DIR / f"tocfl_level{level}.json",
+            TOCFL_STEPS,
+            batch_size=200,
+            level=level,
+        )
+    for grade in (1, 2):
+        specs[f"kanji{grade}"] = DatasetSpec(
+            f"kanji{grade}",
+            "kanji",
+            VOCAB_CSV_DIR / f"Kyoiku Kanji - Grade {grade}.csv",
+            MOBILE_DATA_DIR / f"kanji_grade{grade}.json",
+            KANJI_STEPS,
+            batch_size=100,
+            level=grade,
+        )
+    specs["sentences"] = DatasetSpec(
+        "sentences",
+        "sentences",
+        VOCAB_CSV_DIR / "sentences.csv",
+        MOBILE_DATA_DIR / "sentances.json",
+        SENTENCE_STEPS,
+        batch_size=50,
+    )
+    return specs
+
+
+DATASETS = _build_dataset_specs()
+DATASET_GROUPS = {
+    "hsk": [n for n in DATASETS if n.startswith("hsk")],
+    "tocfl": [n for n in DATASETS if n.startswith("tocfl")],
+    "kanji": [n for n in DATASETS if n.startswith("kanji")],
+    "all": list(DATASETS),
+}
+
+
+def resolve_datasets(names):
+    """Expand dataset/group names into DatasetSpecs (in canonical order)"""
+    selected = set()
+    for name in names:
+        if name in DATASET_GROUPS:
+            selected.update(DATASET_GROUPS[name])
+        elif name in DATASETS:
+            selected.add(name)
+        else:
+            raise SystemExit(
+                f"❌ Unknown dataset '{name}'. Choose from: "
+                f"{', '.join(list(DATASET_GROUPS) + list(DATASETS))}"
+            )
+    return [DATASETS[n] for n in DATASETS if n in selected]
+
+
+def clean_word_type(text):
+    """Remove word type annotations like (N), (VA), etc."""
+    return re.sub(r"\s*\([^)]*\)\s*$", "", text).strip()
+
+
+# --- Readers: source rows -> records holding the untranslated fields ---
+
+
+def iter_hsk_rows(spec, options):
+    with open(spec.input_file, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "id": int(row["No"]),
+                "simplifiedChinese": row["Chinese"],
+                "pinyin": row["Pinyin"],
+                "english": row["English"],
+            }
+
+
+def iter_tocfl_rows(spec, options):
+    next_id = 1
+    with open(spec.input_file, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            chinese = clean_word_type(row["詞彙"])
+            if not chinese:
+                continue
+            yield {
+                "id": next_id,
+                "traditionalChinese": chinese,
+                "pinyin": row["漢語拼音"].strip(),
+            }
+            next_id += 1
+
+
+def iter_kanji_rows(spec, options):
+    with open(spec.input_file, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "kanji": row["Kanji"].strip(),
+                "onyomi": row["On'yomi"].strip(),
+                "kunyomi": row["Kun'yomi"].strip(),
+                "english": row["English"].strip(),
+            }
+
+
+def iter_sentence_rows(spec, options):
+    count = 0
+    with open(spec.input_file, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            tocfl_level = row.get("TOCFL Level", "").strip()
+            if options.tocfl_level is not None and tocfl_level != str(options.tocfl_level):
+                continue
+            if options.max_rows and count >= options.max_rows:
+                break
+            count += 1
+            yield {
+                "simplifiedChinese": row.get("Characters", "").strip(),
+                "pinyin": row.get("Pinyin", "").strip(),
+                "english": row.get("Meaning", "").strip(),
+                "hsk_level": row.get("HSK Level", "").strip(),
+                "tocfl_level": tocfl_level,
+            }
+
+
+READERS = {
+    "hsk": iter_hsk_rows,
+    "tocfl": iter_tocfl_rows,
+    "kanji": iter_kanji_rows,
+    "sentences": iter_sentence_rows,
+}
+
+
+def iter_records(spec, options):
+    """Stream a dataset's source rows as records (filters applied)"""
+    return READERS[spec.kind](spec, options)
+
+
+def read_records(spec, options):
+    return list(iter_records(spec, options))
+
+
+# --- Local annotation: jyutping, Han Viet, character counts ---
+
+
+class Annotator:
+    """Loads the Jyutping library and Han Viet table once and builds final entries"""
+
+    def __init__(self, hanviet_file=HANVIET_FILE):
+        self.hanviet_file = hanviet_file
+        self._hanviet_data = None
+        self._jyutping = None
+        # Words repeat across levels (see build_lexicon.py): annotate each text once
+        self._jyutping_cache = {}
+        self._hanviet_cache = {}
+
+    @property
+    def hanviet_data(self):
+        if self._hanviet_data is None:
+            self._hanviet_data = load_hanviet_csv(self.hanviet_file)
+        return self._hanviet_data
+
+    def jyutping(self, text):
+        if not text:
+            return ""
+        if text in self._jyutping_cache:
+            METRICS.increment("annotation_memo_hits", field="jyutping")
+        else:
+            with METRICS.timer("jyutping"):
+                self._jyutping_cache[text] = self._convert_jyutping(text)
+        return self._jyutping_cache[text]
+
+    def _convert_jyutping(self, text):
+        if self._jyutping is None:
+            import pinyin_jyutping
+
+            self._jyutping = pinyin_jyutping.PinyinJyutping()
+        try:
+            return self._jyutping.jyutping(text, tone_numbers=True, spaces=True)
+        except Exception as e:
+            print(f"  ⚠️  Jyutping error for '{text[:20]}': {e}")
+            return ""
+
+    def hanviet_word(self, traditional):
+        if traditional in self._hanviet_cache:
+            METRICS.increment("annotation_memo_hits", field="hanviet")
+            return self._hanviet_cache[traditional]
+        hanviet_data = self.hanviet_data
+        with METRICS.timer("hanviet"):
+            reading = find_hanviet_reading_with_multiple(
+                {"traditionalChinese": traditional}, hanviet_data
+            )
+        self._hanviet_cache[traditional] = reading if reading else ""
+        return self._hanviet_cache[traditional]
+
+    def hanviet_sentence(self, traditional):
+        hanviet_data = self.hanviet_data
+        with METRICS.timer("hanviet"):
+            return get_hanviet_with_preserved_chars(traditional, hanviet_data)
+
+    def finish(self, kind, record):
+        """Turn a translated record into an output entry (same key order as the scripts)"""
+        if kind == "hsk":
+            return {
+                "id": record["id"],
+                "simplifiedChinese": record["simplifiedChinese"],
+                "traditionalChinese": record["traditionalChinese"],
+                "pinyin": record["pinyin"],
+                "jyutping": self.jyutping(record["simplifiedChinese"]),
+                "english": record["english"],
+                "vietnamese": record["vietnamese"],
+                "characterCount": count_chinese_characters(record["simplifiedChinese"]),
+                "hanviet": self.hanviet_word(record["traditionalChinese"]),
+            }
+        if kind == "tocfl":
+            return {
+                "id": record["id"],
+                "simplifiedChinese": record["simplifiedChinese"],
+                "traditionalChinese": record["traditionalChinese"],
+                "pinyin": record["pinyin"],
+                "jyutping": self.jyutping(record["traditionalChinese"]),
+                "english": record["english"],
+                "vietnamese": record["vietnamese"],
+                "characterCount": count_chinese_characters(record["traditionalChinese"]),
+                "hanviet": self.hanviet_word(record["traditionalChinese"]),
+            }
+        if kind == "kanji":
+            return {
+                "kanji": record["kanji"],
+                "onyomi": record["onyomi"],
+                "kunyomi": record["kunyomi"],
+                "hanviet": self.hanviet_word(record["kanji"]),
+                "viet": record["viet"],
+                "english": record["english"],
+            }
+        traditional = record["traditionalChinese"]
+        written_cantonese = record["writtenCantonese"]
+        return {
+            "pinyin": record["pinyin"],
+            "hanviet": self.hanviet_sentence(traditional),
+            "jyutping": self.jyutping(traditional),
+            "writtenCantonese": written_cantonese,
+            "cantoneseJyutping": self.jyutping(written_cantonese),
+            "viet": record["viet"],
+            "english": record["english"],
+            "hsk_level": record["hsk_level"],
+            "tocfl_level": record["tocfl_level"],
+            "traditionalChinese": traditional,
+            "simplifiedChinese": record["simplifiedChinese"],
+        }
+
+
+# --- Planning (dry run) ---
+
+
+@dataclass
+class StepPlan:
+    dataset: str
+    step: TranslationStep
+    texts: int = 0  # Non-empty texts in the dataset
+    unique: int = 0  # After deduplication (within the whole run)
+    cached: int = 0  # Already in the cache (or translated earlier in this run)
+    requests: int = 0
+    chars: int = 0  # Billed characters
+    estimated: bool = False  # Source text depends on an uncached earlier step
+
+
+@dataclass
+class BuildPlan:
+    steps: list = field(default_factory=list)
+    rows: dict = field(default_factory=dict)  # dataset -> record count
+
+    @property
+    def requests(self):
+        return sum(s.requests for s in self.steps)
+
+    @property
+    def chars(self):
+        return sum(s.chars for s in self.steps)
+
+    def chars_by_target(self):
+        totals = {}
+        for s in self.steps:
+            totals[s.step.target] = totals.get(s.step.target, 0) + s.chars
+        return totals
+
+    def hit_ratio(self):
+        unique = sum(s.unique for s in self.steps)
+        cached = sum(s.cached for s in self.steps)
+        return cached / unique if unique else 1.0
+
+
+def plan_build(specs, cache, options, max_batch_chars):
+    """Work out every request the build would send, without sending any"""
+    plan = BuildPlan()
+    # Texts that will be translated by earlier steps of this run
+    planned = {}
+
+    for spec in specs:
+        records = read_records(spec, options)
+        plan.rows[spec.name] = len(records)
+        # Best known value of each produced field, per record
+        produced = [dict(r) for r in records]
+
+        for step in spec.steps:
+            step_plan = StepPlan(spec.name, step)
+            texts = [r.get(step.source_field, "") for r in produced]
+            depends_on_earlier = any(
+                s.field == step.source_field for s in spec.steps[: spec.steps.index(step)]
+            )
+            if depends_on_earlier and any(
+                r.get(f"_estimated_{step.source_field}") for r in produced
+            ):
+                step_plan.estimated = True
+
+            unique = list(dict.fromkeys(t for t in texts if t))
+            step_plan.texts = sum(1 for t in texts if t)
+            step_plan.unique = len(unique)
+
+            key = (step.source, step.target)
+            already = planned.setdefault(key, {})
+            cached = cache.get_many(step.source, step.target, unique)
+            misses = [t for t in unique if t not in cached and t not in already]
+            step_plan.cached = len(unique) - len(misses)
+
+            batches = pack_batches(misses, spec.batch_size, max_batch_chars)
+            step_plan.requests = len(batches)
+            step_plan.chars = sum(len(t) for t in misses)
+            for t in misses:
+                already[t] = None
+
+            # Feed later steps: cached translation if known, else the source as a proxy
+            for record, text in zip(produced, texts):
+                if text in cached:
+                    record[step.field] = cached[text]
+                else:
+                    record[step.field] = text
+                    record[f"_estimated_{step.field}"] = bool(text)
+
+            plan.steps.append(step_plan)
+    return plan
+
+
+def provider_rate(provider):
+    """(total characters per minute or None, concurrency) of a provider or pool"""
+    if isinstance(provider, QuotaScheduler):
+        quotas = [s.window.limit for s in provider.slots]
+        total = None if any(q is None for q in quotas) else sum(quotas)
+        return total, provider.limits.max_concurrency
+    return provider.limits.chars_per_minute, provider.limits.max_concurrency
+
+
+def print_plan(plan, provider, options):
+    print(f"\n📋 Build plan (dry run, no requests sent)")
+    print("=" * 72)
+    for name, rows in plan.rows.items():
+        print(f"📂 {name}: {rows} rows")
+    print()
+    print(f"{'dataset':<11}{'step':<24}{'texts':>7}{'unique':>8}{'cached':>8}{'requests':>9}{'chars':>10}")
+    for s in plan.steps:
+        step_name = f"{s.step.source}→{s.step.target} ({s.step.field})"
+        marker = "~" if s.estimated else " "
+        print(
+            f"{s.dataset:<11}{step_name[:23]:<24}{s.texts:>7}{s.unique:>8}{s.cached:>8}"
+            f"{s.requests:>9}{marker}{s.chars:>9,}"
+        )
+    print("-" * 72)
+
+    chars_per_minute, concurrency = provider_rate(provider)
+    request_time = plan.requests * options.request_latency / max(1, concurrency)
+    quota_time = plan.chars / chars_per_minute * 60 if chars_per_minute else 0.0
+    wall_time = max(request_time, quota_time)
+
+    print(f"🌐 Requests: {plan.requests}")
+    print(f"🔤 Billed characters: {plan.chars:,}")
+    for target, chars in sorted(plan.chars_by_target().items()):
+        print(f"   → {target}: {chars:,}")
+    print(f"💾 Cache hit ratio: {plan.hit_ratio():.1%}")
+    rate = f"{chars_per_minute:,} chars/min" if chars_per_minute else "no character quota"
+    print(
+        f"⏱️  Expected wall time: {wall_time:.1f}s "
+        f"({rate}, {concurrency} concurrent requests, {options.request_latency}s/request)"
+    )
+    if any(s.estimated for s in plan.steps):
+        print("   ~ depends on uncached Traditional Chinese; source text used as the estimate")
+
+
+# --- Build ---
+
+
+async def translate_texts(texts, step, provider, cache, batch_size, context):
+    """Translate texts for one step using the cache first; returns one result per text"""
+    unique = list(dict.fromkeys(t for t in texts if t))
+    known = cache.get_many(step.source, step.target, unique)
+    misses = [t for t in unique if t not in known]
+
+    if misses:
+        batches = pack_batches(misses, batch_size, provider.limits.max_batch_chars)
+        print(
+            f"  🌐 {step.source} → {step.target}: {len(misses)} texts "
+            f"in {len(batches)} batches ({len(unique) - len(misses)} cached)"
+        )
+        results = await asyncio.gather(
+            *(
+                translate_with_isolation_async(
+                    batch,
+                    lambda chunk: provider.translate_batch(chunk, step.source, step.target),
+                    context={**context, "source": step.source, "target": step.target},
+                )
+                for batch in batches
+            )
+        )
+        for batch, translations in zip(batches, results):
+            pairs = list(zip(batch, translations))
+            cache.put_many(step.source, step.target, pairs, provider=provider.name)
+            known.update((text, tr) for text, tr in pairs if tr)
+
+    return [known.get(t, "") if t else "" for t in texts]
+
+
+def output_path(spec, options):
+    if options.output_dir:
+        return Path(options.output_dir) / spec.output_file.name
+    return spec.output_file
+
+
+def write_entries(entries, path):
+    os.makedirs(Path(path).parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+
+
+@contextlib.contextmanager
+def stage(name, **labels):
+    """Stage timer that also profiles the stage under --profile
+
+    The timer runs inside the profiler stage, so the metrics never include the
+    profiler's own snapshot time.
+    """
+    with PROFILER.stage("-".join([name, *labels.values()])), METRICS.timer(name, **labels):
+        yield
+
+
+async def build_dataset(spec, provider, cache, annotator, options):
+    with stage("read"):
+        records = read_records(spec, options)
+    METRICS.increment("rows_read", len(records), dataset=spec.name)
+    print(f"🚀 {spec.name}: {len(records)} rows from {spec.input_file.name}")
+
+    for step in spec.steps:
+        texts = [r.get(step.source_field, "") for r in records]
+        with stage("translate", target=step.target):
+            translations = await translate_texts(
+                texts, step, provider, cache, spec.batch_size, {"dataset": spec.name}
+            )
+        for record, translation in zip(records, translations):
+            record[step.field] = translation
+
+    with stage("annotate"):
+        entries = [annotator.finish(spec.kind, record) for record in records]
+    path = output_path(spec, options)
+    with stage("write"):
+        write_entries(entries, path)
+    METRICS.increment("entries_written", len(entries), dataset=spec.name)
+    print(f"✅ {spec.name}: {len(entries)} entries → {path}")
+    return entries
+
+
+async def run_build(specs, provider, cache, options):
+    annotator = Annotator()
+    try:
+        for spec in specs:
+            await build_dataset(spec, provider, cache, annotator, options)
+    finally:
+        await provider.close()
+
+
+def make_build_provider(args):
+    if args.stub:
+        return StubProvider(StubConfig(latency=args.stub_latency))
+    return load_credential_pool(args.pool)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Build mobile/data JSON files from the vocabulary CSVs."
+    )
+    parser.add_argument(
+        "datasets",
+        nargs="+",
+        help=f"Datasets or groups: {', '.join(list(DATASET_GROUPS) + list(DATASETS))}",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: print requests, characters, wall time and cache hit ratio",
+    )
+    parser.add_argument("--tocfl-level", type=int, help="Only sentences of this TOCFL level")
+    parser.add_argument("--max-rows", type=int, help="Only the first N matching sentences")
+    parser.add_argument("--output-dir", help="Write JSON here instead of mobile/data")
+    parser.add_argument(
+        "--cache",
+        default=str(DEFAULT_CACHE_FILE),
+        help="Translation cache file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--pool",
+        default=str(DEFAULT_POOL_FILE),
+        help="Credential pool file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stub", action="store_true", help="Use the in-process stub translator (no network)"
+    )
+    parser.add_argument(
+        "--stub-latency", type=float, default=0.0, help="Seconds per stub request"
+    )
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="Regenerate the app's data shards and manifest afterwards (see data_shards.py)",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Regenerate the app's search indexes afterwards (see search_index.py)",
+    )
+    parser.add_argument(
+        "--facets",
+        action="store_true",
+        help="Regenerate the app's facet bitmaps afterwards (see facet_bitmaps.py)",
+    )
+    parser.add_argument(
+        "--lexicon",
+        action="store_true",
+        help="Regenerate lexicon.json and the classifier word lists (see build_lexicon.py)",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Export all datasets to one SQLite database afterwards (see export_sqlite.py)",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Add batch jobs to the work queue instead of building (see work_queue.py)",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Build one dataset at a time instead of running the stages in parallel",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Annotation processes for the staged build (default: CPUs - 1, max 4)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=None,
+        help="Batches buffered between stages of the staged build",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=str(DEFAULT_REPORT_FILE),
+        help="Where to write the run's metrics report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--request-latency",
+        type=float,
+        default=DEFAULT_REQUEST_LATENCY,
+        help="Seconds per request used for --plan estimates (default: %(default)s)",
+    )
+    add_profile_arguments(parser)
+    return parser
+
+
+def options_from_args(args):
+    return BuildOptions(
+        tocfl_level=args.tocfl_level,
+        max_rows=args.max_rows,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        request_latency=args.request_latency,
+    )
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    specs = resolve_datasets(args.datasets)
+    options = options_from_args(args)
+    provider = make_build_provider(args)
+
+    if args.plan:
+        # Planning only reads the cache: never create or modify the file
+        if os.path.exists(args.cache):
+            cache = TranslationCache(args.cache, read_only=True)
+        else:
+            cache = TranslationCache(":memory:")
+        try:
+            plan = plan_build(specs, cache, options, provider.limits.max_batch_chars)
+        finally:
+            cache.close()
+        print_plan(plan, provider, options)
+        return
+
+    if args.enqueue:
+        from work_queue import WorkQueue
+
+        queue = WorkQueue()
+        for spec in specs:
+            jobs, rows = queue.enqueue(spec, options)
+            print(f"📥 {spec.name}: {rows} rows in {jobs} jobs")
+        queue.close()
+        print("👷 Start workers with: python scripts/work_queue.py worker")
+        return
+
+    cache = TranslationCache(args.cache)
+    METRICS.reset()
+    start_from_args(args)
+    start = time.perf_counter()
+    try:
+        if args.sequential:
+            asyncio.run(run_build(specs, provider, cache, options))
+        else:
+            from staged_pipeline import (
+                DEFAULT_ANNOTATION_WORKERS,
+                DEFAULT_QUEUE_SIZE,
+                run_staged_build,
+            )
+
+            with PROFILER.stage("build"):
+                asyncio.run(
+                    run_staged_build(
+                        specs,
+                        provider,
+                        cache,
+                        options,
+                        annotation_workers=args.workers or DEFAULT_ANNOTATION_WORKERS,
+                        queue_size=args.queue_size or DEFAULT_QUEUE_SIZE,
+                    )
+                )
+    except FatalTranslationError as e:
+        print(f"❌ Translation API Exception: {e}")
+        print(f"🛑 Stopping build due to error")
+        finish_and_print()
+        exit(1)
+    finally:
+        cache.close()
+        report = run_report(
+            wall=time.perf_counter() - start,
+            datasets=[spec.name for spec in specs],
+            provider=provider.name,
+            mode="sequential" if args.sequential else "staged",
+        )
+        write_report(report, args.metrics_file)
+        print_metrics(report)
+        print(f"📝 Metrics → {args.metrics_file}")
+
+    if args.shards:
+        with PROFILER.stage("shards"):
+            from data_shards import build_shards, print_summary, write_shards
+
+            data_dir = options.output_dir or MOBILE_DATA_DIR
+            manifest, files = build_shards(data_dir)
+            write_shards(manifest, files, Path(data_dir) / "shards")
+            print_summary(manifest)
+    if args.search_index:
+        with PROFILER.stage("search_index"):
+            from search_index import build_all, write_all
+
+            data_dir = options.output_dir or MOBILE_DATA_DIR
+            write_all(build_all(data_dir), Path(data_dir) / "search")
+    if args.facets:
+        with PROFILER.stage("facets"):
+            import facet_bitmaps
+
+            data_dir = options.output_dir or MOBILE_DATA_DIR
+            facet_bitmaps.write_all(facet_bitmaps.build_all(data_dir), Path(data_dir) / "facets")
+    if args.lexicon:
+        with PROFILER.stage("lexicon"):
+            import build_lexicon
+
+            data_dir = options.output_dir or MOBILE_DATA_DIR
+            lexicon = build_lexicon.build_lexicon(data_dir)
+            lexicon_file = build_lexicon.LEXICON_FILE
+            if options.output_dir:
+                lexicon_file = Path(options.output_dir) / lexicon_file.name
+            build_lexicon.write_lexicon(lexicon, lexicon_file)
+            build_lexicon.write_vocab_csv(lexicon, options.output_dir or VOCAB_CSV_DIR)
+            build_lexicon.print_summary(lexicon)
+    if args.sqlite:
+        with PROFILER.stage("sqlite"):
+            from export_sqlite import DEFAULT_DATABASE_FILE, export_database
+
+            data_dir = options.output_dir or MOBILE_DATA_DIR
+            path = DEFAULT_DATABASE_FILE
+            if options.output_dir:
+                path = Path(options.output_dir) / DEFAULT_DATABASE_FILE.name
+            counts = export_database(path, data_dir)
+            print(f"🗄️  {sum(counts.values())} rows → {path}")
+    finish_and_print()
+    print(f"🎉 Build finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
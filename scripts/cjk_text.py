@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+CJK text normalisation shared by the build scripts.
+- clean_headword: the first variant of a headword without its annotations
+  (爸爸｜爸 → 爸爸, 白（形） → 白), the cleanup the Han Viet lookup and the
+  character count both start from
+- count_chinese_characters: Han characters in the cleaned headword, over the
+  full CJK range table (Unified Ideographs, Extensions A-I, both
+  compatibility blocks and 〇), so Extension B characters in TOCFL entries
+  count too
+- clean_headwords / count_chinese_characters_batch: the same for a whole
+  column at once. With NumPy installed the column becomes one codepoint array
+  and the variant cut, the annotation removal and the range test are array
+  operations; without it they fall back to the scalar functions. Both paths
+  give identical results
+
+Usage:
+    python scripts/cjk_text.py 爸爸｜爸 "白（形）" 𠮷
+"""
+
+import bisect
+import re
+import sys
+
+# Inclusive codepoint ranges of Han ideographs
+CJK_RANGES = (
+    (0x3007, 0x3007),  # 〇, the ideographic zero (零｜〇)
+    (0x3400, 0x4DBF),  # Extension A
+    (0x4E00, 0x9FFF),  # Unified Ideographs
+    (0xF900, 0xFAFF),  # Compatibility Ideographs
+    (0x20000, 0x2A6DF),  # Extension B
+    (0x2A700, 0x2B73F),  # Extension C
+    (0x2B740, 0x2B81F),  # Extension D
+    (0x2B820, 0x2CEAF),  # Extension E
+    (0x2CEB0, 0x2EBEF),  # Extension F
+    (0x2EBF0, 0x2EE5F),  # Extension I
+    (0x2F800, 0x2FA1F),  # Compatibility Ideographs Supplement
+    (0x30000, 0x3134F),  # Extension G
+    (0x31350, 0x323AF),  # Extension H
+)
+# [start, end + 1, start, end + 1, ...]: an odd insertion point means inside a range
+_BOUNDS = tuple(bound for start, end in CJK_RANGES for bound in (start, end + 1))
+
+CJK_CLASS = "".join(f"{chr(start)}-{chr(end)}" for start, end in CJK_RANGES)
+CJK_PATTERN = re.compile(f"[{CJK_CLASS}]")
+VARIANT_PATTERN = re.compile(r"[｜|]")
+# Non-greedy, and "." stops at newlines: the batch path relies on both
+ANNOTATION_PATTERN = re.compile(r"[（(].*?[）)]")
+
+_VARIANT_SEPARATORS = tuple(map(ord, "｜|"))
+_ANNOTATION_OPEN = tuple(map(ord, "（("))
+_ANNOTATION_CLOSE = tuple(map(ord, "）)"))
+_SENTINEL = 0xFFFFFFFF  # Between two texts in a codepoint array; above any codepoint
+
+
+def is_cjk(char):
+    return bisect.bisect_right(_BOUNDS, ord(char)) % 2 == 1
+
+
+def clean_headword(text):
+    """First variant of a headword without annotations: 爸爸｜爸 → 爸爸, 白（形） → 白"""
+    text = VARIANT_PATTERN.split(text, 1)[0]
+    if "(" in text or "（" in text:
+        text = ANNOTATION_PATTERN.sub("", text)
+    return text.strip()
+
+
+def count_cjk(text):
+    """Han characters in text as it is"""
+    return len(CJK_PATTERN.findall(text))
+
+
+def count_chinese_characters(text):
+    """Han characters in the cleaned headword (the characterCount of an entry)"""
+    return count_cjk(clean_headword(text))
+
+
+# --- Batch path ---
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _codepoints(np, texts):
+    """One uint32 array of every text, a sentinel after each, and each text's start offset"""
+    joined = "\n".join(texts)  # The separators become sentinels below
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).copy()
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    starts = np.zeros(len(texts), dtype=np.int64)
+    np.cumsum(lengths[:-1] + 1, out=starts[1:])
+    codes = np.append(codes, 0)
+    codes[starts + lengths] = _SENTINEL
+    return codes, starts, lengths
+
+
+def _any_of(codes, values):
+    mask = codes == values[0]
+    for value in values[1:]:
+        mask |= codes == value
+    return mask
+
+
+def _per_text(np, mask, starts, lengths):
+    """Number of set positions in each text"""
+    before = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return before[starts + lengths] - before[starts]
+
+
+def _han_mask(np, codes):
+    return np.searchsorted(np.array(_BOUNDS, dtype=np.uint32), codes, side="right") % 2 == 1
+
+
+def _needs_cleanup(np, codes, starts, lengths):
+    """Indexes of the texts holding a variant separator or an opening bracket"""
+    special = _any_of(codes, _VARIANT_SEPARATORS + _ANNOTATION_OPEN)
+    return np.flatnonzero(_per_text(np, special, starts, lengths))
+
+
+def _removed_mask(np, codes):
+    """Mask of the codepoints clean_headword drops (before its final strip)"""
+    sentinel = codes == _SENTINEL
+    separator = _any_of(codes, _VARIANT_SEPARATORS)
+
+    # Everything from the first variant separator to the end of its text goes
+    text = np.cumsum(sentinel) - sentinel  # Index of each position's text
+    separators = np.cumsum(separator)
+    text_start = np.concatenate(([0], np.flatnonzero(sentinel) + 1))[text]
+    cut = separators - np.concatenate(([0], separators))[text_start] > 0
+    opening = _any_of(codes, _ANNOTATION_OPEN) & ~cut
+    closing = _any_of(codes, _ANNOTATION_CLOSE) & ~cut
+
+    # Annotation removal: split each text at every closing bracket and at the
+    # points where a match cannot continue (newline, end of text). In a segment
+    # that ends in a closing bracket everything from the first opening bracket
+    # up to that bracket is removed, like the non-greedy regex. Brackets after
+    # the variant cut do not count, so those segments end without one
+    barrier = closing | sentinel | (codes == 10)
+    segment = np.cumsum(barrier) - barrier  # Segment index; a barrier ends its segment
+    barrier_at = np.flatnonzero(barrier)
+    openings = np.cumsum(opening)
+    before = np.concatenate(([0], openings))[np.concatenate(([0], barrier_at + 1))]
+    inside = openings - before[segment] > 0
+    closed = np.append(closing[barrier_at], False)[segment]
+    return (inside & closed) | cut
+
+
+def count_chinese_characters_batch(texts):
+    """count_chinese_characters of every text, as a list"""
+    texts = list(texts)
+    np = _numpy()
+    if np is None or not texts:
+        return [count_chinese_characters(text) for text in texts]
+    codes, starts, lengths = _codepoints(np, texts)
+    counts = _per_text(np, _han_mask(np, codes), starts, lengths)
+    # Only the few texts with variants or annotations need the cleanup masks
+    flagged = _needs_cleanup(np, codes, starts, lengths)
+    if flagged.size:
+        codes, starts, lengths = _codepoints(np, [texts[i] for i in flagged.tolist()])
+        dropped = _han_mask(np, codes) & _removed_mask(np, codes)
+        counts[flagged] -= _per_text(np, dropped, starts, lengths)
+    return counts.tolist()
+
+
+def clean_headwords(texts):
+    """clean_headword of every text, as a list"""
+    texts = list(texts)
+    np = _numpy()
+    if np is None or not texts:
+        return [clean_headword(text) for text in texts]
+    cleaned = [text.strip() for text in texts]
+    flagged = _needs_cleanup(np, *_codepoints(np, texts)).tolist()
+    if not flagged:
+        return cleaned
+    codes, starts, lengths = _codepoints(np, [texts[i] for i in flagged])
+    kept = ~_removed_mask(np, codes)
+    # Kept codepoints in order; each text's slice of them is contiguous
+    kept_before = np.concatenate(([0], np.cumsum(kept, dtype=np.int64))) * 4
+    data = codes[kept].astype("<u4").tobytes()
+    offsets = kept_before[starts].tolist()
+    ends = kept_before[starts + lengths].tolist()
+    for index, offset, end in zip(flagged, offsets, ends):
+        cleaned[index] = data[offset:end].decode("utf-32-le").strip()
+    return cleaned
+
+
+if __name__ == "__main__":
+    for word in sys.argv[1:]:
+        print(f"{word} → {clean_headword(word)} ({count_chinese_characters(word)} characters)")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compact columnar layout for the mobile data files.
+The regular files repeat every key ("simplifiedChinese", "traditionalChinese", ...)
+in every entry and are indented. The columnar layout stores the field names once
+and one array per field:
+
+    {
+      "format": "columnar",
+      "version": 1,
+      "count": 3,
+      "fields": ["id", "pinyin", "hsk_level"],
+      "columns": [
+        {"start": 1},                            <- 1, 2, 3 (consecutive integers)
+        ["ài", "bā", "bàba"],                    <- plain values
+        {"strings": ["1", "2"], "index": [0, 0, 1]}   <- interned values
+      ]
+    }
+
+A column is interned when the string table plus indexes are smaller than the
+plain values (levels, repeated readings, empty strings). Decoding restores the
+entries exactly, with the original key order. The app's data shards
+(data_shards.py) use this layout; mobile/data/index.js decodes them and checks
+COLUMNAR_SCHEMA_VERSION. There are no whole-file columnar copies: the shards
+are the only columnar files the app reads.
+
+Usage:
+    python scripts/columnar_format.py                 # round trip + sizes of every dataset
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+
+COLUMNAR_FORMAT = "columnar"
+COLUMNAR_SCHEMA_VERSION = 1
+
+
+def _json_size(value):
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def encode_column(values):
+    """Smallest encoding of one column: range, interned strings or plain values"""
+    if values and all(type(v) is int for v in values):
+        start = values[0]
+        if values == list(range(start, start + len(values))):
+            return {"start": start}
+
+    plain_size = _json_size(values)
+    strings = list(dict.fromkeys(values))
+    if len(strings) < len(values):
+        lookup = {value: i for i, value in enumerate(strings)}
+        interned = {"strings": strings, "index": [lookup[v] for v in values]}
+        if _json_size(interned) < plain_size:
+            return interned
+    return values
+
+
+def decode_column(column, count):
+    if isinstance(column, list):
+        return column
+    if "start" in column:
+        return list(range(column["start"], column["start"] + count))
+    strings = column["strings"]
+    return [strings[i] for i in column["index"]]
+
+
+def to_columnar(entries):
+    """Convert a list of entries (all with the same keys) to the columnar layout"""
+    fields = list(entries[0]) if entries else []
+    for position, entry in enumerate(entries):
+        if list(entry) != fields:
+            raise ValueError(f"Entry {position} has keys {list(entry)}, expected {fields}")
+    return {
+        "format": COLUMNAR_FORMAT,
+        "version": COLUMNAR_SCHEMA_VERSION,
+        "count": len(entries),
+        "fields": fields,
+        "columns": [encode_column([entry[name] for entry in entries]) for name in fields],
+    }
+
+
+def from_columnar(data):
+    """Restore the list of entries from the columnar layout"""
+    if data.get("format") != COLUMNAR_FORMAT:
+        raise ValueError("Not a columnar data file")
+    if data.get("version") != COLUMNAR_SCHEMA_VERSION:
+        raise ValueError(
+            f"Columnar schema version {data.get('version')} is not supported "
+            f"(expected {COLUMNAR_SCHEMA_VERSION})"
+        )
+    count = data["count"]
+    columns = [decode_column(column, count) for column in data["columns"]]
+    return [dict(zip(data["fields"], row)) for row in zip(*columns)]
+
+
+def check_round_trip(data_dir=MOBILE_DATA_DIR):
+    """Encode and decode every dataset file in data_dir; returns the ones that differ"""
+    from build_pipeline import DATASETS
+
+    mismatched = []
+    for spec in DATASETS.values():
+        path = Path(data_dir) / spec.output_file.name
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        encoded = json.dumps(to_columnar(entries), ensure_ascii=False, separators=(",", ":"))
+        if from_columnar(json.loads(encoded)) != entries:
+            mismatched.append(path)
+            print(f"❌ {path.name}: columnar round trip does not match")
+            continue
+        before = os.path.getsize(path)
+        after = len(encoded.encode("utf-8"))
+        print(
+            f"✅ {path.name}: {len(entries)} entries, "
+            f"{before / 1024:,.0f} KB → {after / 1024:,.0f} KB ({after / before:.0%})"
+        )
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that every mobile dataset survives the columnar round trip."
+    )
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    args = parser.parse_args()
+    if check_round_trip(args.data_dir):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
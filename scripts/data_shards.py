@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Split the mobile data files into fixed-size shards the app can load on demand.
+- Each dataset (hsk1, tocfl1, kanji1, sentences, ...) is cut into shards of
+  SHARD_SIZE entries, in the dataset's order, encoded with columnar_format.py
+- manifest.json lists every shard with its entry range, size in bytes, SHA-256
+  and facets: the levels it contains and a histogram of characterCount, so the
+  app can skip shards a filter cannot match
+- index.js maps shard ids to lazy require() calls, so a shard is only
+  evaluated when the app first asks for it (see mobile/data/index.js)
+- HSK and TOCFL words are stored once, in the lexicon shards (see
+  build_lexicon.py); the shards of a vocabulary level only hold lexicon ids
+  and the fields where an entry differs from its lexicon record
+
+Output goes to mobile/data/shards/.
+
+Usage:
+    python scripts/data_shards.py
+    python scripts/data_shards.py --shard-size 200
+    python scripts/data_shards.py --check
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from build_lexicon import build_lexicon, expand_level, record_entry
+from build_pipeline import DATASETS
+from columnar_format import to_columnar
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+SHARDS_DIR = MOBILE_DATA_DIR / "shards"
+
+SHARD_SIZE = 250  # Entries per shard
+MANIFEST_VERSION = 2
+LEXICON_IDS_FORMAT = "lexicon-ids"
+
+# Fields that carry a level inside the entries themselves
+ENTRY_LEVEL_FIELDS = ("hsk_level", "tocfl_level")
+
+
+def datasets_by_file():
+    """{data file name: DatasetSpec} for every dataset the build knows about"""
+    return {spec.output_file.name: spec for spec in DATASETS.values()}
+
+
+def shard_facets(spec, entries):
+    """Levels present in a shard and how many entries have each characterCount"""
+    facets = {}
+    if spec.level is not None:
+        facets["level"] = [spec.level]
+    for field in ENTRY_LEVEL_FIELDS:
+        values = {entry[field] for entry in entries if field in entry}
+        if values:
+            facets[field] = sorted(values)
+    counts = {}
+    for entry in entries:
+        if "characterCount" in entry:
+            key = str(entry["characterCount"])
+            counts[key] = counts.get(key, 0) + 1
+    if counts:
+        facets["characterCount"] = dict(sorted(counts.items(), key=lambda kv: int(kv[0])))
+    return facets
+
+
+def encode_shard(entries):
+    text = json.dumps(to_columnar(entries), ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def encode_id_shard(level, start, count):
+    """Lexicon ids of a level's entries start..start+count, with their overrides"""
+    overrides = {}
+    for position in range(start, start + count):
+        if str(position) in level["overrides"]:
+            overrides[str(position - start)] = level["overrides"][str(position)]
+    document = {
+        "format": LEXICON_IDS_FORMAT,
+        "start": start,
+        "ids": level["ids"][start : start + count],
+        "overrides": overrides,
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def shard_entry(shard_id, start, chunk, content):
+    return {
+        "id": shard_id,
+        "file": f"{shard_id}.json",
+        "start": start,
+        "count": len(chunk),
+        "bytes": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+def build_shards(data_dir=MOBILE_DATA_DIR, shard_size=SHARD_SIZE):
+    """Return (manifest, {file name: bytes}) for every known data file in data_dir"""
+    manifest = {"version": MANIFEST_VERSION, "shardSize": shard_size, "datasets": {}}
+    files = {}
+
+    lexicon = build_lexicon(data_dir)
+    if lexicon["entries"]:
+        records = [record_entry(record) for record in lexicon["entries"]]
+        shards = []
+        for number, start in enumerate(range(0, len(records), shard_size)):
+            chunk = records[start : start + shard_size]
+            shard_id = f"lexicon-{number:03d}"
+            content = encode_shard(chunk)
+            files[f"{shard_id}.json"] = content
+            shards.append(shard_entry(shard_id, start, chunk, content))
+        manifest["lexicon"] = {
+            "count": len(records),
+            "bytes": sum(s["bytes"] for s in shards),
+            "shards": shards,
+        }
+
+    for file_name, spec in sorted(datasets_by_file().items(), key=lambda kv: kv[1].name):
+        path = Path(data_dir) / file_name
+        if not path.exists():
+            continue
+        level = lexicon["levels"].get(spec.name)
+        if level:
+            entries = expand_level(lexicon, spec.name)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+
+        shards = []
+        for number, start in enumerate(range(0, len(entries), shard_size)):
+            chunk = entries[start : start + shard_size]
+            shard_id = f"{spec.name}-{number:03d}"
+            if level:
+                content = encode_id_shard(level, start, len(chunk))
+            else:
+                content = encode_shard(chunk)
+            files[f"{shard_id}.json"] = content
+            shards.append(
+                {
+                    **shard_entry(shard_id, start, chunk, content),
+                    "facets": shard_facets(spec, chunk),
+                }
+            )
+        manifest["datasets"][spec.name] = {
+            "source": file_name,
+            "kind": spec.kind,
+            "level": spec.level,
+            "count": len(entries),
+            "bytes": sum(s["bytes"] for s in shards),
+            "lexicon": bool(level),
+            "shards": shards,
+        }
+    return manifest, files
+
+
+def loader_module(manifest):
+    """index.js: shard id -> function that requires the shard file"""
+    lines = [
+        "// Generated by scripts/data_shards.py - do not edit.",
+        "// Each shard is only evaluated the first time its loader is called.",
+        "import manifest from './manifest.json';",
+        "",
+        "export { manifest };",
+        "",
+        "export const shardLoaders = {",
+    ]
+    groups = [manifest["lexicon"]] if "lexicon" in manifest else []
+    groups += manifest["datasets"].values()
+    for group in groups:
+        for shard in group["shards"]:
+            lines.append(f"  '{shard['id']}': () => require('./{shard['file']}'),")
+    lines += ["};", ""]
+    return "\n".join(lines)
+
+
+def write_shards(manifest, files, shards_dir=SHARDS_DIR):
+    # Remove shards of an earlier run (the shard count may have shrunk)
+    if Path(shards_dir).exists():
+        shutil.rmtree(shards_dir)
+    os.makedirs(shards_dir)
+    for name, content in files.items():
+        (Path(shards_dir) / name).write_bytes(content)
+    with open(Path(shards_dir) / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    (Path(shards_dir) / "index.js").write_text(loader_module(manifest), encoding="utf-8")
+
+
+def check_shards(manifest, files, shards_dir=SHARDS_DIR):
+    """List the shard files that are missing or differ from the data files"""
+    stale = []
+    manifest_path = Path(shards_dir) / "manifest.json"
+    if not manifest_path.exists() or json.loads(manifest_path.read_text("utf-8")) != manifest:
+        stale.append(manifest_path.name)
+    for name, content in files.items():
+        path = Path(shards_dir) / name
+        if not path.exists() or path.read_bytes() != content:
+            stale.append(name)
+    return stale
+
+
+def print_summary(manifest):
+    if "lexicon" in manifest:
+        lexicon = manifest["lexicon"]
+        print(
+            f"✅ lexicon: {lexicon['count']} words in {len(lexicon['shards'])} shards "
+            f"({lexicon['bytes'] / 1024:,.0f} KB)"
+        )
+    for name, dataset in manifest["datasets"].items():
+        print(
+            f"✅ {name}: {dataset['count']} entries in {len(dataset['shards'])} shards "
+            f"({dataset['bytes'] / 1024:,.0f} KB)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write lazily loadable shards and a manifest for the mobile data."
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=SHARD_SIZE,
+        help="Entries per shard (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output-dir", default=str(SHARDS_DIR), help="Output directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Only report shards that are out of date"
+    )
+    args = parser.parse_args()
+
+    manifest, files = build_shards(args.data_dir, args.shard_size)
+    if args.check:
+        stale = check_shards(manifest, files, args.output_dir)
+        for name in stale:
+            print(f"⚠️  {name} is out of date")
+        if stale:
+            print(f"❌ {len(stale)} shard files need regenerating")
+            exit(1)
+        print("✅ Shards are up to date")
+        return
+
+    write_shards(manifest, files, args.output_dir)
+    print_summary(manifest)
+    print(f"📁 {len(files)} shards and manifest.json → {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+"""
+In-memory query engine over every mobile dataset, with the filters of
+CharacterListScreen.js:
+- type and levels (selectedType / selectedLevels; sentences have no levels)
+- single vs multi-character words (characterFilter; HSK and TOCFL only, same
+  rule as the single/multi facet bitmaps)
+- enabled/disabled items (enabledFilter) against the app's disabled sets, with
+  the keys the app stores: "<level>-<id>" for HSK, the id for TOCFL (level 1;
+  other levels use "<level>-<id>"), the kanji, "sentence-<index>" for sentences
+- search over the same fields with the same folding as search_index.py
+  ("xuesheng" finds "xuéshēng", "hoc" finds "học"); whitespace is also folded
+  out of pinyin and of the query, so "xue sheng" finds both HSK's spaced
+  "xué shēng" and TOCFL's unspaced "xuéshēng"
+
+All datasets share one row space (dataset by dataset, in DATASETS order, so the
+rows of a dataset are a contiguous range). Every field is a dictionary-encoded
+column: an array('I') of codes into a table of interned values. Queries run on
+indexes built at load time (row ranges per dataset, row arrays per
+single/multi facet, disabled key → rows, bigram and character postings) and
+return a lazy Results: counting and paging skip the disabled rows by binary
+search, or count and walk the set bits of a bitset (searches and the disabled
+filter), instead of materialising the filtered list.
+
+Usage:
+    python scripts/dataset_query.py hsk --levels 1 2 --characters multi --limit 5
+    python scripts/dataset_query.py tocfl --levels 1 2 3 --search "xue sheng"
+    python scripts/dataset_query.py --all --search 学 --disabled disabled.json
+    python scripts/dataset_query.py --bench
+"""
+
+import argparse
+import bisect
+import json
+import statistics
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from build_pipeline import DATASETS
+from facet_bitmaps import entry_length
+from search_index import SEARCH_FIELDS, build_fold_table, fold_text
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+
+KINDS = ("hsk", "tocfl", "kanji", "sentences")
+CHARACTER_FILTERS = ("all", "single", "multi")
+ENABLED_FILTERS = ("all", "enabled", "disabled")
+CHARACTER_FILTER_KINDS = ("hsk", "tocfl")  # The app only offers the filter for these
+NO_LENGTH = 0xFFFF  # lengths entry of rows without a character count
+FIELD_SEPARATOR = "\x00"  # Between the folded fields of a row, so matches stay in one field
+COMPACT_FIELDS = ("pinyin",)  # Also searched without whitespace (HSK spaces syllables, TOCFL not)
+
+
+class Column:
+    """Dictionary-encoded column: a code per row into a table of interned values"""
+
+    __slots__ = ("codes", "values", "lookup")
+
+    def __init__(self, rows=0):
+        self.codes = array("I", bytes(4 * rows))  # Code 0 is "field absent"
+        self.values = [None]
+        self.lookup = {}
+
+    def append(self, value):
+        key = (type(value), value)  # Keeps 1 and True apart
+        code = self.lookup.get(key)
+        if code is None:
+            code = self.lookup[key] = len(self.values)
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+        self.codes.append(code)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+
+class DatasetInfo:
+    __slots__ = ("name", "kind", "level", "start", "end", "fields")
+
+    def __init__(self, name, kind, level, start, end, fields):
+        self.name = name
+        self.kind = kind
+        self.level = level
+        self.start = start
+        self.end = end
+        self.fields = fields  # Field order of the data file
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"DatasetInfo({self.name}, rows {self.start}-{self.end})"
+
+
+class Entry:
+    """One row of the store, read from the columns on access"""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def dataset(self):
+        return self.store.dataset(self.row)
+
+    @property
+    def position(self):
+        """Index in its dataset (datasetIndex in the app)"""
+        return self.row - self.dataset.start
+
+    @property
+    def level(self):
+        return self.dataset.level
+
+    @property
+    def disabled_key(self):
+        return self.store.disabled_key(self.row)
+
+    def get(self, field, default=None):
+        column = self.store.columns.get(field)
+        value = column[self.row] if column else None
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def to_dict(self):
+        """The entry as in its data file"""
+        entry = {}
+        for field in self.dataset.fields:
+            value = self.store.columns[field][self.row]
+            if value is not None:
+                entry[field] = value
+        return entry
+
+    def __eq__(self, other):
+        return isinstance(other, Entry) and (self.store, self.row) == (other.store, other.row)
+
+    def __hash__(self):
+        return hash(self.row)
+
+    def __repr__(self):
+        return f"Entry({self.dataset.name}[{self.position}])"
+
+
+@dataclass(frozen=True)
+class Query:
+    kind: Optional[str] = "hsk"  # selectedType; None for every dataset
+    levels: Optional[tuple] = (1,)  # selectedLevels; None for every level
+    characters: str = "all"  # characterFilter
+    enabled: str = "all"  # enabledFilter
+    search: str = ""  # searchQuery
+
+
+class Results:
+    """Rows matching a query: segments of (rows, sorted excluded positions), or a bitset"""
+
+    __slots__ = ("store", "segments", "bits", "total")
+
+    def __init__(self, store, segments=(), bits=None):
+        self.store = store
+        self.segments = segments
+        self.bits = bits
+        if bits is not None:
+            self.total = bits.bit_count()
+        else:
+            self.total = sum(len(rows) - len(excluded) for rows, excluded in segments)
+
+    def __len__(self):
+        return self.total
+
+    def rows(self, offset=0, limit=None):
+        """Row ids of the matches offset .. offset + limit, in dataset order"""
+        if self.bits is not None:
+            yield from bit_rows(self.bits, offset, limit)
+            return
+        remaining = self.total - offset if limit is None else limit
+        for rows, excluded in self.segments:
+            if remaining <= 0:
+                return
+            kept = len(rows) - len(excluded)
+            if offset >= kept:
+                offset -= kept
+                continue
+            index = nth_kept(excluded, offset)
+            skip = bisect.bisect_left(excluded, index)
+            while index < len(rows) and remaining > 0:
+                if skip < len(excluded) and excluded[skip] == index:
+                    skip += 1
+                else:
+                    yield rows[index]
+                    remaining -= 1
+                index += 1
+            offset = 0
+
+    def page(self, offset=0, limit=50):
+        return [Entry(self.store, row) for row in self.rows(offset, limit)]
+
+    def __iter__(self):
+        return (Entry(self.store, row) for row in self.rows())
+
+
+class DisabledRows:
+    """The app's disabled sets resolved to rows, reusable across queries"""
+
+    __slots__ = ("store", "rows", "bits", "_excluded")
+
+    def __init__(self, store, disabled):
+        self.store = store
+        rows = set()
+        for kind in KINDS:
+            index = store.keys[kind]
+            for key in disabled.get(kind, ()):
+                rows.update(index.get(key, ()))
+        self.rows = array("I", sorted(rows))
+        self.bits = rows_to_bits(self.rows, store.row_count)
+        self._excluded = {}  # (dataset, characters) -> positions of the rows in its segment
+
+    def in_dataset(self, info):
+        low = bisect.bisect_left(self.rows, info.start)
+        return self.rows[low : bisect.bisect_left(self.rows, info.end, low)]
+
+    def excluded(self, info, characters, segment_rows):
+        """Sorted positions in segment_rows (a dataset's rows or facet rows) that are disabled"""
+        key = (info.name, characters)
+        if key not in self._excluded:
+            rows = self.in_dataset(info)
+            if isinstance(segment_rows, range):
+                positions = [row - info.start for row in rows]
+            else:
+                positions = []
+                for row in rows:
+                    position = bisect.bisect_left(segment_rows, row)
+                    if position < len(segment_rows) and segment_rows[position] == row:
+                        positions.append(position)
+            self._excluded[key] = positions
+        return self._excluded[key]
+
+
+def rows_to_bits(rows, size):
+    """Bitset (an int, bit i for row i) of rows"""
+    data = bytearray((size + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, "little")
+
+
+def bit_rows(bits, offset=0, limit=None):
+    """Rows of the set bits offset .. offset + limit of a bitset, ascending"""
+    words = array("Q", bits.to_bytes((bits.bit_length() + 63) // 64 * 8, "little"))
+    if sys.byteorder != "little":
+        words.byteswap()
+    for index, word in enumerate(words):
+        if not word:
+            continue
+        count = word.bit_count()
+        if offset >= count:
+            offset -= count
+            continue
+        base = index * 64
+        while word:
+            low = word & -word
+            word ^= low
+            if offset:
+                offset -= 1
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    return
+                limit -= 1
+            yield base + low.bit_length() - 1
+
+
+def nth_kept(excluded, n):
+    """Index of the n-th (0-based) position that is not in the sorted excluded list"""
+    index = n
+    while True:
+        shifted = n + bisect.bisect_right(excluded, index)
+        if shifted == index:
+            return index
+        index = shifted
+
+
+class DatasetStore:
+    def __init__(self):
+        self.datasets = []  # DatasetInfo in row order
+        self.by_name = {}
+        self.columns = {}  # field -> Column
+        self.dataset_of = array("B")  # Row -> index into self.datasets
+        self.lengths = array("H")  # Row -> character count (NO_LENGTH when none)
+        self.facet_rows = {}  # (dataset, "single"/"multi") -> array of rows
+        self.facet_bits = {}  # "single"/"multi" -> rows passing that character filter
+        self.keys = {kind: {} for kind in KINDS}  # kind -> {disabled key: [rows]}
+        self.folded = []  # Row -> folded searchable fields joined by FIELD_SEPARATOR
+        self.compact = []  # Row -> folded COMPACT_FIELDS without whitespace, same separator
+        self.fold_table = {}
+        self.postings = {}  # Folded bigram or character -> array of rows
+        self._posting_bits = {}  # Bitsets of the postings queried so far
+        self._selection_bits = {}
+
+    @classmethod
+    def load(cls, data_dir=MOBILE_DATA_DIR, names=None):
+        """Store of every dataset in data_dir (or only the named ones)"""
+        store = cls()
+        for spec in DATASETS.values():
+            path = Path(data_dir) / spec.output_file.name
+            if (names and spec.name not in names) or not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                store.add_dataset(spec, json.load(f))
+        store.build_indexes()
+        return store
+
+    @property
+    def row_count(self):
+        return len(self.dataset_of)
+
+    def add_dataset(self, spec, entries):
+        start = self.row_count
+        fields = list(dict.fromkeys(field for entry in entries for field in entry))
+        info = DatasetInfo(spec.name, spec.kind, spec.level, start, start + len(entries), fields)
+        index = len(self.datasets)
+        self.datasets.append(info)
+        self.by_name[spec.name] = info
+
+        for field in fields:
+            if field not in self.columns:
+                self.columns[field] = Column(start)
+        for row, entry in enumerate(entries, start):
+            for field, column in self.columns.items():
+                if field in entry:
+                    column.append(entry[field])
+                else:
+                    column.codes.append(0)
+            self.dataset_of.append(index)
+            length = entry_length(spec.kind, entry)
+            self.lengths.append(NO_LENGTH if length is None else length)
+            self.keys[spec.kind].setdefault(self.disabled_key(row), []).append(row)
+
+    def build_indexes(self):
+        for info in self.datasets:
+            single, multi = array("I"), array("I")
+            for row in range(info.start, info.end):
+                length = self.lengths[row]
+                if length != NO_LENGTH:
+                    (single if length == 1 else multi).append(row)
+            self.facet_rows[(info.name, "single")] = single
+            self.facet_rows[(info.name, "multi")] = multi
+        for characters in ("single", "multi"):
+            rows = []
+            for info in self.datasets:
+                if info.kind in CHARACTER_FILTER_KINDS:
+                    rows.extend(self.facet_rows[(info.name, characters)])
+                else:
+                    rows.extend(range(info.start, info.end))  # Not filtered
+            self.facet_bits[characters] = rows_to_bits(rows, self.row_count)
+
+        texts = []  # Lowercased searchable fields of every row
+        compact_indexes = []  # Row -> positions of its COMPACT_FIELDS in its texts
+        for info in self.datasets:
+            search_fields = SEARCH_FIELDS[info.kind]
+            fields = [self.columns[field] for field in search_fields]
+            indexes = [i for i, field in enumerate(search_fields) if field in COMPACT_FIELDS]
+            for row in range(info.start, info.end):
+                texts.append([str(column[row] or "").lower() for column in fields])
+                compact_indexes.append(indexes)
+        self.fold_table = build_fold_table(text for row in texts for text in row)
+        postings = {}
+        for row, row_texts in enumerate(texts):
+            folded = [fold_text(text, self.fold_table) for text in row_texts]
+            compact = ["".join(folded[i].split()) for i in compact_indexes[row]]
+            self.folded.append(FIELD_SEPARATOR.join(folded))
+            self.compact.append(FIELD_SEPARATOR.join(compact))
+            grams = set()
+            for text in folded + compact:
+                grams.update(text[i : i + 2] for i in range(len(text) - 1))
+                grams.update(text)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: array("I", rows) for gram, rows in postings.items()}
+        self._posting_bits = {}
+        self._selection_bits = {}
+
+    # --- Rows and keys ---
+
+    def dataset(self, row):
+        return self.datasets[self.dataset_of[row]]
+
+    def entry(self, row):
+        return Entry(self, row)
+
+    def disabled_key(self, row):
+        """Key of a row in the app's disabled set of its kind"""
+        info = self.dataset(row)
+        if info.kind == "kanji":
+            return self.columns["kanji"][row]
+        if info.kind == "sentences":
+            return f"sentence-{row - info.start}"
+        item_id = self.columns["id"][row]
+        if info.kind == "tocfl" and info.level == 1:
+            return item_id
+        return f"{info.level}-{item_id}"
+
+    def resolve_disabled(self, disabled):
+        """DisabledRows of {kind: the app's disabled keys}; resolve once, query many times"""
+        if isinstance(disabled, DisabledRows):
+            return disabled
+        return DisabledRows(self, disabled or {})
+
+    # --- Search ---
+
+    def posting_bits(self, gram):
+        if gram not in self._posting_bits:
+            self._posting_bits[gram] = rows_to_bits(self.postings.get(gram, ()), self.row_count)
+        return self._posting_bits[gram]
+
+    def candidate_bits(self, folded, mask=-1):
+        """Rows of the mask bitset whose postings hold every bigram of folded"""
+        grams = {folded[i : i + 2] for i in range(len(folded) - 1)} or {folded}
+        bits = mask
+        for gram in sorted(grams, key=lambda gram: len(self.postings.get(gram, ()))):
+            bits &= self.posting_bits(gram)
+            if not bits:
+                break
+        return bits
+
+    def search(self, query, mask=-1):
+        """Results of the rows with a searchable field containing query (folded), or a
+        COMPACT_FIELDS field without whitespace containing query without whitespace,
+        among the rows of the mask bitset; None for an empty query"""
+        folded = fold_text(query.strip(), self.fold_table)
+        if not folded:
+            return None
+        compact = "".join(folded.split())
+        bits = self.candidate_bits(folded, mask)
+        if len(folded) <= 2 and compact == folded:
+            # Postings include the compact fields, so any hit is in one or the other
+            return Results(self, bits=bits)
+        # Every bigram occurs in the row, but maybe not as one run (or only compacted)
+        matched = rows_to_bits(
+            [row for row in bit_rows(bits) if folded in self.folded[row]], self.row_count
+        )
+        for row in bit_rows(self.candidate_bits(compact, mask)):
+            if compact in self.compact[row]:
+                matched |= 1 << row
+        return Results(self, bits=matched)
+
+    # --- Queries ---
+
+    def selected_datasets(self, query):
+        if query.kind is not None and query.kind not in KINDS:
+            raise ValueError(f"Unknown type '{query.kind}', choose from {KINDS}")
+        selected = []
+        for info in self.datasets:
+            if query.kind is not None and info.kind != query.kind:
+                continue
+            # Sentences have no levels, so the level selection does not apply
+            if info.kind != "sentences" and query.levels is not None:
+                if info.level not in query.levels:
+                    continue
+            selected.append(info)
+        return selected
+
+    def query(self, query, disabled=None):
+        """Results of a Query; disabled is {kind: keys} or resolve_disabled() of it"""
+        if query.characters not in CHARACTER_FILTERS:
+            raise ValueError(f"Unknown character filter '{query.characters}'")
+        if query.enabled not in ENABLED_FILTERS:
+            raise ValueError(f"Unknown enabled filter '{query.enabled}'")
+        selected = self.selected_datasets(query)
+        if query.enabled != "all":
+            disabled = self.resolve_disabled(disabled)
+
+        def character_filter(info):
+            return query.characters if info.kind in CHARACTER_FILTER_KINDS else "all"
+
+        if query.search.strip() or query.enabled == "disabled":
+            # An explicit, usually short list of rows from the bitsets
+            mask = self.selection_bits(query)
+            if query.enabled == "enabled":
+                mask &= ~disabled.bits
+            elif query.enabled == "disabled":
+                mask &= disabled.bits
+            results = self.search(query.search, mask)
+            return Results(self, bits=mask) if results is None else results
+
+        # Whole datasets (or facets) minus the disabled rows in them
+        segments = []
+        for info in selected:
+            characters = character_filter(info)
+            rows = range(info.start, info.end)
+            if characters != "all":
+                rows = self.facet_rows[(info.name, characters)]
+            excluded = []
+            if query.enabled == "enabled":
+                excluded = disabled.excluded(info, characters, rows)
+            segments.append((rows, excluded))
+        return Results(self, segments)
+
+    def selection_bits(self, query):
+        """Bitset of the rows the type, level and character filters let through"""
+        key = (query.kind, query.levels, query.characters)
+        if key not in self._selection_bits:
+            bits = 0
+            for info in self.selected_datasets(query):
+                bits |= ((1 << len(info)) - 1) << info.start
+            if query.characters != "all":
+                bits &= self.facet_bits[query.characters]
+            self._selection_bits[key] = bits
+        return self._selection_bits[key]
+
+    def page(self, query, disabled=None, offset=0, limit=50):
+        """(total, entries) of one page of a query"""
+        results = self.query(query, disabled)
+        return len(results), results.page(offset, limit)
+
+
+# --- Command line ---
+
+BENCH_QUERIES = (
+    Query("hsk", (1, 2)),
+    Query("hsk", (1, 2), characters="multi"),
+    Query("tocfl", (1, 2, 3, 4, 5), enabled="enabled"),
+    Query("tocfl", (1, 2, 3, 4, 5), characters="single", enabled="enabled"),
+    Query("tocfl", (1, 2, 3, 4, 5), enabled="disabled"),
+    Query(None, None, search="xuesheng"),
+    Query(None, None, search="hoc"),
+    Query(None, None, search="学"),
+    Query("kanji", (1, 2), search="water"),
+    Query("sentences", None, search="xie"),
+)
+
+
+def load_disabled(path):
+    """{kind: keys} from a JSON file shaped like the app's four disabled sets"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {kind: set(data.get(kind, ())) for kind in KINDS}
+
+
+def bench_disabled(store, every=7):
+    """Every n-th item of each kind disabled, for --bench"""
+    disabled = {kind: set() for kind in KINDS}
+    for row in range(0, store.row_count, every):
+        disabled[store.dataset(row).kind].add(store.disabled_key(row))
+    return disabled
+
+
+def run_bench(store, repeat=200):
+    disabled = store.resolve_disabled(bench_disabled(store))
+    print(f"⏱️  {len(BENCH_QUERIES)} queries over {store.row_count:,} rows, first page of 50")
+    for query in BENCH_QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            total, entries = store.page(query, disabled, offset=0, limit=50)
+            timings.append(time.perf_counter() - start)
+        label = f"{query.kind or 'all'} {query.levels or ''}"
+        details = f"{query.characters}/{query.enabled}"
+        if query.search:
+            details += f" '{query.search}'"
+        print(
+            f"   {label:<22} {details:<28} {total:>6,} hits "
+            f"{statistics.median(timings) * 1e6:>8.0f}µs"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the mobile datasets like the app does.")
+    parser.add_argument("kind", nargs="?", choices=KINDS, default="hsk", help="Dataset type")
+    parser.add_argument("--all", action="store_true", help="Query every dataset")
+    parser.add_argument("--levels", type=int, nargs="+", help="Levels (default: all)")
+    parser.add_argument("--characters", choices=CHARACTER_FILTERS, default="all")
+    parser.add_argument("--enabled", choices=ENABLED_FILTERS, default="all")
+    parser.add_argument("--search", default="", help="Search query")
+    parser.add_argument("--disabled", help="JSON file of disabled keys per type")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Data directory (default: %(default)s)"
+    )
+    parser.add_argument("--bench", action="store_true", help="Time a set of typical queries")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = DatasetStore.load(args.data_dir)
+    print(
+        f"📚 {store.row_count:,} rows from {len(store.datasets)} datasets, "
+        f"{len(store.postings):,} search grams ({time.perf_counter() - start:.2f}s)"
+    )
+    if args.bench:
+        run_bench(store)
+        return
+
+    query = Query(
+        kind=None if args.all else args.kind,
+        levels=tuple(args.levels) if args.levels else None,
+        characters=args.characters,
+        enabled=args.enabled,
+        search=args.search,
+    )
+    disabled = store.resolve_disabled(load_disabled(args.disabled) if args.disabled else {})
+    start = time.perf_counter()
+    total, entries = store.page(query, disabled, args.offset, args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"🔍 {total:,} matches ({elapsed * 1e6:.0f}µs)")
+    for entry in entries:
+        values = entry.to_dict()
+        headword = values.get("traditionalChinese") or values.get("kanji", "")
+        gloss = values.get("english", "")
+        print(f"   {entry.dataset.name:<10} {entry.position:>5}  {headword}  {gloss[:50]}")
+
+
+if __name__ == "__main__":
+    main()
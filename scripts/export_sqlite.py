@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Export every dataset into one SQLite database.
+- words: the master lexicon (one row per unique traditional/simplified/pinyin,
+  see build_lexicon.py); levels: one row per dataset (hsk1, tocfl3, kanji1, ...);
+  level_words: the entries of each HSK/TOCFL level as word ids, with the fields
+  that differ from the word (NULL otherwise); the vocab view puts them together
+- kanji, sentences (the app's sentences) and word_sentences, the word → sentence
+  links of sentence_xref.py in rank order
+- Indexes on levels, characterCount and the link tables, plus FTS5 tables
+  (words_fts, kanji_fts, sentences_fts) for search: Chinese text is indexed
+  character by character and Latin text without diacritics, so 朋友, "ni hao"
+  and "hoc" all match
+- --corpus adds the 18.9k sentences of vocabCsv/sentences.csv (corpus_sentences)
+  and their word links, for the build tools
+
+Results can be paged with LIMIT/OFFSET without loading a dataset into memory.
+The app would open the file through expo-sqlite, which is not a dependency yet.
+
+Usage:
+    python scripts/export_sqlite.py
+    python scripts/export_sqlite.py --corpus --output /tmp/hanzi.sqlite
+    python scripts/export_sqlite.py --query "ni hao"
+    python scripts/export_sqlite.py --query 朋友 --table sentences
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from build_lexicon import build_lexicon, expand_level, lexicon_specs
+from build_pipeline import DATASETS
+from sentence_xref import (
+    SENTENCES_CSV,
+    build_xref,
+    headword_automaton,
+    read_app_sentences,
+    read_corpus_sentences,
+)
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+DEFAULT_DATABASE_FILE = PROJECT_ROOT / "hanzi.sqlite"
+
+SCHEMA_VERSION = 1
+CJK_START = 0x2E80  # Same boundary as search_index.py
+
+# (column, entry field) of the word-level tables
+WORD_COLUMNS = (
+    ("simplified", "simplifiedChinese"),
+    ("traditional", "traditionalChinese"),
+    ("pinyin", "pinyin"),
+    ("jyutping", "jyutping"),
+    ("hanviet", "hanviet"),
+    ("english", "english"),
+    ("vietnamese", "vietnamese"),
+    ("character_count", "characterCount"),
+)
+KANJI_COLUMNS = (
+    ("kanji", "kanji"),
+    ("onyomi", "onyomi"),
+    ("kunyomi", "kunyomi"),
+    ("hanviet", "hanviet"),
+    ("viet", "viet"),
+    ("english", "english"),
+)
+SENTENCE_COLUMNS = (
+    ("simplified", "simplifiedChinese"),
+    ("traditional", "traditionalChinese"),
+    ("pinyin", "pinyin"),
+    ("jyutping", "jyutping"),
+    ("hanviet", "hanviet"),
+    ("written_cantonese", "writtenCantonese"),
+    ("cantonese_jyutping", "cantoneseJyutping"),
+    ("viet", "viet"),
+    ("english", "english"),
+)
+
+
+def _columns(columns, types=None):
+    types = types or {}
+    return ",\n    ".join(f"{name} {types.get(name, 'TEXT')}" for name, _ in columns)
+
+
+SCHEMA = f"""
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE words (
+    id INTEGER PRIMARY KEY,
+    {_columns(WORD_COLUMNS, {"character_count": "INTEGER"})}
+);
+CREATE TABLE levels (
+    dataset TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    level INTEGER,
+    count INTEGER NOT NULL
+);
+CREATE TABLE level_words (
+    dataset TEXT NOT NULL REFERENCES levels(dataset),
+    position INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL,
+    word_id INTEGER NOT NULL REFERENCES words(id),
+    {_columns(WORD_COLUMNS, {"character_count": "INTEGER"})},
+    PRIMARY KEY (dataset, position)
+) WITHOUT ROWID;
+CREATE TABLE kanji (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL REFERENCES levels(dataset),
+    position INTEGER NOT NULL,
+    {_columns(KANJI_COLUMNS)}
+);
+CREATE TABLE sentences (
+    id INTEGER PRIMARY KEY,
+    {_columns(SENTENCE_COLUMNS)},
+    hsk_level INTEGER,
+    tocfl_level INTEGER
+);
+CREATE TABLE word_sentences (
+    word_id INTEGER NOT NULL REFERENCES words(id),
+    rank INTEGER NOT NULL,
+    sentence_id INTEGER NOT NULL REFERENCES sentences(id),
+    PRIMARY KEY (word_id, rank)
+) WITHOUT ROWID;
+
+CREATE INDEX level_words_word ON level_words(word_id);
+CREATE INDEX words_character_count ON words(character_count);
+CREATE INDEX kanji_dataset ON kanji(dataset, position);
+CREATE INDEX sentences_hsk_level ON sentences(hsk_level);
+CREATE INDEX sentences_tocfl_level ON sentences(tocfl_level);
+CREATE INDEX word_sentences_sentence ON word_sentences(sentence_id);
+
+CREATE VIEW vocab AS
+SELECT
+    l.dataset, l.position, l.entry_id AS id, l.word_id,
+    {", ".join(f"COALESCE(l.{name}, w.{name}) AS {name}" for name, _ in WORD_COLUMNS)}
+FROM level_words l JOIN words w ON w.id = l.word_id;
+
+CREATE VIRTUAL TABLE words_fts USING fts5(
+    chinese, pinyin, jyutping, hanviet, english, vietnamese, pinyin_compact,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE kanji_fts USING fts5(
+    chinese, onyomi, kunyomi, hanviet, viet, english,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE sentences_fts USING fts5(
+    chinese, pinyin, jyutping, hanviet, viet, english,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+CORPUS_SCHEMA = """
+CREATE TABLE corpus_sentences (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    pinyin TEXT,
+    english TEXT,
+    hsk_level INTEGER,
+    tocfl_level INTEGER
+);
+CREATE TABLE word_corpus_sentences (
+    word_id INTEGER NOT NULL REFERENCES words(id),
+    rank INTEGER NOT NULL,
+    sentence_id INTEGER NOT NULL REFERENCES corpus_sentences(id),
+    PRIMARY KEY (word_id, rank)
+) WITHOUT ROWID;
+CREATE INDEX corpus_hsk_level ON corpus_sentences(hsk_level);
+CREATE INDEX corpus_tocfl_level ON corpus_sentences(tocfl_level);
+CREATE VIRTUAL TABLE corpus_fts USING fts5(
+    chinese, pinyin, english,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Table -> its FTS5 index (same rowids)
+FTS_TABLES = {
+    "words": "words_fts",
+    "kanji": "kanji_fts",
+    "sentences": "sentences_fts",
+    "corpus_sentences": "corpus_fts",
+}
+
+
+def spaced_cjk(*texts):
+    """Chinese characters as separate tokens: 朋友 → "朋 友" (one text per line)"""
+    return "\n".join(
+        "".join(f" {c} " if ord(c) >= CJK_START else c for c in text or "") for text in texts
+    )
+
+
+def compact_pinyin(text):
+    """Pinyin without spaces or apostrophes, so "ni hao" also finds nǐhǎo"""
+    return "".join(c for c in text if c not in " '’")
+
+
+def fts_query(query, compact_column=None):
+    """FTS5 MATCH expression: the query's characters/words as one phrase, prefix-matched
+
+    With compact_column, a Latin query also matches that column without its spaces.
+    """
+    tokens = spaced_cjk(query.strip()).split()
+    if not tokens:
+        return None
+    phrase = " ".join(token.replace('"', '""') for token in tokens)
+    match = f'"{phrase}"*'
+    compact = compact_pinyin(query.strip()).replace('"', '""')
+    if compact_column and len(tokens) > 1 and all(ord(c) < CJK_START for c in compact):
+        match += f' OR {compact_column} : "{compact}"*'
+    return match
+
+
+def parse_level(value):
+    value = str(value).strip()
+    return int(value) if value.isdigit() else None
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export_vocab(conn, lexicon):
+    conn.executemany(
+        f"INSERT INTO words VALUES (?{', ?' * len(WORD_COLUMNS)})",
+        [
+            (word_id, *(record[field] for _, field in WORD_COLUMNS))
+            for word_id, record in enumerate(lexicon["entries"])
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO words_fts "
+        "(rowid, chinese, pinyin, jyutping, hanviet, english, vietnamese, pinyin_compact) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                word_id,
+                spaced_cjk(record["simplifiedChinese"], record["traditionalChinese"]),
+                record["pinyin"],
+                record["jyutping"],
+                record["hanviet"],
+                record["english"],
+                record["vietnamese"],
+                compact_pinyin(record["pinyin"]),
+            )
+            for word_id, record in enumerate(lexicon["entries"])
+        ],
+    )
+    for spec in lexicon_specs():
+        level = lexicon["levels"].get(spec.name)
+        if level is None:
+            continue
+        rows = []
+        for position, (word_id, entry) in enumerate(
+            zip(level["ids"], expand_level(lexicon, spec.name))
+        ):
+            override = level["overrides"].get(str(position), {})
+            rows.append(
+                (
+                    spec.name,
+                    position,
+                    entry["id"],
+                    word_id,
+                    *(override.get(field) for _, field in WORD_COLUMNS),
+                )
+            )
+        conn.executemany(
+            f"INSERT INTO level_words VALUES (?, ?, ?, ?{', ?' * len(WORD_COLUMNS)})", rows
+        )
+        conn.execute(
+            "INSERT INTO levels VALUES (?, ?, ?, ?)", (spec.name, spec.kind, spec.level, len(rows))
+        )
+
+
+def export_kanji(conn, data_dir):
+    for spec in DATASETS.values():
+        path = Path(data_dir) / spec.output_file.name
+        if spec.kind != "kanji" or not path.exists():
+            continue
+        entries = read_json(path)
+        conn.execute(
+            "INSERT INTO levels VALUES (?, ?, ?, ?)",
+            (spec.name, spec.kind, spec.level, len(entries)),
+        )
+        for position, entry in enumerate(entries):
+            cursor = conn.execute(
+                f"INSERT INTO kanji (dataset, position, {', '.join(c for c, _ in KANJI_COLUMNS)}) "
+                f"VALUES (?, ?{', ?' * len(KANJI_COLUMNS)})",
+                (spec.name, position, *(entry.get(field, "") for _, field in KANJI_COLUMNS)),
+            )
+            conn.execute(
+                "INSERT INTO kanji_fts (rowid, chinese, onyomi, kunyomi, hanviet, viet, english) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cursor.lastrowid,
+                    spaced_cjk(entry.get("kanji", "")),
+                    *(entry.get(field, "") for _, field in KANJI_COLUMNS[1:]),
+                ),
+            )
+
+
+def word_ids_by_headword(lexicon):
+    ids = {}
+    for word_id, record in enumerate(lexicon["entries"]):
+        ids.setdefault(record["simplifiedChinese"], []).append(word_id)
+    return ids
+
+
+def link_rows(xref, word_ids):
+    for headword, info in xref["words"].items():
+        for word_id in word_ids[headword]:
+            for rank, sentence_id in enumerate(info["sentences"]):
+                yield word_id, rank, sentence_id
+
+
+def export_sentences(conn, data_dir, lexicon, automaton_parts):
+    path = Path(data_dir) / DATASETS["sentences"].output_file.name
+    if not path.exists():
+        return
+    entries = read_json(path)
+    conn.execute("INSERT INTO levels VALUES ('sentences', 'sentences', NULL, ?)", (len(entries),))
+    conn.executemany(
+        f"INSERT INTO sentences VALUES (?{', ?' * (len(SENTENCE_COLUMNS) + 2)})",
+        [
+            (
+                position,
+                *(entry.get(field, "") for _, field in SENTENCE_COLUMNS),
+                parse_level(entry.get("hsk_level", "")),
+                parse_level(entry.get("tocfl_level", "")),
+            )
+            for position, entry in enumerate(entries)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO sentences_fts (rowid, chinese, pinyin, jyutping, hanviet, viet, english) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                position,
+                spaced_cjk(entry.get("simplifiedChinese", ""), entry.get("traditionalChinese", "")),
+                *(entry.get(f, "") for f in ("pinyin", "jyutping", "hanviet", "viet", "english")),
+            )
+            for position, entry in enumerate(entries)
+        ],
+    )
+    xref = build_xref(read_app_sentences(path), *automaton_parts)
+    conn.executemany(
+        "INSERT INTO word_sentences VALUES (?, ?, ?)",
+        link_rows(xref, word_ids_by_headword(lexicon)),
+    )
+
+
+def export_corpus(conn, corpus_path, lexicon, automaton_parts):
+    import csv
+
+    conn.executescript(CORPUS_SCHEMA)
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    conn.executemany(
+        "INSERT INTO corpus_sentences VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                sentence_id,
+                row["Characters"],
+                row.get("Pinyin", ""),
+                row.get("Meaning", ""),
+                parse_level(row.get("HSK Level", "")),
+                parse_level(row.get("TOCFL Level", "")),
+            )
+            for sentence_id, row in enumerate(rows)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO corpus_fts (rowid, chinese, pinyin, english) VALUES (?, ?, ?, ?)",
+        [
+            (
+                sentence_id,
+                spaced_cjk(row["Characters"]),
+                row.get("Pinyin", ""),
+                row.get("Meaning", ""),
+            )
+            for sentence_id, row in enumerate(rows)
+        ],
+    )
+    xref = build_xref(read_corpus_sentences(corpus_path), *automaton_parts)
+    conn.executemany(
+        "INSERT INTO word_corpus_sentences VALUES (?, ?, ?)",
+        link_rows(xref, word_ids_by_headword(lexicon)),
+    )
+
+
+def export_database(path, data_dir=MOBILE_DATA_DIR, corpus_path=None):
+    """Write the database to path (replacing it) and return its table row counts"""
+    temp_path = Path(f"{path}.tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript(SCHEMA)
+        lexicon = build_lexicon(data_dir)
+        automaton_parts = headword_automaton(lexicon)
+        with conn:
+            conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            conn.execute(
+                "INSERT INTO meta VALUES ('created', ?)", (time.strftime("%Y-%m-%d %H:%M:%S"),)
+            )
+            export_vocab(conn, lexicon)
+            export_kanji(conn, data_dir)
+            export_sentences(conn, data_dir, lexicon, automaton_parts)
+            if corpus_path:
+                export_corpus(conn, corpus_path, lexicon, automaton_parts)
+        for fts in FTS_TABLES.values():
+            if table_exists(conn, fts):
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+        conn.commit()
+        conn.execute("VACUUM")
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in table_names(conn)
+        }
+    finally:
+        conn.close()
+    os.replace(temp_path, path)
+    return counts
+
+
+def table_names(conn):
+    return [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%fts_%' ORDER BY name"
+        )
+    ]
+
+
+def table_exists(conn, name):
+    return (
+        conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+    )
+
+
+class HanziDatabase:
+    """Read-only queries against an exported database"""
+
+    def __init__(self, path=DEFAULT_DATABASE_FILE):
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+        version = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if version is None or int(version[0]) != SCHEMA_VERSION:
+            raise ValueError(f"Database schema {version and version[0]} is not supported")
+
+    def level(self, dataset, limit=50, offset=0):
+        """One page of a dataset's entries, in dataset order"""
+        if dataset.startswith("kanji"):
+            sql = "SELECT * FROM kanji WHERE dataset = ? ORDER BY position LIMIT ? OFFSET ?"
+        else:
+            sql = "SELECT * FROM vocab WHERE dataset = ? ORDER BY position LIMIT ? OFFSET ?"
+        return [dict(row) for row in self.conn.execute(sql, (dataset, limit, offset))]
+
+    def search(self, query, table="words", limit=50, offset=0):
+        """One page of the rows of table matching query, best matches first"""
+        match = fts_query(query, "pinyin_compact" if table == "words" else None)
+        if match is None:
+            return []
+        fts = FTS_TABLES[table]
+        rows = self.conn.execute(
+            f"SELECT t.* FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid "
+            f"WHERE {fts} MATCH ? ORDER BY {fts}.rank LIMIT ? OFFSET ?",
+            (match, limit, offset),
+        )
+        return [dict(row) for row in rows]
+
+    def example_sentences(self, word_id, limit=5, corpus=False):
+        link, sentences = (
+            ("word_corpus_sentences", "corpus_sentences")
+            if corpus
+            else ("word_sentences", "sentences")
+        )
+        rows = self.conn.execute(
+            f"SELECT s.* FROM {link} l JOIN {sentences} s ON s.id = l.sentence_id "
+            f"WHERE l.word_id = ? ORDER BY l.rank LIMIT ?",
+            (word_id, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the datasets to one SQLite database.")
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output", default=str(DEFAULT_DATABASE_FILE), help="Database file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--corpus",
+        nargs="?",
+        const=str(SENTENCES_CSV),
+        help="Also export the sentence corpus (default file: vocabCsv/sentences.csv)",
+    )
+    parser.add_argument("--query", help="Search an existing database instead of exporting")
+    parser.add_argument(
+        "--table",
+        default="words",
+        choices=list(FTS_TABLES),
+        help="Table searched by --query (default: %(default)s)",
+    )
+    parser.add_argument("--limit", type=int, default=10, help="Results per page for --query")
+    parser.add_argument("--offset", type=int, default=0, help="Results to skip for --query")
+    args = parser.parse_args()
+
+    if args.query is not None:
+        database = HanziDatabase(args.output)
+        start = time.perf_counter()
+        rows = database.search(args.query, args.table, args.limit, args.offset)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🔍 {len(rows)} results in {elapsed:.2f} ms")
+        for row in rows:
+            print("   " + " | ".join(str(v) for v in list(row.values())[:6]))
+        database.close()
+        return
+
+    start = time.perf_counter()
+    counts = export_database(args.output, args.data_dir, args.corpus)
+    for table, count in counts.items():
+        print(f"   {table:<22} {count:>7} rows")
+    print(
+        f"✅ {args.output} ({os.path.getsize(args.output) / 1024:,.0f} KB) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
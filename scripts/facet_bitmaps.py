@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Precomputed facet bitmaps for the mobile datasets.
+For every dataset, one bitset per facet value, with bit i set when entry i (in
+dataset order) has that value:
+- level:<n>            dataset level (HSK/TOCFL level, kanji grade)
+- hsk_level:<v>, tocfl_level:<v>   per-entry levels of the sentences
+- characterCount:<n>   exact character count
+- single, multi        one character vs several (characterCount, or the kanji)
+- has:<field>          the field is not empty (hanviet, jyutping, translations)
+
+A filter becomes a few ANDs/ORs over bitsets instead of a chain of filter()
+calls. Bitsets are stored base64-encoded, little-endian (bit i is bit i % 8 of
+byte i // 8), in mobile/data/facets/<dataset>.json; mobile/data/index.js reads
+them into Uint32Arrays and combines them a word at a time. The Bitset class is
+the Python side of the same format.
+
+Usage:
+    python scripts/facet_bitmaps.py
+    python scripts/facet_bitmaps.py --dataset tocfl1 --facets single has:hanviet
+"""
+
+import argparse
+import base64
+import json
+import os
+import shutil
+from pathlib import Path
+
+from data_shards import datasets_by_file
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+FACETS_DIR = MOBILE_DATA_DIR / "facets"
+
+FACETS_VERSION = 1
+
+# Optional fields that get a has:<field> facet, per dataset kind
+PRESENCE_FIELDS = {
+    "hsk": ("jyutping", "hanviet", "vietnamese", "english"),
+    "tocfl": ("jyutping", "hanviet", "vietnamese", "english"),
+    "kanji": ("onyomi", "kunyomi", "hanviet", "viet"),
+    "sentences": ("jyutping", "hanviet", "writtenCantonese", "viet", "english"),
+}
+ENTRY_LEVEL_FIELDS = ("hsk_level", "tocfl_level")
+
+
+class Bitset:
+    """Fixed-size set of entry positions backed by a Python int"""
+
+    __slots__ = ("size", "bits")
+
+    def __init__(self, size, bits=0):
+        self.size = size
+        self.bits = bits
+
+    @classmethod
+    def from_positions(cls, size, positions):
+        bits = 0
+        for position in positions:
+            bits |= 1 << position
+        return cls(size, bits)
+
+    @classmethod
+    def full(cls, size):
+        return cls(size, (1 << size) - 1)
+
+    @classmethod
+    def from_base64(cls, size, text):
+        return cls(size, int.from_bytes(base64.b64decode(text), "little"))
+
+    def to_base64(self):
+        return base64.b64encode(self.bits.to_bytes((self.size + 7) // 8, "little")).decode()
+
+    def _check(self, other):
+        if self.size != other.size:
+            raise ValueError(f"Bitset sizes differ: {self.size} and {other.size}")
+
+    def __and__(self, other):
+        self._check(other)
+        return Bitset(self.size, self.bits & other.bits)
+
+    def __or__(self, other):
+        self._check(other)
+        return Bitset(self.size, self.bits | other.bits)
+
+    def __sub__(self, other):
+        self._check(other)
+        return Bitset(self.size, self.bits & ~other.bits)
+
+    def __invert__(self):
+        return Bitset(self.size, ~self.bits & ((1 << self.size) - 1))
+
+    def __contains__(self, position):
+        return bool(self.bits >> position & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __eq__(self, other):
+        return isinstance(other, Bitset) and (self.size, self.bits) == (other.size, other.bits)
+
+    def __iter__(self):
+        """Set positions in ascending order"""
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def __repr__(self):
+        return f"Bitset(size={self.size}, count={len(self)})"
+
+
+def entry_length(kind, entry):
+    if kind == "kanji":
+        return len(entry.get("kanji", ""))
+    return entry.get("characterCount")
+
+
+def compute_facets(spec, entries):
+    """{facet name: Bitset} for one dataset"""
+    size = len(entries)
+    positions = {}
+
+    def add(name, position):
+        positions.setdefault(name, []).append(position)
+
+    for position, entry in enumerate(entries):
+        if spec.level is not None:
+            add(f"level:{spec.level}", position)
+        for field in ENTRY_LEVEL_FIELDS:
+            if field in entry:
+                add(f"{field}:{entry[field]}", position)
+        length = entry_length(spec.kind, entry)
+        if length is not None:
+            if "characterCount" in entry:
+                add(f"characterCount:{length}", position)
+            add("single" if length == 1 else "multi", position)
+        for field in PRESENCE_FIELDS[spec.kind]:
+            if entry.get(field):
+                add(f"has:{field}", position)
+
+    for field in PRESENCE_FIELDS[spec.kind]:
+        positions.setdefault(f"has:{field}", [])
+    return {name: Bitset.from_positions(size, p) for name, p in sorted(positions.items())}
+
+
+def build_all(data_dir=MOBILE_DATA_DIR):
+    """{dataset: {"count", "facets": {name: Bitset}}} for every known data file"""
+    result = {}
+    for file_name, spec in sorted(datasets_by_file().items(), key=lambda kv: kv[1].name):
+        path = Path(data_dir) / file_name
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        result[spec.name] = {"count": len(entries), "facets": compute_facets(spec, entries)}
+    return result
+
+
+def loader_module(datasets):
+    lines = [
+        "// Generated by scripts/facet_bitmaps.py - do not edit.",
+        "export const facetLoaders = {",
+    ]
+    for dataset in datasets:
+        lines.append(f"  {dataset}: () => require('./{dataset}.json'),")
+    lines += ["};", ""]
+    return "\n".join(lines)
+
+
+def write_all(datasets, facets_dir=FACETS_DIR):
+    if Path(facets_dir).exists():
+        shutil.rmtree(facets_dir)
+    os.makedirs(facets_dir)
+    for dataset, info in datasets.items():
+        document = {
+            "version": FACETS_VERSION,
+            "dataset": dataset,
+            "count": info["count"],
+            "facets": {name: bits.to_base64() for name, bits in info["facets"].items()},
+        }
+        with open(Path(facets_dir) / f"{dataset}.json", "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f"✅ {dataset}: {len(info['facets'])} facets over {info['count']} entries")
+    (Path(facets_dir) / "index.js").write_text(loader_module(datasets), encoding="utf-8")
+
+
+def load_facets(dataset, facets_dir=FACETS_DIR):
+    """{facet name: Bitset} of a dataset from the generated files"""
+    with open(Path(facets_dir) / f"{dataset}.json", "r", encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != FACETS_VERSION:
+        raise ValueError(f"Facet file version {document.get('version')} is not supported")
+    count = document["count"]
+    return {name: Bitset.from_base64(count, text) for name, text in document["facets"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the facet bitmaps.")
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output-dir", default=str(FACETS_DIR), help="Output directory (default: %(default)s)"
+    )
+    parser.add_argument("--dataset", help="Dataset to inspect")
+    parser.add_argument(
+        "--facets", nargs="+", help="With --dataset: count entries having all these facets"
+    )
+    args = parser.parse_args()
+
+    if args.dataset:
+        facets = load_facets(args.dataset, args.output_dir)
+        if not args.facets:
+            for name, bits in facets.items():
+                print(f"   {name:<24} {len(bits):>6}")
+            return
+        unknown = [name for name in args.facets if name not in facets]
+        if unknown:
+            print(f"❌ Unknown facets: {', '.join(unknown)}")
+            exit(1)
+        result = facets[args.facets[0]]
+        for name in args.facets[1:]:
+            result = result & facets[name]
+        print(f"🔍 {len(result)} of {result.size} entries: {list(result)[:20]}")
+        return
+
+    write_all(build_all(args.data_dir), args.output_dir)
+    print(f"📁 Facet bitmaps → {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
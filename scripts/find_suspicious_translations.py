@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Flags likely-wrong Vietnamese/English translations in mobile/data and optionally
+re-translates only the flagged subset.
+- Scores every entry offline using signals already in the data:
+    * empty translations, or outputs that only contain punctuation
+    * echoed outputs (Chinese characters left in the translation, or the
+      Vietnamese field holding the English text)
+    * no Han Viet syllable shared with the Vietnamese translation (on its own
+      below the threshold: native Vietnamese words such as 愛 → yêu share none)
+    * a single-character word whose Vietnamese shares no syllable with its Han
+      Viet reading, with the Vietnamese of words sharing an English gloss word or
+      the character, or with the same word translated from another language
+      (愛 → giống: no word glossed "love" or containing 愛 uses "giống")
+    * the English gloss (HSK CSV) disagreeing with the machine-translated English
+      (TOCFL) for the same word; only scored on English fields
+    * the same word translated differently across datasets
+    * translation length out of proportion to the Chinese character count
+- Writes a JSON report of flagged entries with their score and reasons
+- With --retranslate, sends only the flagged texts through the batched Google V3
+  path (with fault isolation) and writes the new values back
+
+Usage:
+    python scripts/find_suspicious_translations.py
+    python scripts/find_suspicious_translations.py --threshold 0.7 --retranslate
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from batch_splitter import translate_with_isolation, FatalTranslationError
+from cjk_text import CJK_PATTERN
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+DEFAULT_REPORT_FILE = PROJECT_ROOT / "suspicious_translations.json"
+
+DEFAULT_THRESHOLD = 0.5  # Entries scoring at least this much are flagged
+BATCH_SIZE = 200  # Number of texts per re-translation request
+
+# Signal weights (a score is the sum of the signals that fire)
+WEIGHTS = {
+    "empty": 1.0,
+    "no_letters": 1.0,
+    "echoed_chinese": 1.0,
+    "vi_equals_en": 0.6,
+    "gloss_mismatch": 0.4,
+    "length_ratio": 0.4,
+    "no_hanviet_overlap": 0.4,
+    "unsupported_vietnamese": 0.2,
+    "cross_dataset_disagreement": 0.3,
+}
+
+# Which fields of each dataset come from machine translation, and from what
+# source field / language they were translated.
+# dataset prefix -> {field: (source_field, source_language, target_language)}
+TRANSLATED_FIELDS = {
+    "hsk": {"vietnamese": ("simplifiedChinese", "zh-CN", "vi")},
+    "tocfl": {
+        "vietnamese": ("traditionalChinese", "zh-TW", "vi"),
+        "english": ("traditionalChinese", "zh-TW", "en"),
+    },
+    "sentances": {"viet": ("traditionalChinese", "zh-TW", "vi")},
+    "kanji": {"viet": ("english", "en", "vi")},
+}
+
+# Fields holding a human-written English gloss (not machine translated)
+GLOSS_FIELDS = {"hsk": "english", "sentances": "english", "kanji": "english"}
+
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+ENGLISH_STOPWORDS = {
+    "a", "an", "the", "to", "of", "be", "in", "on", "at", "for", "and", "or",
+    "is", "are", "it", "one", "sb", "sth", "something", "someone",
+}
+
+
+def dataset_prefix(filename):
+    """Return the dataset prefix ('hsk', 'tocfl', 'kanji', 'sentances') of a data file"""
+    name = Path(filename).stem
+    for prefix in TRANSLATED_FIELDS:
+        if name.startswith(prefix):
+            return prefix
+    return None
+
+
+def strip_diacritics(text):
+    """Lowercase and remove Vietnamese diacritics (đ -> d)"""
+    text = text.lower().replace("đ", "d")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(c for c in decomposed if unicodedata.category(c) != "Mn")
+
+
+def syllables(text):
+    """Split text into lowercase words/syllables"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def english_stem(word):
+    """Very small suffix stripper so 'hobbies'/'hobby' and 'ended'/'end' compare equal"""
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def english_content_words(text):
+    """Stemmed lowercase English words without stopwords"""
+    return {english_stem(w) for w in syllables(text) if w not in ENGLISH_STOPWORDS}
+
+
+def chinese_length(entry):
+    """Number of Chinese characters for an entry"""
+    if entry.get("characterCount"):
+        return entry["characterCount"]
+    text = entry.get("traditionalChinese") or entry.get("kanji") or ""
+    return len(CJK_PATTERN.findall(text)) or 1
+
+
+def hanviet_overlap(vietnamese, hanviet):
+    """Share of Han Viet syllables found in the Vietnamese text (exact, then without tones)"""
+    hanviet_syllables = set(syllables(hanviet.replace("/", " ")))
+    hanviet_syllables.discard("_")
+    if not hanviet_syllables:
+        return None
+
+    vi_syllables = set(syllables(vietnamese))
+    exact = len(hanviet_syllables & vi_syllables)
+    if exact:
+        return exact / len(hanviet_syllables)
+
+    stripped_vi = {strip_diacritics(s) for s in vi_syllables}
+    stripped_hv = {strip_diacritics(s) for s in hanviet_syllables}
+    return 0.5 * len(stripped_hv & stripped_vi) / len(stripped_hv)
+
+
+def load_datasets(data_dir=DATA_DIR):
+    """Load every translated dataset file -> {path relative to project root: entries}"""
+    datasets = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        if dataset_prefix(path) is None:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            datasets[os.path.relpath(path, PROJECT_ROOT)] = json.load(f)
+    return datasets
+
+
+def build_word_index(datasets):
+    """
+    Collect per-word evidence across datasets.
+    Returns {traditional: {"glosses": set, "translated_en": set, "vietnamese": set}}
+    """
+    index = {}
+    for path, entries in datasets.items():
+        prefix = dataset_prefix(path)
+        if prefix not in ("hsk", "tocfl"):
+            continue
+        for entry in entries:
+            word = entry.get("traditionalChinese", "")
+            if not word:
+                continue
+            info = index.setdefault(
+                word, {"glosses": set(), "translated_en": set(), "vietnamese": set()}
+            )
+            english = entry.get("english", "").strip()
+            if english:
+                if prefix in GLOSS_FIELDS:
+                    info["glosses"].add(english)
+                else:
+                    info["translated_en"].add(english)
+            vietnamese = entry.get("vietnamese", "").strip()
+            if vietnamese:
+                info["vietnamese"].add(vietnamese.lower())
+    return index
+
+
+def headword(entry):
+    return entry.get("traditionalChinese") or entry.get("kanji") or ""
+
+
+def build_vietnamese_evidence(datasets):
+    """
+    Collect the Vietnamese syllables used for each English gloss word and each character.
+    Returns {"glosses": {headword: gloss words}, "english": {word: {key: syllables}},
+    "character": {char: {key: syllables}}}, key being (headword, source language
+    family) of the entry the syllables come from. Human-written glosses win over the
+    entry's own English, which may be machine-translated with the same mistakes.
+    """
+    evidence = {"glosses": {}, "english": {}, "character": {}}
+    for path, entries in datasets.items():
+        prefix = dataset_prefix(path)
+        if prefix == "sentances":
+            continue
+        for entry in entries if prefix in GLOSS_FIELDS else []:
+            gloss_words = english_content_words(entry.get(GLOSS_FIELDS[prefix], ""))
+            evidence["glosses"].setdefault(headword(entry), set()).update(gloss_words)
+
+    for path, entries in datasets.items():
+        prefix = dataset_prefix(path)
+        if prefix == "sentances":
+            continue
+        vietnamese_fields = [
+            (field, source_lang)
+            for field, (_, source_lang, target_lang) in TRANSLATED_FIELDS[prefix].items()
+            if target_lang == "vi"
+        ]
+        for entry in entries:
+            word = headword(entry)
+            for field, source_lang in vietnamese_fields:
+                value = entry.get(field, "")
+                if not word or not value:
+                    continue
+                key = (word, source_lang.split("-")[0])
+                words = set(syllables(value))
+                for gloss_word in gloss_words_of(entry, evidence):
+                    found = evidence["english"].setdefault(gloss_word, {})
+                    found.setdefault(key, set()).update(words)
+                for char in set(word):
+                    found = evidence["character"].setdefault(char, {})
+                    found.setdefault(key, set()).update(words)
+    return evidence
+
+
+def gloss_words_of(entry, evidence):
+    """English content words of the word's human glosses, else of the entry's English"""
+    glosses = evidence["glosses"].get(headword(entry))
+    return glosses if glosses else english_content_words(entry.get("english", ""))
+
+
+def vietnamese_supported(entry, value, source_lang, evidence):
+    """Whether another translation path uses a syllable of value for this meaning"""
+    own = (headword(entry), source_lang.split("-")[0])
+    words = set(syllables(value))
+    pools = [evidence["english"].get(w, {}) for w in gloss_words_of(entry, evidence)]
+    pools += [evidence["character"].get(c, {}) for c in set(own[0])]
+    # The same word translated from the same language would only confirm itself
+    return any(words & found for pool in pools for key, found in pool.items() if key != own)
+
+
+def score_value(
+    entry, field, value, source_text, word_info, source_lang=None, evidence=None
+):
+    """Return (score, reasons) for one translated field of one entry"""
+    reasons = []
+    value = (value or "").strip()
+
+    if not value:
+        reasons.append("empty")
+    elif not LETTER_PATTERN.search(value):
+        reasons.append("no_letters")
+    else:
+        if CJK_PATTERN.search(value) or value == source_text:
+            reasons.append("echoed_chinese")
+
+        is_vietnamese = field in ("vietnamese", "viet")
+        english = entry.get("english", "").strip()
+        if is_vietnamese and english and value.lower() == english.lower():
+            reasons.append("vi_equals_en")
+
+        if is_vietnamese and entry.get("hanviet"):
+            overlap = hanviet_overlap(value, entry["hanviet"])
+            if overlap == 0:
+                reasons.append("no_hanviet_overlap")
+                # A one-character word has a single meaning to check against
+                if (
+                    evidence
+                    and chinese_length(entry) == 1
+                    and not vietnamese_supported(entry, value, source_lang, evidence)
+                ):
+                    reasons.append("unsupported_vietnamese")
+
+        if word_info:
+            glosses = word_info["glosses"]
+            translated = word_info["translated_en"]
+            # The glosses are English; they say nothing about a Vietnamese field
+            if field == "english" and glosses and translated:
+                gloss_words = set().union(*(english_content_words(g) for g in glosses))
+                translated_words = set().union(
+                    *(english_content_words(t) for t in translated)
+                )
+                if gloss_words and translated_words and not (
+                    gloss_words & translated_words
+                ):
+                    reasons.append("gloss_mismatch")
+            if is_vietnamese and len(word_info["vietnamese"]) > 1:
+                reasons.append("cross_dataset_disagreement")
+
+        # Short words should not turn into long phrases (and vice versa for sentences)
+        length = chinese_length(entry)
+        words = len(syllables(value))
+        if is_vietnamese and words > max(4, 3 * length):
+            reasons.append("length_ratio")
+        elif field == "english" and words > max(6, 4 * length):
+            reasons.append("length_ratio")
+        elif length >= 6 and words * 4 < length:
+            reasons.append("length_ratio")
+
+    score = round(sum(WEIGHTS[r] for r in reasons), 2)
+    return score, reasons
+
+
+def find_suspicious(datasets, threshold=DEFAULT_THRESHOLD):
+    """Score every translated field; returns a list of flagged records"""
+    word_index = build_word_index(datasets)
+    evidence = build_vietnamese_evidence(datasets)
+    flagged = []
+
+    for path, entries in datasets.items():
+        prefix = dataset_prefix(path)
+        for position, entry in enumerate(entries):
+            word_info = word_index.get(entry.get("traditionalChinese", ""))
+            for field, (source_field, source_lang, target_lang) in TRANSLATED_FIELDS[
+                prefix
+            ].items():
+                source_text = entry.get(source_field, "")
+                score, reasons = score_value(
+                    entry,
+                    field,
+                    entry.get(field, ""),
+                    source_text,
+                    word_info,
+                    source_lang,
+                    evidence,
+                )
+                if score >= threshold:
+                    flagged.append(
+                        {
+                            "file": path,
+                            "position": position,
+                            "field": field,
+                            "source": source_text,
+                            "sourceLanguage": source_lang,
+                            "targetLanguage": target_lang,
+                            "value": entry.get(field, ""),
+                            "score": score,
+                            "reasons": reasons,
+                        }
+                    )
+
+    flagged.sort(key=lambda r: -r["score"])
+    return flagged
+
+
+def make_google_translator():
+    """Create a Google Cloud Translation V3 request function (same setup as the HSK script)"""
+    from google.cloud import translate_v3 as translate
+
+    credentials_path = PROJECT_ROOT / "translateKey.json"
+    if not credentials_path.exists():
+        print(f"❌ Error: Credentials file not found at {credentials_path}")
+        exit(1)
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(credentials_path)
+    with open(credentials_path, "r") as f:
+        project_id = json.load(f)["project_id"]
+    parent = f"projects/{project_id}/locations/global"
+    client = translate.TranslationServiceClient()
+
+    def request_translations(texts, source, target):
+        response = client.translate_text(
+            request={
+                "parent": parent,
+                "contents": texts,
+                "mime_type": "text/plain",
+                "source_language_code": source,
+                "target_language_code": target,
+            }
+        )
+        return [trans.translated_text for trans in response.translations]
+
+    return request_translations
+
+
+def retranslate_flagged(flagged, datasets, request_translations, via_english=False):
+    """Re-translate only the flagged texts in batches and write changed values back"""
+    # Group unique source texts per language pair so each text is sent once
+    groups = {}
+    for record in flagged:
+        entry = datasets[record["file"]][record["position"]]
+        source, source_lang = record["source"], record["sourceLanguage"]
+        gloss_field = GLOSS_FIELDS.get(dataset_prefix(record["file"]))
+        if via_english and gloss_field and entry.get(gloss_field):
+            source, source_lang = entry[gloss_field], "en"
+        if not source:
+            continue
+        record["_request"] = (source_lang, record["targetLanguage"], source)
+        groups.setdefault((source_lang, record["targetLanguage"]), set()).add(source)
+
+    translations = {}
+    for (source_lang, target_lang), texts in groups.items():
+        texts = sorted(texts)
+        print(f"🌐 Re-translating {len(texts)} texts {source_lang} → {target_lang}")
+        for start in range(0, len(texts), BATCH_SIZE):
+            batch = texts[start : start + BATCH_SIZE]
+            results = translate_with_isolation(
+                batch,
+                lambda chunk: request_translations(chunk, source_lang, target_lang),
+                context={"script": "suspicious", "target": target_lang},
+            )
+            for text, result in zip(batch, results):
+                translations[(source_lang, target_lang, text)] = result
+
+    changed_files = set()
+    changed = 0
+    for record in flagged:
+        new_value = translations.get(record.pop("_request", None), "")
+        if not new_value or new_value == record["value"]:
+            continue
+        path = record["file"]
+        datasets[path][record["position"]][record["field"]] = new_value
+        print(f"  ✏️  {record['source']}: {record['value']} → {new_value}")
+        record["newValue"] = new_value
+        changed_files.add(path)
+        changed += 1
+
+    for path in sorted(changed_files):
+        with open(PROJECT_ROOT / path, "w", encoding="utf-8") as f:
+            json.dump(datasets[path], f, ensure_ascii=False, indent=2)
+        print(f"💾 Updated {path}")
+
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Flag likely-wrong translations in mobile/data and optionally re-translate them."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Minimum score to flag an entry (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--report",
+        default=str(DEFAULT_REPORT_FILE),
+        help="Where to write the JSON report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--retranslate",
+        action="store_true",
+        help="Re-translate the flagged subset with Google Translate V3 and update the data files",
+    )
+    parser.add_argument(
+        "--via-english",
+        action="store_true",
+        help="When re-translating, translate the English gloss instead of the Chinese where one exists",
+    )
+    args = parser.parse_args()
+
+    datasets = load_datasets()
+    total = sum(len(entries) for entries in datasets.values())
+    print(f"🔍 Scoring {total} entries in {len(datasets)} files...")
+
+    flagged = find_suspicious(datasets, args.threshold)
+
+    by_reason = {}
+    for record in flagged:
+        for reason in record["reasons"]:
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+    print(f"⚠️  Flagged {len(flagged)} translations (threshold {args.threshold})")
+    for reason, count in sorted(by_reason.items(), key=lambda x: -x[1]):
+        print(f"   {reason}: {count}")
+    for record in flagged[:10]:
+        print(
+            f"   {record['score']:.2f} {record['source']} [{record['field']}] "
+            f"'{record['value']}' ({', '.join(record['reasons'])})"
+        )
+
+    if args.retranslate and flagged:
+        try:
+            changed = retranslate_flagged(
+                flagged, datasets, make_google_translator(), args.via_english
+            )
+        except FatalTranslationError as e:
+            print(f"❌ Translation API Exception: {e}")
+            exit(1)
+        print(f"✅ Re-translated {changed} of {len(flagged)} flagged values")
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(flagged, f, ensure_ascii=False, indent=2)
+    print(f"📁 Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
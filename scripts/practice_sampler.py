@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Weighted random draws and practice decks over the dataset store, the "random"
+of Random Hanzi without materialising the filtered list per draw.
+- draw / draws: O(1) weighted draws (with replacement) through an alias table
+  (Vose) per filter combination. Tables are built from dataset_query results
+  on first use and cached by (query, disabled rows); disabled rows
+  only count when the query filters on them, so users share the tables of
+  their unfiltered queries. Changing the weights clears the cache
+- deck / session: non-repeating shuffled decks with stable seeds. Every item
+  gets a priority from a hash of its disabled key and the seed (weighted
+  sampling without replacement, Efraimidis-Spirakis), so a deck is the same
+  for the same seed on every machine, and enabling or disabling items or
+  changing levels does not reshuffle the items that stay. A session position
+  past the end of a deck continues in the next epoch (the same seed, reshuffled)
+- Weightings: uniform (what the app does), length (longer words more often),
+  level (higher levels more often), rare (words with rarer characters more
+  often: 1 + the inverse document frequency of the word's rarest character),
+  and per item overrides keyed by (type, disabled key), e.g. from review state
+
+Usage:
+    python scripts/practice_sampler.py hsk --levels 1 2 --weighting rare --count 10
+    python scripts/practice_sampler.py tocfl --deck --seed lesson-3 --count 20
+    python scripts/practice_sampler.py --bench
+"""
+
+import argparse
+import hashlib
+import math
+import random
+import statistics
+import time
+from array import array
+from collections import Counter, OrderedDict
+
+from cjk_text import is_cjk
+from dataset_query import (
+    CHARACTER_FILTERS,
+    ENABLED_FILTERS,
+    KINDS,
+    MOBILE_DATA_DIR,
+    NO_LENGTH,
+    DatasetStore,
+    Entry,
+    Query,
+    bench_disabled,
+    load_disabled,
+)
+
+WEIGHTINGS = ("uniform", "length", "level", "rare")
+MAX_TABLES = 256  # Alias tables kept (least recently used go first)
+MAX_DECKS = 256
+MASK64 = (1 << 64) - 1
+HEADWORD_FIELDS = ("traditionalChinese", "kanji")
+
+
+def item_hash(text):
+    """Stable 64-bit hash of a string (hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def mix64(x):
+    """splitmix64 finaliser: 64 well-mixed bits from any 64-bit value"""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+class AliasTable:
+    """Vose's alias method: O(n) to build, O(1) per draw"""
+
+    __slots__ = ("rows", "prob", "alias", "total_weight")
+
+    def __init__(self, rows, weights):
+        n = len(rows)
+        self.rows = rows
+        self.prob = array("d", bytes(8 * n))
+        self.alias = array("I", rows)
+        self.total_weight = math.fsum(weights)
+        if not n:
+            return
+        scaled = [weight * n / self.total_weight for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large[-1]
+            self.prob[less] = scaled[less]
+            self.alias[less] = rows[more]
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(large.pop())
+        for i in small + large:  # Left over by rounding: keep their own row
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def draw(self, rng):
+        """One row, with probability proportional to its weight"""
+        n = len(self.rows)
+        u = rng.random() * n
+        i = min(int(u), n - 1)
+        return self.rows[i] if u - i < self.prob[i] else self.alias[i]
+
+
+class Deck:
+    """Rows of one filter combination in shuffled order"""
+
+    __slots__ = ("rows", "seed", "epoch")
+
+    def __init__(self, rows, seed, epoch):
+        self.rows = rows
+        self.seed = seed
+        self.epoch = epoch
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class PracticeSampler:
+    def __init__(self, store, weighting="uniform", overrides=None):
+        self.store = store
+        self.item_hashes = array(
+            "Q",
+            (
+                item_hash(f"{store.dataset(row).kind}:{store.disabled_key(row)}")
+                for row in range(store.row_count)
+            ),
+        )
+        self._rarity = None
+        self._tables = OrderedDict()
+        self._decks = OrderedDict()
+        self.set_weights(weighting, overrides)
+
+    def set_weights(self, weighting="uniform", overrides=None):
+        """Weighting plus {(type, disabled key): weight} overrides; a weight of 0 leaves the
+        item out. Clears every cached table and deck"""
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting '{weighting}', choose from {WEIGHTINGS}")
+        self.weighting = weighting
+        self.overrides = {}
+        for (kind, key), weight in (overrides or {}).items():
+            if weight < 0:
+                raise ValueError(f"Negative weight for {kind} '{key}'")
+            for row in self.store.keys[kind].get(key, ()):
+                self.overrides[row] = weight
+        self._tables.clear()
+        self._decks.clear()
+
+    # --- Weights ---
+
+    def weight(self, row):
+        if row in self.overrides:
+            return self.overrides[row]
+        if self.weighting == "length":
+            length = self.store.lengths[row]
+            return 1.0 if length == NO_LENGTH else float(max(length, 1))
+        if self.weighting == "level":
+            return float(self.store.dataset(row).level or 1)
+        if self.weighting == "rare":
+            return self.rarity()[row]
+        return 1.0
+
+    def rarity(self):
+        """Row -> 1 + inverse document frequency of the rarest character of its headword"""
+        if self._rarity is None:
+            store = self.store
+            headwords = []
+            for row in range(store.row_count):
+                text = ""
+                for field in HEADWORD_FIELDS:
+                    column = store.columns.get(field)
+                    text = column[row] if column else None
+                    if text:
+                        break
+                headwords.append({char for char in text or "" if is_cjk(char)})
+            frequency = Counter(char for chars in headwords for char in chars)
+            self._rarity = array(
+                "d",
+                (
+                    1.0 + math.log(store.row_count / min(frequency[char] for char in chars))
+                    if chars
+                    else 1.0
+                    for chars in headwords
+                ),
+            )
+        return self._rarity
+
+    def _rows_and_weights(self, query, disabled):
+        rows, weights = array("I"), []
+        for row in self.store.query(query, disabled).rows():
+            weight = self.weight(row)
+            if weight > 0:
+                rows.append(row)
+                weights.append(weight)
+        return rows, weights
+
+    def _cache_key(self, query, disabled):
+        """Disabled rows are only part of the key when the query filters on them"""
+        if query.enabled == "all":
+            return query, None
+        return query, self.store.resolve_disabled(disabled).bits
+
+    @staticmethod
+    def _cached(cache, key, limit, build):
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = build()
+            if len(cache) > limit:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return value
+
+    # --- Draws ---
+
+    def table(self, query, disabled=None):
+        """The (cached) alias table of a query"""
+
+        def build():
+            return AliasTable(*self._rows_and_weights(query, disabled))
+
+        return self._cached(self._tables, self._cache_key(query, disabled), MAX_TABLES, build)
+
+    def draw(self, query, disabled=None, rng=random):
+        """One weighted random Entry of a query, or None when nothing matches"""
+        table = self.table(query, disabled)
+        return Entry(self.store, table.draw(rng)) if len(table) else None
+
+    def draws(self, query, count, disabled=None, seed=None):
+        """count weighted draws with replacement; the same seed gives the same draws"""
+        table = self.table(query, disabled)
+        if not len(table):
+            return []
+        rng = random.Random(seed)
+        return [Entry(self.store, table.draw(rng)) for _ in range(count)]
+
+    # --- Decks ---
+
+    def deck(self, query, seed, disabled=None, epoch=0):
+        """Every item of a query once, in a weighted shuffled order fixed by (seed, epoch)"""
+
+        def build():
+            rows, weights = self._rows_and_weights(query, disabled)
+            salt = item_hash(f"{seed}:{epoch}")
+            hashes = self.item_hashes
+            priorities = []
+            for row, weight in zip(rows, weights):
+                # Uniform in (0, 1) from the top 53 bits; -log(u)/w is exponential with
+                # rate w, so ascending order samples without replacement by weight
+                u = ((mix64(hashes[row] ^ salt) >> 11) + 0.5) / (1 << 53)
+                priorities.append(-math.log(u) / weight)
+            order = sorted(range(len(rows)), key=priorities.__getitem__)
+            return Deck(array("I", (rows[i] for i in order)), seed, epoch)
+
+        key = (self._cache_key(query, disabled), seed, epoch)
+        return self._cached(self._decks, key, MAX_DECKS, build)
+
+    def session(self, query, seed, start=0, count=20, disabled=None):
+        """Entries start .. start + count of a practice session: the deck of the seed,
+        then its next epochs. A client only needs to keep (seed, position)"""
+        entries = []
+        size = len(self.deck(query, seed, disabled))
+        if not size:
+            return entries
+        position = start
+        while len(entries) < count:
+            epoch, index = divmod(position, size)
+            deck = self.deck(query, seed, disabled, epoch)
+            take = min(count - len(entries), size - index)
+            entries.extend(Entry(self.store, row) for row in deck.rows[index : index + take])
+            position += take
+        return entries
+
+
+# --- Command line ---
+
+BENCH_QUERIES = (
+    Query("hsk", (1, 2)),
+    Query("tocfl", (1, 2, 3, 4, 5), enabled="enabled"),
+    Query("tocfl", (1, 2, 3, 4, 5), characters="single"),
+    Query(None, None),
+)
+
+
+def run_bench(store, draws=100_000):
+    disabled = store.resolve_disabled(bench_disabled(store))
+    print(f"⏱️  {len(BENCH_QUERIES)} queries over {store.row_count:,} rows")
+    for weighting in WEIGHTINGS:
+        sampler = PracticeSampler(store, weighting)
+        for query in BENCH_QUERIES:
+            start = time.perf_counter()
+            table = sampler.table(query, disabled)
+            built = time.perf_counter() - start
+
+            rng = random.Random(0)
+            start = time.perf_counter()
+            for _ in range(draws):
+                table.draw(rng)
+            per_draw = (time.perf_counter() - start) / draws
+
+            timings = []
+            for seed in range(5):
+                start = time.perf_counter()
+                sampler.deck(query, seed, disabled)
+                timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            sampler.session(query, 0, 100, 20, disabled)
+            served = time.perf_counter() - start
+
+            label = f"{weighting} {query.kind or 'all'} {query.characters}/{query.enabled}"
+            print(
+                f"   {label:<32} {len(table):>6,} items  table {built * 1e3:>6.1f}ms  "
+                f"draw {per_draw * 1e9:>5.0f}ns  deck {statistics.median(timings) * 1e3:>6.1f}ms  "
+                f"session {served * 1e6:>5.0f}µs"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Draw random practice items like the app does.")
+    parser.add_argument("kind", nargs="?", choices=KINDS, default="hsk", help="Dataset type")
+    parser.add_argument("--all", action="store_true", help="Draw from every dataset")
+    parser.add_argument("--levels", type=int, nargs="+", help="Levels (default: all)")
+    parser.add_argument("--characters", choices=CHARACTER_FILTERS, default="all")
+    parser.add_argument("--enabled", choices=ENABLED_FILTERS, default="all")
+    parser.add_argument("--disabled", help="JSON file of disabled keys per type")
+    parser.add_argument("--weighting", choices=WEIGHTINGS, default="uniform")
+    parser.add_argument("--deck", action="store_true", help="Non-repeating deck instead of draws")
+    parser.add_argument("--seed", help="Seed (draws and decks repeat for the same seed)")
+    parser.add_argument("--start", type=int, default=0, help="Deck position to start at")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Data directory (default: %(default)s)"
+    )
+    parser.add_argument("--bench", action="store_true", help="Time tables, draws and decks")
+    args = parser.parse_args()
+
+    store = DatasetStore.load(args.data_dir)
+    if args.bench:
+        run_bench(store)
+        return
+
+    query = Query(
+        kind=None if args.all else args.kind,
+        levels=tuple(args.levels) if args.levels else None,
+        characters=args.characters,
+        enabled=args.enabled,
+    )
+    disabled = store.resolve_disabled(load_disabled(args.disabled) if args.disabled else {})
+    sampler = PracticeSampler(store, args.weighting)
+    if args.deck:
+        seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+        entries = sampler.session(query, seed, args.start, args.count, disabled)
+        print(f"🃏 Deck '{seed}' of {len(sampler.deck(query, seed, disabled)):,} items")
+    else:
+        entries = sampler.draws(query, args.count, disabled, args.seed)
+        print(f"🎲 {len(entries)} draws from {len(sampler.table(query, disabled)):,} items")
+    for entry in entries:
+        values = entry.to_dict()
+        headword = values.get("traditionalChinese") or values.get("kanji", "")
+        gloss = values.get("english", "")
+        print(
+            f"   {entry.dataset.name:<10} {entry.position:>5}  "
+            f"{sampler.weight(entry.row):>5.2f}  {headword}  {gloss[:50]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
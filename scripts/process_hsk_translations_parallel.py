@@ -16,10 +16,11 @@ import json
 import pinyin_jyutping
 import time
 import os
-import re
 from typing import TypedDict, List
 from google.cloud import translate_v3 as translate
 from add_hanviet_from_csv import load_hanviet_csv, find_hanviet_reading_with_multiple
+from batch_splitter import translate_with_isolation, FatalTranslationError
+from cjk_text import count_chinese_characters
 
 
 class VocabEntry(TypedDict):
@@ -67,36 +68,38 @@ except Exception as e:
     exit(1)
 
 
+def request_translations(texts, target):
+    """Send one Google Cloud Translation V3 request (raises on any failure)"""
+    request = {
+        "parent": PARENT,
+        "contents": texts,
+        "mime_type": "text/plain",
+        "source_language_code": "zh-CN",  # Simplified Chinese
+        "target_language_code": target,
+    }
+    response = translate_client.translate_text(request=request)
+    if not response.translations:
+        raise ValueError("No translations returned for batch")
+    return [trans.translated_text for trans in response.translations]
+
+
 def translate_batch(texts, target_lang):
     """Translate multiple texts using Google Cloud Translation V3 API (batch)"""
+    # Map language codes
+    lang_map = {
+        "zh-Hant": "zh-TW",  # Traditional Chinese
+        "vi": "vi",  # Vietnamese
+    }
+    target = lang_map.get(target_lang, target_lang)
+
+    # Failed batches are bisected; only the offending words end up in the dead-letter file
     try:
-        # Map language codes
-        lang_map = {
-            "zh-Hant": "zh-TW",  # Traditional Chinese
-            "vi": "vi",  # Vietnamese
-        }
-        target = lang_map.get(target_lang, target_lang)
-
-        # Prepare the request
-        request = {
-            "parent": PARENT,
-            "contents": texts,
-            "mime_type": "text/plain",
-            "source_language_code": "zh-CN",  # Simplified Chinese
-            "target_language_code": target,
-        }
-
-        # Make the translation request
-        response = translate_client.translate_text(request=request)
-
-        # Return all translations
-        if response.translations:
-            return [trans.translated_text for trans in response.translations]
-        else:
-            print(f"❌ No translations returned for batch")
-            return [""] * len(texts)
-
-    except Exception as e:
+        return translate_with_isolation(
+            texts,
+            lambda chunk: request_translations(chunk, target),
+            context={"script": "hsk", "level": HSK_LEVEL, "target": target},
+        )
+    except FatalTranslationError as e:
         print(f"❌ Translation API Exception: {str(e)}")
         print(f"🛑 Stopping script due to error")
         exit(1)
@@ -118,18 +121,6 @@ def get_jyutping_romanization(text):
         exit(1)
 
 
-def count_chinese_characters(text):
-    """Count Chinese characters (CJK unified ideographs) in text"""
-    # Remove special characters like pipes, parentheses, etc.
-    clean_text = text.split("｜")[0].split("|")[0]
-    clean_text = re.sub(r"[（(].*?[）)]", "", clean_text)
-    clean_text = clean_text.strip()
-
-    # Count Chinese characters (CJK unified ideographs)
-    chinese_chars = re.findall(r"[\u4e00-\u9fff]", clean_text)
-    return len(chinese_chars)
-
-
 def process_batch(batch_data, batch_num, total_batches):
     """Process a batch of words using batch API calls"""
     print(
@@ -6,18 +6,29 @@ cantoneseJyutping, hanviet, viet, english
 Only processes first 100 rows.
 Converts simplified Chinese to traditional Chinese using Google Translate.
 source: https://github.com/Destaq/chinese-sentence-miner
+
+Usage:
+    python scripts/process_sentences.py
+    python scripts/process_sentences.py --tocfl-level 1 --max-rows 100
+    python scripts/process_sentences.py --tocfl-level 1 --profile cpu
 """
 
 # TODO rerun this script to add cantonese translations
 
+import argparse
 import csv
 import json
-import re
 import time
 import pinyin_jyutping
 from google.cloud import translate_v3 as translate
 from google.oauth2 import service_account
-from add_hanviet_from_csv import load_hanviet_csv, find_hanviet_reading_with_multiple
+from add_hanviet_from_csv import (
+    load_hanviet_csv,
+    find_hanviet_reading_with_multiple,
+    get_hanviet_with_preserved_chars,
+)
+from batch_splitter import translate_with_isolation, FatalTranslationError
+from stage_profiler import PROFILER, add_profile_arguments, finish_and_print, start_from_args
 
 # Configuration
 CSV_FILE = "vocabCsv/sentences.csv"
@@ -33,159 +44,35 @@ FILTER_TOCFL_LEVEL = (
 BATCH_SIZE = 50  # Number of sentences to process per batch
 BATCH_GAP = 0.5  # Delay in seconds between batches
 
-print("🔧 Initializing components...")
+hanviet_data = None
+jyutping_instance = None
+translate_client = None
+parent = None
 
-# Load Han Viet data
-print(f"📖 Loading Han Viet data from {HANVIET_CSV}...")
-hanviet_data = load_hanviet_csv(HANVIET_CSV)
-print(f"✅ Loaded Han Viet data")
 
-# Initialize Jyutping library
-print("🔧 Initializing Jyutping library...")
-jyutping_instance = pinyin_jyutping.PinyinJyutping()
-print("✅ Jyutping library ready")
-
-# Initialize Google Translate v3 client
-print("🔧 Initializing Google Translate v3 client...")
-credentials = service_account.Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE, scopes=["https://www.googleapis.com/auth/cloud-translation"]
-)
-translate_client = translate.TranslationServiceClient(credentials=credentials)
-parent = f"projects/{PROJECT_ID}/locations/{LOCATION}"
-print("✅ Google Translate client ready")
-
-
-def is_punctuation_or_latin(char):
-    """Check if character is punctuation, Latin, number, or whitespace"""
-    # Must be a single character
-    if len(char) != 1:
-        return False
-    # Check if it's a Chinese character
-    if "\u4e00" <= char <= "\u9fff":
-        return False
-    # Check if it's punctuation (common punctuation marks)
-    if char in '，。！？；：、""' "（）【】《》〈〉「」『』〔〕…—–·～":
-        return True
-    # Check if it's Latin, number, or whitespace
-    if char.isalnum() or char.isspace() or ord(char) < 128:
-        return True
-    return False
-
-
-def is_punctuation_or_latin_string(text):
-    """Check if a string (single or multi-char) contains only punctuation/Latin characters"""
-    if not text:
-        return False
-    # If single character, use the single char function
-    if len(text) == 1:
-        return is_punctuation_or_latin(text)
-    # For multi-character strings, check if ALL characters are punctuation/Latin
-    # (e.g., "Muiriel", "123", etc.)
-    return all(is_punctuation_or_latin(c) for c in text)
-
-
-def get_hanviet_with_preserved_chars(traditional, hanviet_data):
-    """
-    Get hanviet reading while preserving punctuation and Latin characters from original text.
-    Processes character-by-character to properly handle mixed punctuation/Latin with Chinese.
-    """
-    if not traditional:
-        return ""
+def init_components(hanviet_csv=HANVIET_CSV, service_account_file=SERVICE_ACCOUNT_FILE):
+    """Load the Han Viet table, the Jyutping library and the Google Translate client"""
+    global hanviet_data, jyutping_instance, translate_client, parent
+    print("🔧 Initializing components...")
 
-    # Clean traditional text (same as find_hanviet_reading_with_multiple)
-    traditional_clean = traditional.split("｜")[0].split("|")[0]
-    traditional_clean = re.sub(r"[（(].*?[）)]", "", traditional_clean).strip()
+    # Load Han Viet data
+    print(f"📖 Loading Han Viet data from {hanviet_csv}...")
+    hanviet_data = load_hanviet_csv(hanviet_csv)
+    print(f"✅ Loaded Han Viet data")
 
-    if not traditional_clean:
-        return ""
+    # Initialize Jyutping library
+    print("🔧 Initializing Jyutping library...")
+    jyutping_instance = pinyin_jyutping.PinyinJyutping()
+    print("✅ Jyutping library ready")
 
-    # Check if we have only Chinese characters (no punctuation/Latin mixed in)
-    has_punctuation_or_latin = any(
-        is_punctuation_or_latin(c) for c in traditional_clean
+    # Initialize Google Translate v3 client
+    print("🔧 Initializing Google Translate v3 client...")
+    credentials = service_account.Credentials.from_service_account_file(
+        service_account_file, scopes=["https://www.googleapis.com/auth/cloud-translation"]
     )
-
-    # If no punctuation/Latin, try whole-word lookup first
-    if not has_punctuation_or_latin and len(traditional_clean) > 1:
-        char_only_key = f"{traditional_clean}|*"
-        if char_only_key in hanviet_data:
-            return hanviet_data[char_only_key]
-
-    # Process character by character, preserving punctuation/Latin
-    # Group consecutive Latin/numeral characters together
-    # Store tuples: (part, is_punct_or_latin_flag, is_latin_or_numeral_flag)
-    result_parts = []
-    current_latin_group = []
-
-    for char in traditional_clean:
-        if is_punctuation_or_latin(char):
-            # Check if it's a Latin character or Arabic numeral
-            is_latin_or_numeral = char.isalnum() and ord(char) < 128
-
-            if is_latin_or_numeral:
-                # Group consecutive Latin/numeral characters
-                current_latin_group.append(char)
-            else:
-                # This is punctuation - flush any accumulated Latin group first
-                if current_latin_group:
-                    latin_group = "".join(current_latin_group)
-                    result_parts.append((latin_group, True, True))
-                    current_latin_group = []
-                # Add punctuation
-                result_parts.append((char, True, False))
-        else:
-            # This is a Chinese character - flush any accumulated Latin group first
-            if current_latin_group:
-                latin_group = "".join(current_latin_group)
-                result_parts.append((latin_group, True, True))
-                current_latin_group = []
-
-            # Look up hanviet for Chinese character
-            char_only_key = f"{char}|*"
-            if char_only_key in hanviet_data:
-                result_parts.append((hanviet_data[char_only_key], False, False))
-            else:
-                result_parts.append(("_", False, False))
-
-    # Flush any remaining Latin group
-    if current_latin_group:
-        latin_group = "".join(current_latin_group)
-        result_parts.append((latin_group, True, True))
-
-    # Join with spaces: between hanviet readings, and around Latin/numeral groups (entire words)
-    # Only add spaces "before" each part to avoid duplicates
-    final_parts = []
-    for i, (part, is_punct_or_latin, is_latin_or_numeral) in enumerate(result_parts):
-        if i > 0:
-            prev_part, prev_is_punct_or_latin, prev_is_latin_or_numeral = result_parts[
-                i - 1
-            ]
-
-            # Space between two hanviet readings
-            if (
-                part != "_"
-                and not is_punct_or_latin
-                and prev_part != "_"
-                and not prev_is_punct_or_latin
-            ):
-                final_parts.append(" ")
-            # Space before Latin/numeral group (previous is hanviet reading)
-            elif (
-                is_latin_or_numeral and prev_part != "_" and not prev_is_punct_or_latin
-            ):
-                final_parts.append(" ")
-            # Space after Latin/numeral group (current is hanviet reading, previous is Latin/numeral)
-            elif prev_is_latin_or_numeral and part != "_" and not is_punct_or_latin:
-                final_parts.append(" ")
-            # Space before Latin/numeral (previous is punctuation - only for non-Chinese punctuation)
-            elif is_latin_or_numeral and prev_is_punct_or_latin:
-                # Don't add space after Chinese punctuation marks
-                chinese_punct = '，。！？；：、""' "（）【】《》〈〉「」『』〔〕…—–·～"
-                if prev_part not in chinese_punct:
-                    final_parts.append(" ")
-
-        final_parts.append(part)
-
-    return "".join(final_parts)
+    translate_client = translate.TranslationServiceClient(credentials=credentials)
+    parent = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+    print("✅ Google Translate client ready")
 
 
 def get_jyutping(text):
@@ -197,76 +84,52 @@ def get_jyutping(text):
         return ""
 
 
-def translate_to_vietnamese_batch(texts):
-    """Translate multiple Traditional Chinese texts to Vietnamese using Google Translate v3 (batch)"""
+def request_translations(texts, source, target):
+    """Send one Google Translate v3 request (raises on any failure)"""
+    response = translate_client.translate_text(
+        request={
+            "parent": parent,
+            "contents": texts,
+            "mime_type": "text/plain",
+            "source_language_code": source,
+            "target_language_code": target,
+        }
+    )
+    return [trans.translated_text for trans in response.translations]
+
+
+def translate_isolated(texts, source, target, label):
+    """Batch translate; a failing batch is bisected so only the bad sentences come back empty"""
     try:
-        response = translate_client.translate_text(
-            request={
-                "parent": parent,
-                "contents": texts,
-                "mime_type": "text/plain",
-                "source_language_code": "zh-TW",  # Traditional Chinese
-                "target_language_code": "vi",  # Vietnamese
-            }
-        )
-        return [trans.translated_text for trans in response.translations]
-    except Exception as e:
-        print(f"  ⚠️  Vietnamese batch translation error: {e}")
+        with PROFILER.stage(f"translate-{target}"):
+            return translate_with_isolation(
+                texts,
+                lambda chunk: request_translations(chunk, source, target),
+                context={"script": "sentences", "source": source, "target": target},
+            )
+    except FatalTranslationError as e:
+        print(f"  ⚠️  {label} batch translation error: {e}")
         return [""] * len(texts)
 
 
+def translate_to_vietnamese_batch(texts):
+    """Translate multiple Traditional Chinese texts to Vietnamese using Google Translate v3 (batch)"""
+    return translate_isolated(texts, "zh-TW", "vi", "Vietnamese")
+
+
 def translate_simplified_to_traditional_batch(texts):
     """Convert multiple Simplified Chinese texts to Traditional Chinese using Google Translate v3 (batch)"""
-    try:
-        response = translate_client.translate_text(
-            request={
-                "parent": parent,
-                "contents": texts,
-                "mime_type": "text/plain",
-                "source_language_code": "zh-CN",  # Simplified Chinese
-                "target_language_code": "zh-TW",  # Traditional Chinese
-            }
-        )
-        return [trans.translated_text for trans in response.translations]
-    except Exception as e:
-        print(f"  ⚠️  Simplified->Traditional batch conversion error: {e}")
-        return [""] * len(texts)
+    return translate_isolated(texts, "zh-CN", "zh-TW", "Simplified->Traditional")
 
 
 def translate_to_english_batch(texts):
     """Translate multiple Traditional Chinese texts to English using Google Translate v3 (batch)"""
-    try:
-        response = translate_client.translate_text(
-            request={
-                "parent": parent,
-                "contents": texts,
-                "mime_type": "text/plain",
-                "source_language_code": "zh-TW",  # Traditional Chinese
-                "target_language_code": "en",  # English
-            }
-        )
-        return [trans.translated_text for trans in response.translations]
-    except Exception as e:
-        print(f"  ⚠️  English batch translation error: {e}")
-        return [""] * len(texts)
+    return translate_isolated(texts, "zh-TW", "en", "English")
 
 
 def translate_to_cantonese_batch(texts):
     """Translate multiple Traditional Chinese texts to Written Cantonese using Google Translate v3 (batch)"""
-    try:
-        response = translate_client.translate_text(
-            request={
-                "parent": parent,
-                "contents": texts,
-                "mime_type": "text/plain",
-                "source_language_code": "zh-TW",  # Traditional Chinese
-                "target_language_code": "yue",  # Cantonese (Written)
-            }
-        )
-        return [trans.translated_text for trans in response.translations]
-    except Exception as e:
-        print(f"  ⚠️  Cantonese batch translation error: {e}")
-        return [""] * len(texts)
+    return translate_isolated(texts, "zh-TW", "yue", "Cantonese")
 
 
 def process_batch(batch_items, batch_num, total_batches):
@@ -280,25 +143,27 @@ def process_batch(batch_items, batch_num, total_batches):
     traditional_texts = translate_simplified_to_traditional_batch(simplified_texts)
 
     # Step 2: Process hanviet for all traditional texts
-    for i, item in enumerate(batch_items):
-        item["traditional"] = traditional_texts[i]
-        item["hanviet"] = get_hanviet_with_preserved_chars(
-            traditional_texts[i], hanviet_data
-        )
+    with PROFILER.stage("hanviet"):
+        for i, item in enumerate(batch_items):
+            item["traditional"] = traditional_texts[i]
+            item["hanviet"] = get_hanviet_with_preserved_chars(
+                traditional_texts[i], hanviet_data
+            )
 
     # Step 3: Batch translate to Vietnamese, English, and Cantonese (3 API calls total)
     vietnamese_texts = translate_to_vietnamese_batch(traditional_texts)
     english_texts = translate_to_english_batch(traditional_texts)
     written_cantonese_texts = translate_to_cantonese_batch(traditional_texts)
 
-    # Step 4: Process jyutping for traditional texts (local)
-    jyutping_results = [get_jyutping(item["traditional"]) for item in batch_items]
+    with PROFILER.stage("jyutping"):
+        # Step 4: Process jyutping for traditional texts (local)
+        jyutping_results = [get_jyutping(item["traditional"]) for item in batch_items]
 
-    # Step 5: Process jyutping for written Cantonese texts (local)
-    cantonese_jyutping_results = [
-        get_jyutping(written_cantonese) if written_cantonese else ""
-        for written_cantonese in written_cantonese_texts
-    ]
+        # Step 5: Process jyutping for written Cantonese texts (local)
+        cantonese_jyutping_results = [
+            get_jyutping(written_cantonese) if written_cantonese else ""
+            for written_cantonese in written_cantonese_texts
+        ]
 
     # Step 6: Combine all results
     results = []
@@ -329,103 +194,153 @@ def process_batch(batch_items, batch_num, total_batches):
     return results
 
 
-print(f"\n📖 Reading CSV file: {CSV_FILE}...")
-if FILTER_TOCFL_LEVEL is not None:
-    print(f"🔍 Filtering for TOCFL Level {FILTER_TOCFL_LEVEL} sentences only...\n")
-elif MAX_ROWS:
-    print(f"🔄 Processing first {MAX_ROWS} rows...\n")
-else:
-    print(f"🔄 Processing all rows...\n")
-
-# Step 1: Read all rows and process hanviet (fast synchronous lookup)
-items_to_process = []
-row_count = 0
-total_rows = 0
-
-with open(CSV_FILE, "r", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-
-    for row in reader:
-        total_rows += 1
-
-        # Read from new CSV structure: Characters, Pinyin, Meaning, HSK Level, TOCFL Level
-        simplified = row.get("Characters", "").strip()
-        pinyin = row.get("Pinyin", "").strip()
-        meaning = row.get("Meaning", "").strip()
-        hsk_level = row.get("HSK Level", "").strip()
-        tocfl_level = row.get("TOCFL Level", "").strip()
-
-        # Filter by TOCFL level if specified
-        if FILTER_TOCFL_LEVEL is not None and tocfl_level != str(FILTER_TOCFL_LEVEL):
-            continue
-
-        row_count += 1
-
-        # Check MAX_ROWS limit
-        if MAX_ROWS and row_count > MAX_ROWS:
-            break
-
-        # Traditional will be generated via Google Translate
-        # Store item for batch processing (traditional conversion + jyutping + translations)
-        item_data = {
-            "index": total_rows,
-            "simplified": simplified,
-            "traditional": "",  # Will be filled by conversion
-            "pinyin": pinyin,
-            "hanviet": "",  # Will be filled after we have traditional
-            "jyutping": "",  # Will be filled by processing (standard jyutping for Traditional Chinese)
-            "writtenCantonese": "",  # Will be filled by translation
-            "cantoneseJyutping": "",  # Will be filled by processing (jyutping for written Cantonese)
-            "viet": "",  # Will be filled by translation
-            "english": meaning,  # Use existing meaning from CSV
-            "hsk_level": hsk_level,
-            "tocfl_level": tocfl_level,
-        }
-        items_to_process.append(item_data)
+def read_items(csv_file=CSV_FILE, tocfl_level_filter=FILTER_TOCFL_LEVEL, max_rows=MAX_ROWS):
+    """Read the sentences to process (filtered by TOCFL level, capped at max_rows)"""
+    print(f"\n📖 Reading CSV file: {csv_file}...")
+    if tocfl_level_filter is not None:
+        print(f"🔍 Filtering for TOCFL Level {tocfl_level_filter} sentences only...\n")
+    elif max_rows:
+        print(f"🔄 Processing first {max_rows} rows...\n")
+    else:
+        print(f"🔄 Processing all rows...\n")
+
+    items_to_process = []
+    row_count = 0
+    total_rows = 0
+
+    with open(csv_file, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+
+        for row in reader:
+            total_rows += 1
+
+            # Read from new CSV structure: Characters, Pinyin, Meaning, HSK Level, TOCFL Level
+            simplified = row.get("Characters", "").strip()
+            pinyin = row.get("Pinyin", "").strip()
+            meaning = row.get("Meaning", "").strip()
+            hsk_level = row.get("HSK Level", "").strip()
+            tocfl_level = row.get("TOCFL Level", "").strip()
+
+            # Filter by TOCFL level if specified
+            if tocfl_level_filter is not None and tocfl_level != str(tocfl_level_filter):
+                continue
+
+            row_count += 1
+
+            # Check max_rows limit
+            if max_rows and row_count > max_rows:
+                break
+
+            # Traditional will be generated via Google Translate
+            # Store item for batch processing (traditional conversion + jyutping + translations)
+            item_data = {
+                "index": total_rows,
+                "simplified": simplified,
+                "traditional": "",  # Will be filled by conversion
+                "pinyin": pinyin,
+                "hanviet": "",  # Will be filled after we have traditional
+                "jyutping": "",  # Will be filled by processing (standard jyutping for Traditional Chinese)
+                "writtenCantonese": "",  # Will be filled by translation
+                "cantoneseJyutping": "",  # Will be filled by processing (jyutping for written Cantonese)
+                "viet": "",  # Will be filled by translation
+                "english": meaning,  # Use existing meaning from CSV
+                "hsk_level": hsk_level,
+                "tocfl_level": tocfl_level,
+            }
+            items_to_process.append(item_data)
 
-if FILTER_TOCFL_LEVEL is not None:
-    print(
-        f"✅ Found {row_count} TOCFL Level {FILTER_TOCFL_LEVEL} sentences out of {total_rows} total sentences"
-    )
-else:
+    if tocfl_level_filter is not None:
+        print(
+            f"✅ Found {row_count} TOCFL Level {tocfl_level_filter} sentences out of {total_rows} total sentences"
+        )
+    else:
+        print(
+            f"✅ Found {row_count} sentences to process out of {total_rows} total sentences"
+        )
+    return items_to_process
+
+
+def process_items(items_to_process, batch_size=BATCH_SIZE, batch_gap=BATCH_GAP):
+    """Process jyutping and translations in batches; returns the items in their original order"""
     print(
-        f"✅ Found {row_count} sentences to process out of {total_rows} total sentences"
+        f"\n🌐 Starting processing (jyutping + Vietnamese + English + Cantonese translations) in batches of {batch_size}..."
     )
+    print(f"   Total items to process: {len(items_to_process)}\n")
 
-print(
-    f"\n🌐 Starting processing (jyutping + Vietnamese + English + Cantonese translations) in batches of {BATCH_SIZE}..."
-)
-print(f"   Total items to process: {len(items_to_process)}\n")
+    total_batches = (len(items_to_process) + batch_size - 1) // batch_size
+
+    processed_data = []
+    for batch_num in range(total_batches):
+        start_idx = batch_num * batch_size
+        end_idx = min(start_idx + batch_size, len(items_to_process))
+        batch = items_to_process[start_idx:end_idx]
+
+        batch_results = process_batch(batch, batch_num, total_batches)
+        processed_data.extend(batch_results)
 
+        # Add delay between batches (except after the last batch)
+        if batch_num < total_batches - 1:
+            time.sleep(batch_gap)
 
-# Step 2: Process jyutping and translations in batches
-total_batches = (len(items_to_process) + BATCH_SIZE - 1) // BATCH_SIZE
+    # Sort by index to maintain original order
+    processed_data.sort(key=lambda x: x["index"])
 
-# Process batches
-processed_data = []
-for batch_num in range(total_batches):
-    start_idx = batch_num * BATCH_SIZE
-    end_idx = min(start_idx + BATCH_SIZE, len(items_to_process))
-    batch = items_to_process[start_idx:end_idx]
+    # Remove internal fields from final output
+    for item in processed_data:
+        del item["index"]
+    return processed_data
 
-    batch_results = process_batch(batch, batch_num, total_batches)
-    processed_data.extend(batch_results)
 
-    # Add delay between batches (except after the last batch)
-    if batch_num < total_batches - 1:
-        time.sleep(BATCH_GAP)
+def save_output(processed_data, output_file=OUTPUT_FILE):
+    print(f"💾 Saving to {output_file}...")
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(processed_data, f, ensure_ascii=False, indent=2)
 
-# Sort by index to maintain original order
-processed_data.sort(key=lambda x: x["index"])
+    print(f"✅ Processing complete!")
+    print(f"   Processed: {len(processed_data)} rows")
+    print(f"   Output: {output_file}")
 
-# Remove internal fields from final output
-for item in processed_data:
-    del item["index"]
 
-print(f"💾 Saving to {OUTPUT_FILE}...")
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(processed_data, f, ensure_ascii=False, indent=2)
+def main():
+    parser = argparse.ArgumentParser(
+        description="Process sentences.csv and generate translated JSON using Google Translate v3."
+    )
+    parser.add_argument(
+        "--csv", default=CSV_FILE, help="Path to the sentences CSV (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output", default=OUTPUT_FILE, help="Output JSON path (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--tocfl-level",
+        type=int,
+        default=FILTER_TOCFL_LEVEL,
+        help="Only process sentences of this TOCFL level",
+    )
+    parser.add_argument(
+        "--max-rows", type=int, default=MAX_ROWS, help="Process at most this many sentences"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="Sentences per batch (default: %(default)s)",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
 
-print(f"✅ Processing complete!")
-print(f"   Processed: {len(processed_data)} rows")
-print(f"   Output: {OUTPUT_FILE}")
+    start_from_args(args)
+    try:
+        with PROFILER.stage("init"):
+            init_components()
+        with PROFILER.stage("read"):
+            items = read_items(args.csv, args.tocfl_level, args.max_rows)
+        processed_data = process_items(items, args.batch_size)
+        with PROFILER.stage("write"):
+            save_output(processed_data, args.output)
+    finally:
+        finish_and_print()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ from google.cloud import translate_v3 as translate
 from google.oauth2 import service_account
 
 from add_hanviet_from_csv import load_hanviet_csv, find_hanviet_reading_with_multiple
+from cjk_text import count_chinese_characters
 
 
 class VocabEntry(TypedDict):
@@ -94,12 +95,6 @@ def get_jyutping(text: str) -> str:
     return _jyutping_instance.jyutping(text, tone_numbers=True, spaces=True)
 
 
-def count_chinese_characters(text: str) -> int:
-    clean_text = text.split("｜")[0].split("|")[0]
-    clean_text = re.sub(r"[（(].*?[）)]", "", clean_text).strip()
-    return len(re.findall(r"[\u4e00-\u9fff]", clean_text))
-
-
 def clean_word_type(text: str) -> str:
     """Remove word type annotations like (N), (VA), etc."""
     return re.sub(r"\s*\([^)]*\)\s*$", "", text).strip()
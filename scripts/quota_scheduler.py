@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Quota-aware scheduling of translation batches across several API credentials.
+- Takes a pool of providers (Google projects, Bing keys, ...) with declared
+  per-minute character quotas
+- Dispatches each batch to the credential with the most headroom that supports
+  the language pair, tracking consumption live in a sliding one-minute window
+- On a quota error the credential cools down and the batch fails over to the
+  next one; credentials with rejected keys are dropped from the pool
+- Batches run concurrently across credentials, so aggregate throughput grows
+  with the number of keys
+- Chunks are kept within the largest per-minute quota; a single text longer
+  than every quota fails at once instead of waiting for a window it never fits
+
+The pool is read from translatePool.json in the project root:
+    {
+      "cooldown": 60,
+      "providers": [
+        {"type": "google_v3", "name": "main", "credentials_file": "translateKey.json",
+         "chars_per_minute": 6000000},
+        {"type": "google_v3", "name": "second", "credentials_file": "translateKey2.json",
+         "chars_per_minute": 6000000},
+        {"type": "bing", "name": "bing", "api_key": "...", "region": "canadaeast",
+         "chars_per_minute": 33300}
+      ]
+    }
+Without a pool file, a single Google V3 credential (translateKey.json) is used.
+
+The scheduler is itself a TranslationProvider, so scripts can use it anywhere a
+single provider is accepted:
+    scheduler = load_credential_pool()
+    translations = await scheduler.translate_batch(texts, "zh-TW", "vi")
+
+Usage:
+    python scripts/quota_scheduler.py --status
+    python scripts/quota_scheduler.py --simulate 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from build_metrics import METRICS
+from translation_providers import (
+    CharacterWindow,
+    ProviderAuthError,
+    ProviderLimits,
+    QuotaExceededError,
+    StubConfig,
+    StubProvider,
+    TranslationError,
+    TranslationProvider,
+    make_provider,
+    pack_batches,
+)
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_POOL_FILE = PROJECT_ROOT / "translatePool.json"
+
+DEFAULT_COOLDOWN = 60.0  # Seconds a credential rests after a quota error
+MAX_FAILOVERS = 10  # Quota errors tolerated for one batch before giving up
+
+
+class NoCredentialAvailableError(TranslationError):
+    """Every credential in the pool is disabled or cannot handle the language pair"""
+
+    fatal = True
+
+
+class CredentialSlot:
+    """One credential/provider in the pool with its live quota accounting"""
+
+    def __init__(self, provider, window=60.0):
+        self.provider = provider
+        self.provider.enforce_rate_limit = False  # The scheduler tracks the quota
+        self.name = provider.name
+        self.window = CharacterWindow(provider.limits.chars_per_minute, window)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.disabled = False
+        self.requests = 0
+        self.chars = 0
+        self.quota_errors = 0
+
+    def available(self, now):
+        return (
+            not self.disabled
+            and now >= self.cooldown_until
+            and self.in_flight < self.provider.limits.max_concurrency
+        )
+
+    def headroom_ratio(self, now):
+        """Fraction of the per-minute quota still free (1.0 for unlimited credentials)"""
+        if self.window.limit is None:
+            return 1.0
+        return self.window.headroom(now) / self.window.limit
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "type": type(self.provider).__name__,
+            "quota": self.window.limit,
+            "usedLastMinute": self.window.used(now),
+            "requests": self.requests,
+            "chars": self.chars,
+            "quotaErrors": self.quota_errors,
+            "coolingDown": now < self.cooldown_until,
+            "disabled": self.disabled,
+        }
+
+
+class QuotaScheduler(TranslationProvider):
+    """Distributes batches over a pool of providers according to their quotas"""
+
+    name = "scheduler"
+
+    def __init__(self, providers, cooldown=DEFAULT_COOLDOWN, window=60.0):
+        if not providers:
+            raise ValueError("QuotaScheduler needs at least one provider")
+        self.slots = [CredentialSlot(p, window) for p in providers]
+        self.cooldown = cooldown
+        self.limits = ProviderLimits(
+            max_batch_items=min(p.limits.max_batch_items for p in providers),
+            max_batch_chars=min(p.limits.max_batch_chars for p in providers),
+            max_concurrency=sum(p.limits.max_concurrency for p in providers),
+            chars_per_minute=None,
+        )
+        super().__init__()
+        self._changed = None
+
+    def supports(self, source, target):
+        return any(s.provider.supports(source, target) for s in self.slots)
+
+    def _candidates(self, source, target):
+        return [
+            s
+            for s in self.slots
+            if not s.disabled and s.provider.supports(source, target)
+        ]
+
+    async def translate_batch(self, texts, source, target):
+        if not texts:
+            return []
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+
+        candidates = self._candidates(source, target)
+        if not candidates:
+            raise NoCredentialAvailableError(
+                f"No credential supports {source} → {target}", self.name
+            )
+        max_items = min(s.provider.limits.max_batch_items for s in candidates)
+        max_chars = min(s.provider.limits.max_batch_chars for s in candidates)
+        max_chars = min(max_chars, self._max_quota(candidates))
+        chunks = pack_batches(list(texts), max_items, max_chars)
+        results = await asyncio.gather(
+            *(self._dispatch(chunk, source, target) for chunk in chunks)
+        )
+        return [text for chunk in results for text in chunk]
+
+    @staticmethod
+    def _max_quota(slots):
+        """Largest chunk any of the slots could ever take in one window"""
+        limits = [s.window.limit for s in slots]
+        return float("inf") if None in limits else max(limits)
+
+    async def _acquire(self, chars, source, target):
+        """Wait until some credential has headroom for `chars`, then reserve it"""
+        async with self._changed:
+            while True:
+                candidates = self._candidates(source, target)
+                if not candidates:
+                    raise NoCredentialAvailableError(
+                        f"No usable credential left for {source} → {target}", self.name
+                    )
+                if chars > self._max_quota(candidates):
+                    raise TranslationError(
+                        f"A chunk of {chars} characters exceeds every credential's "
+                        f"per-minute quota ({self._max_quota(candidates)})",
+                        self.name,
+                    )
+
+                now = time.monotonic()
+                ready = [
+                    s
+                    for s in candidates
+                    if s.available(now) and s.window.wait_time(chars, now) == 0
+                ]
+                if ready:
+                    slot = max(ready, key=lambda s: s.headroom_ratio(now))
+                    slot.in_flight += 1
+                    slot.window.record(chars, now)
+                    return slot
+
+                # Sleep until the earliest credential could take the batch
+                waits = []
+                for s in candidates:
+                    wait = max(s.cooldown_until - now, s.window.wait_time(chars, now))
+                    if s.in_flight < s.provider.limits.max_concurrency:
+                        waits.append(wait)
+                timeout = max(0.01, min(waits)) if waits else None
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, slot):
+        async with self._changed:
+            slot.in_flight -= 1
+            self._changed.notify_all()
+
+    async def _dispatch(self, chunk, source, target):
+        chars = sum(len(t) for t in chunk)
+        failovers = 0
+        while True:
+            slot = await self._acquire(chars, source, target)
+            try:
+                translations = await slot.provider.translate_batch(chunk, source, target)
+                slot.requests += 1
+                slot.chars += chars
+                return translations
+            except QuotaExceededError as e:
+                slot.quota_errors += 1
+                METRICS.increment("quota_failovers", provider=slot.name)
+                slot.cooldown_until = time.monotonic() + self.cooldown
+                failovers += 1
+                print(f"  ⏳ {slot.name}: quota exceeded, cooling down {self.cooldown:.0f}s")
+                if failovers > MAX_FAILOVERS:
+                    raise e
+            except ProviderAuthError:
+                slot.disabled = True
+                METRICS.increment("auth_failures", provider=slot.name)
+                print(f"  ❌ {slot.name}: credentials rejected, removed from pool")
+            finally:
+                await self._release(slot)
+
+    def status(self):
+        """Live consumption per credential"""
+        return [slot.status() for slot in self.slots]
+
+    def print_status(self):
+        print("📊 Credential pool:")
+        for s in self.status():
+            quota = f"{s['quota']:,}/min" if s["quota"] else "unlimited"
+            state = "disabled" if s["disabled"] else "cooling" if s["coolingDown"] else "ok"
+            print(
+                f"   {s['name']:<16} {s['type']:<18} quota {quota:<16} "
+                f"used {s['usedLastMinute']:>9,} | {s['requests']} requests, "
+                f"{s['chars']:,} chars, {s['quotaErrors']} quota errors [{state}]"
+            )
+
+    async def close(self):
+        for slot in self.slots:
+            await slot.provider.close()
+
+
+def load_credential_pool(pool_file=DEFAULT_POOL_FILE, window=60.0):
+    """Build a QuotaScheduler from the pool file (or the single default credential)"""
+    pool_path = Path(pool_file)
+    if pool_path.exists():
+        with open(pool_path, "r", encoding="utf-8") as f:
+            pool = json.load(f)
+        configs = pool.get("providers", [])
+        cooldown = pool.get("cooldown", DEFAULT_COOLDOWN)
+    else:
+        configs = [
+            {
+                "type": "google_v3",
+                "name": "translateKey",
+                "credentials_file": os.getenv(
+                    "GOOGLE_SERVICE_ACCOUNT_FILE", str(PROJECT_ROOT / "translateKey.json")
+                ),
+                "project_id": os.getenv("GOOGLE_PROJECT_ID"),
+            }
+        ]
+        cooldown = DEFAULT_COOLDOWN
+
+    providers = []
+    for index, config in enumerate(configs):
+        config = dict(config)
+        config.setdefault("name", f"{config['type']}-{index + 1}")
+        providers.append(make_provider(config))
+    return QuotaScheduler(providers, cooldown=cooldown, window=window)
+
+
+async def simulate(keys, quota, texts, latency, window):
+    """Measure throughput of a stub pool with `keys` equally sized quotas"""
+    providers = [
+        StubProvider(
+            StubConfig(latency=latency),
+            limits=ProviderLimits(
+                max_batch_items=100,
+                max_batch_chars=5000,
+                max_concurrency=2,
+                chars_per_minute=quota,
+            ),
+            name=f"stub-{i + 1}",
+        )
+        for i in range(keys)
+    ]
+    scheduler = QuotaScheduler(providers, cooldown=1.0, window=window)
+    start = time.perf_counter()
+    await scheduler.translate_batch(texts, "zh-TW", "vi")
+    elapsed = time.perf_counter() - start
+    return scheduler, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the translation credential pool or simulate quota scheduling."
+    )
+    parser.add_argument(
+        "--pool",
+        default=str(DEFAULT_POOL_FILE),
+        help="Credential pool file (default: %(default)s)",
+    )
+    parser.add_argument("--status", action="store_true", help="Show the configured pool")
+    parser.add_argument(
+        "--simulate",
+        type=int,
+        metavar="KEYS",
+        help="Run a stub pool with 1..KEYS credentials and report throughput",
+    )
+    args = parser.parse_args()
+
+    if args.simulate:
+        # Short window and quota so the simulation finishes in a few seconds
+        window, quota, latency = 1.0, 20000, 0.02
+        texts = ["這是一個測試句子。" * 5] * 2000
+        print(f"🧪 Simulating {len(texts)} texts, {quota:,} chars per {window:.0f}s window per key")
+        for keys in range(1, args.simulate + 1):
+            scheduler, elapsed = asyncio.run(simulate(keys, quota, texts, latency, window))
+            total = sum(s["chars"] for s in scheduler.status())
+            print(f"   {keys} key(s): {elapsed:6.2f}s, {total / elapsed:,.0f} chars/s")
+        return
+
+    scheduler = load_credential_pool(args.pool)
+    scheduler.print_status()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Spaced-repetition scheduler (SM-2 with Again/Hard/Good/Easy ratings) for the
+mobile datasets, keyed like the data files: (dataset, id) with the file name as
+dataset, e.g. ("hsk_level1", 12) or ("tocfl_level3", 40).
+- Card state per (user, item) lives in parallel arrays (due, last review,
+  interval, ease, repetitions, lapses), a few dozen bytes per card
+- Every user has a heap of (due, card); rescheduling pushes a new entry and the
+  old one is skipped as stale when it surfaces, and a heap that is mostly stale
+  entries is rebuilt. due() pops the next N due cards and pushes them back, so
+  it costs O(N log n) however many cards a user has
+- review_many() checks and packs a whole batch of reviews first (a bad review
+  rejects the batch untouched), appends it to the log in one write, then
+  applies it and pushes one heap entry per touched card
+- The review log is append-only and struct-packed: a header, then 14 byte
+  review records (user, item, time, rating) and name records that introduce a
+  user or item the first time it is reviewed. Opening a log replays it, so the
+  log is the only state on disk; a torn record at the end (a crash mid-write)
+  is ignored and overwritten by the next append
+
+Usage:
+    python scripts/review_scheduler.py review alice hsk_level1 12 good
+    python scripts/review_scheduler.py due alice --limit 20
+    python scripts/review_scheduler.py stats
+    python scripts/review_scheduler.py bench --users 1000 --reviews 1000000
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import struct
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_pipeline import DATASETS
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_LOG_FILE = PROJECT_ROOT / "review_log.bin"
+
+RATINGS = {"again": 1, "hard": 2, "good": 3, "easy": 4}
+AGAIN, HARD, GOOD, EASY = 1, 2, 3, 4
+DAY = 86400
+START_EASE = 2.5
+MIN_EASE = 1.3
+EASY_BONUS = 1.3
+HARD_FACTOR = 1.2
+RELEARN_DELAY = 600  # Seconds until a forgotten card is due again
+MAX_INTERVAL = 36500.0  # Days
+MAX_COUNT = 0xFFFF  # Repetitions and lapses are uint16
+
+# Data file name -> kind, for the dataset part of an item key
+DATASET_KINDS = {spec.output_file.stem: spec.kind for spec in DATASETS.values()}
+
+LOG_MAGIC = b"RVLG"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sB")
+REVIEW_RECORD = struct.Struct("<BIIIB")  # tag, user, item, unix time, rating
+NAME_RECORD = struct.Struct("<BBH")  # tag, namespace, UTF-8 length; the name follows
+REVIEW_TAG, NAME_TAG = 1, 2
+USER_NAMES, ITEM_NAMES = 0, 1
+MAX_TIME = 0xFFFFFFFF  # Review times are uint32 in the log
+MAX_NAME_BYTES = 0xFFFF
+
+
+@dataclass(frozen=True)
+class CardState:
+    user: str
+    dataset: str
+    item_id: object
+    due: int  # Unix time
+    last_review: int
+    interval: float  # Days
+    ease: float
+    repetitions: int  # Successful reviews in a row
+    lapses: int
+
+
+def next_state(interval, ease, repetitions, rating, late_days):
+    """SM-2 step: (interval days, ease, repetitions, lapsed) after a review"""
+    if rating == AGAIN:
+        return 0.0, max(MIN_EASE, ease - 0.2), 0, True
+    if rating == HARD:
+        interval = min(max(1.0, interval * HARD_FACTOR), MAX_INTERVAL)
+        return interval, max(MIN_EASE, ease - 0.15), repetitions + 1, False
+    if repetitions == 0:
+        interval = 1.0
+    elif repetitions == 1:
+        interval = 6.0
+    else:
+        # A late review that still went well counts part of the delay
+        interval = (interval + late_days / 2) * ease
+    if rating == EASY:
+        interval = max(interval * EASY_BONUS, 4.0)
+        return min(interval, MAX_INTERVAL), ease + 0.15, repetitions + 1, False
+    return min(interval, MAX_INTERVAL), ease, repetitions + 1, False
+
+
+def item_name(dataset, item_id):
+    return json.dumps([dataset, item_id], ensure_ascii=False, separators=(",", ":"))
+
+
+class ReviewLog:
+    """Append-only binary log of reviews and the names they refer to"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.valid_size = None  # Bytes up to the last whole record, set by records()
+
+    def records(self):
+        """Yield ("name", namespace, text) and ("review", user, item, time, rating) in order"""
+        if not self.path.exists():
+            self.valid_size = 0
+            return
+        data = self.path.read_bytes()
+        if len(data) < LOG_HEADER.size:
+            self.valid_size = 0
+            return
+        magic, version = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{self.path} is not a version {LOG_VERSION} review log")
+        offset = LOG_HEADER.size
+        end = len(data)
+        while offset < end:
+            tag = data[offset]
+            if tag == REVIEW_TAG:
+                if offset + REVIEW_RECORD.size > end:
+                    break
+                _, user, item, at, rating = REVIEW_RECORD.unpack_from(data, offset)
+                offset += REVIEW_RECORD.size
+                yield "review", user, item, at, rating
+            elif tag == NAME_TAG:
+                if offset + NAME_RECORD.size > end:
+                    break
+                _, namespace, length = NAME_RECORD.unpack_from(data, offset)
+                start = offset + NAME_RECORD.size
+                if start + length > end:
+                    break
+                offset = start + length
+                yield "name", namespace, data[start:offset].decode("utf-8")
+            else:
+                raise ValueError(f"{self.path}: unknown record tag {tag} at byte {offset}")
+        self.valid_size = offset
+
+    def append(self, data):
+        if self.valid_size is None:
+            for _ in self.records():  # Finds where the whole records end
+                pass
+        os.makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, "r+b" if self.path.exists() else "wb") as f:
+            if self.valid_size < LOG_HEADER.size:
+                f.truncate(0)
+                f.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+                self.valid_size = LOG_HEADER.size
+            f.seek(self.valid_size)
+            f.truncate()  # Drops a torn record left by a crash
+            f.write(data)
+        self.valid_size += len(data)
+
+
+class ReviewScheduler:
+    def __init__(self, log_path=None):
+        self.log = ReviewLog(log_path) if log_path else None
+        self.users = []  # Index -> user name
+        self.user_index = {}
+        self.items = []  # Index -> (dataset, id)
+        self.item_keys = {}  # (dataset, id) -> index
+        self.cards = {}  # user << 32 | item -> card
+        self.card_user = array("I")
+        self.card_item = array("I")
+        self.due_at = array("q")  # Can lie past the uint32 review times
+        self.last_review = array("I")
+        self.interval = array("f")
+        self.ease = array("f")
+        self.repetitions = array("H")
+        self.lapses = array("H")
+        self.user_cards = []  # User index -> number of cards
+        self.heaps = []  # User index -> heap of (due, card), may hold stale entries
+        self.reviews = 0
+
+    @classmethod
+    def open(cls, log_path=DEFAULT_LOG_FILE):
+        """Scheduler with the state of every review in the log"""
+        scheduler = cls(log_path)
+        for record in scheduler.log.records():
+            if record[0] == "review":
+                _, user, item, at, rating = record
+                scheduler._apply(user, item, at, rating)
+            elif record[1] == USER_NAMES:
+                scheduler._add_user(record[2])
+            else:
+                scheduler._add_item(record[2])
+        # Replay pushed nothing; every heap is built once from the final state
+        for card, user in enumerate(scheduler.card_user):
+            scheduler.heaps[user].append((scheduler.due_at[card], card))
+        for heap in scheduler.heaps:
+            heapq.heapify(heap)
+        return scheduler
+
+    # --- Names and cards ---
+
+    def _add_user(self, name):
+        self.user_index[name] = len(self.users)
+        self.users.append(name)
+        self.user_cards.append(0)
+        self.heaps.append([])
+        return self.user_index[name]
+
+    def _add_item(self, name):
+        dataset, item_id = json.loads(name)
+        item = self.item_keys[(dataset, item_id)] = len(self.items)
+        self.items.append((dataset, item_id))
+        return item
+
+    def _card(self, user, item):
+        key = user << 32 | item
+        card = self.cards.get(key)
+        if card is None:
+            card = self.cards[key] = len(self.card_user)
+            self.card_user.append(user)
+            self.card_item.append(item)
+            self.due_at.append(0)
+            self.last_review.append(0)
+            self.interval.append(0.0)
+            self.ease.append(START_EASE)
+            self.repetitions.append(0)
+            self.lapses.append(0)
+            self.user_cards[user] += 1
+        return card
+
+    def _apply(self, user, item, at, rating):
+        card = self._card(user, item)
+        late_days = 0.0
+        if self.last_review[card]:
+            late_days = max(0.0, (at - self.due_at[card]) / DAY)
+        interval, ease, repetitions, lapsed = next_state(
+            self.interval[card], self.ease[card], self.repetitions[card], rating, late_days
+        )
+        self.interval[card] = interval
+        self.ease[card] = ease
+        self.repetitions[card] = min(repetitions, MAX_COUNT)
+        if lapsed:
+            self.lapses[card] = min(self.lapses[card] + 1, MAX_COUNT)
+        self.last_review[card] = at
+        self.due_at[card] = at + (RELEARN_DELAY if lapsed else round(interval * DAY))
+        self.reviews += 1
+        return card
+
+    def _compact_heap(self, user):
+        """Drop the stale and duplicate entries of a user's heap, O(entries)"""
+        heap = [entry for entry in set(self.heaps[user]) if self._is_current(entry)]
+        heapq.heapify(heap)
+        self.heaps[user] = heap
+
+    def _is_current(self, entry):
+        due, card = entry
+        return self.due_at[card] == due
+
+    # --- Reviews ---
+
+    def review(self, user, dataset, item_id, rating, at=None):
+        """Record one review; rating is 1-4 or again/hard/good/easy. Returns the CardState"""
+        self.review_many([(user, dataset, item_id, rating, at)])
+        return self.card(user, dataset, item_id)
+
+    def review_many(self, reviews):
+        """Apply (user, dataset, id, rating, unix time or None) reviews in order and append
+        them to the log in one write. Returns the number of reviews applied. The whole batch
+        is checked and packed first: a bad review rejects it without changing anything"""
+        now = int(time.time())
+        log = bytearray()
+        applied = []  # (user, item, time, rating)
+        new_users, new_items = {}, {}  # Name -> index they will get
+        for user_name, dataset, item_id, rating, at in reviews:
+            rating = RATINGS.get(rating, rating)
+            if rating not in (AGAIN, HARD, GOOD, EASY):
+                raise ValueError(f"Unknown rating {rating!r}, choose 1-4 or {tuple(RATINGS)}")
+            if dataset not in DATASET_KINDS:
+                raise ValueError(
+                    f"Unknown dataset '{dataset}', choose from {sorted(DATASET_KINDS)}"
+                )
+            if not isinstance(user_name, str):
+                raise ValueError(f"User names are strings, got {user_name!r}")
+            at = now if at is None else int(at)
+            if not 0 <= at <= MAX_TIME:
+                raise ValueError(f"Review time {at} is outside the log's uint32 range")
+            user = self.user_index.get(user_name, new_users.get(user_name))
+            if user is None:
+                user = new_users[user_name] = len(self.users) + len(new_users)
+                log += self._name_record(USER_NAMES, user_name)
+            item = self.item_keys.get((dataset, item_id))
+            if item is None:
+                name = item_name(dataset, item_id)
+                item = new_items.get(name)
+                if item is None:
+                    item = new_items[name] = len(self.items) + len(new_items)
+                    log += self._name_record(ITEM_NAMES, name)
+            log += REVIEW_RECORD.pack(REVIEW_TAG, user, item, at, rating)
+            applied.append((user, item, at, rating))
+
+        # The log first, so a failed write leaves the state as the log has it
+        if self.log and log:
+            self.log.append(bytes(log))
+        for user_name in new_users:  # In index order
+            self._add_user(user_name)
+        for name in new_items:
+            self._add_item(name)
+        touched = {self._apply(*review) for review in applied}
+        for card in touched:
+            user = self.card_user[card]
+            heap = self.heaps[user]
+            heapq.heappush(heap, (self.due_at[card], card))
+            if len(heap) > 2 * self.user_cards[user] + 64:
+                self._compact_heap(user)
+        return len(applied)
+
+    @staticmethod
+    def _name_record(namespace, name):
+        data = name.encode("utf-8")
+        if len(data) > MAX_NAME_BYTES:
+            raise ValueError(f"Name longer than {MAX_NAME_BYTES} bytes: {name[:40]}...")
+        return NAME_RECORD.pack(NAME_TAG, namespace, len(data)) + data
+
+    # --- Queries ---
+
+    def due(self, user_name, now=None, limit=20):
+        """Up to limit CardStates due at now (default: the current time), most overdue first"""
+        user = self.user_index.get(user_name)
+        if user is None:
+            return []
+        now = int(time.time()) if now is None else now
+        heap = self.heaps[user]
+        found, seen = [], set()
+        while heap and len(found) < limit:
+            entry = heapq.heappop(heap)
+            if not self._is_current(entry) or entry[1] in seen:
+                continue  # Stale: the card was rescheduled since
+            if entry[0] > now:
+                heapq.heappush(heap, entry)
+                break
+            found.append(entry)
+            seen.add(entry[1])
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [self._state(card) for _, card in found]
+
+    def next_due(self, user_name):
+        """Unix time the user's next card is due, or None without cards"""
+        user = self.user_index.get(user_name)
+        if user is None:
+            return None
+        heap = self.heaps[user]
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def card(self, user_name, dataset, item_id):
+        """CardState of an item, or None when the user never reviewed it"""
+        user = self.user_index.get(user_name)
+        item = self.item_keys.get((dataset, item_id))
+        if user is None or item is None:
+            return None
+        card = self.cards.get(user << 32 | item)
+        return None if card is None else self._state(card)
+
+    def _state(self, card):
+        dataset, item_id = self.items[self.card_item[card]]
+        return CardState(
+            self.users[self.card_user[card]],
+            dataset,
+            item_id,
+            self.due_at[card],
+            self.last_review[card],
+            round(self.interval[card], 3),
+            round(self.ease[card], 3),
+            self.repetitions[card],
+            self.lapses[card],
+        )
+
+    def stats(self, now=None):
+        now = int(time.time()) if now is None else now
+        return {
+            "users": len(self.users),
+            "items": len(self.items),
+            "cards": len(self.card_user),
+            "reviews": self.reviews,
+            "due": sum(1 for due in self.due_at if due <= now),
+            "heap_entries": sum(len(heap) for heap in self.heaps),
+        }
+
+
+# --- Command line ---
+
+
+def bench_items():
+    """(dataset, id) of every HSK and TOCFL entry in mobile/data, for the bench"""
+    items = []
+    for spec in DATASETS.values():
+        if spec.kind in ("hsk", "tocfl") and spec.output_file.exists():
+            with open(spec.output_file, "r", encoding="utf-8") as f:
+                items.extend((spec.output_file.stem, entry["id"]) for entry in json.load(f))
+    return items
+
+
+def run_bench(users, reviews, batch_size, log_path):
+    items = bench_items()
+    if not items:
+        print("❌ No HSK or TOCFL data files in mobile/data")
+        exit(1)
+    if log_path.exists():
+        log_path.unlink()
+    rng = random.Random(0)
+    scheduler = ReviewScheduler(log_path)
+    names = [f"user{index}" for index in range(users)]
+    per_user = max(1, min(len(items), reviews // users // 4))
+    studied = {name: rng.sample(items, per_user) for name in names}
+    start_time = 1_700_000_000
+
+    applied = 0
+    start = time.perf_counter()
+    while applied < reviews:
+        batch = []
+        at = start_time + applied * 30 * DAY // reviews  # A month of reviews
+        for _ in range(min(batch_size, reviews - applied)):
+            name = rng.choice(names)
+            dataset, item_id = rng.choice(studied[name])
+            batch.append((name, dataset, item_id, rng.choice((1, 2, 3, 3, 3, 4)), at))
+        applied += scheduler.review_many(batch)
+    elapsed = time.perf_counter() - start
+    size = log_path.stat().st_size
+    print(
+        f"⏱️  {applied:,} reviews of {len(scheduler.card_user):,} cards by {users:,} users: "
+        f"{elapsed:.2f}s ({applied / elapsed:,.0f} reviews/s), log {size / 1024 / 1024:.1f} MB "
+        f"({size / applied:.1f} bytes/review)"
+    )
+
+    now = start_time + 31 * DAY
+    # The first call per user also drops the stale entries at the top of the heap
+    for label in ("first", "repeat"):
+        timings = []
+        for name in names[:200]:
+            start = time.perf_counter()
+            scheduler.due(name, now, 20)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(
+            f"   due(20), {label} call: median {timings[len(timings) // 2] * 1e6:.0f}µs, "
+            f"max {timings[-1] * 1e6:.0f}µs"
+        )
+
+    start = time.perf_counter()
+    replayed = ReviewScheduler.open(log_path)
+    elapsed = time.perf_counter() - start
+    same = all(
+        replayed.due(name, now, 20) == scheduler.due(name, now, 20) for name in names[:50]
+    )
+    print(f"   replay: {elapsed:.2f}s, same due cards: {'yes' if same else 'NO'}")
+    log_path.unlink()
+
+
+def format_due(state):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(state.due))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spaced-repetition review scheduler.")
+    parser.add_argument(
+        "--log", default=str(DEFAULT_LOG_FILE), help="Review log file (default: %(default)s)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    review = commands.add_parser("review", help="Record a review")
+    review.add_argument("user")
+    review.add_argument("dataset", choices=sorted(DATASET_KINDS), help="Data file name")
+    review.add_argument("id", help="Entry id (the kanji for kanji files)")
+    review.add_argument("rating", choices=tuple(RATINGS))
+
+    due = commands.add_parser("due", help="List the cards due for a user")
+    due.add_argument("user")
+    due.add_argument("--limit", type=int, default=20)
+
+    commands.add_parser("stats", help="Users, cards and reviews in the log")
+
+    bench = commands.add_parser("bench", help="Time bulk reviews, due() and replay")
+    bench.add_argument("--users", type=int, default=1000)
+    bench.add_argument("--reviews", type=int, default=1_000_000)
+    bench.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        run_bench(args.users, args.reviews, args.batch_size, Path(args.log).with_suffix(".bench"))
+        return
+
+    scheduler = ReviewScheduler.open(args.log)
+    if args.command == "review":
+        item_id = args.id
+        if DATASET_KINDS[args.dataset] in ("hsk", "tocfl"):
+            item_id = int(item_id)
+        state = scheduler.review(args.user, args.dataset, item_id, args.rating)
+        print(
+            f"✅ {state.dataset} {state.item_id}: due {format_due(state)} "
+            f"(interval {state.interval:g} days, ease {state.ease:g})"
+        )
+    elif args.command == "due":
+        states = scheduler.due(args.user, limit=args.limit)
+        print(f"📅 {len(states)} due for {args.user}")
+        for state in states:
+            print(f"   {state.dataset:<14} {state.item_id!s:>6}  due {format_due(state)}")
+    else:
+        for name, value in scheduler.stats().items():
+            print(f"   {name:<14} {value:>12,}")
+
+
+if __name__ == "__main__":
+    main()
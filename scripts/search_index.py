@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Prebuilt inverted search index for the mobile datasets.
+Search in the app used to lowercase seven fields of every entry and run
+includes() on each keystroke. With the index, a query only touches the entries
+that can match:
+
+- Every searchable field is lowercased and folded (diacritics removed, đ → d),
+  so "xue sheng" finds "dà xué shēng" and "hoc" finds "học"; toned/diacritic
+  queries are folded the same way
+- Postings map every character bigram of the folded text, and every single CJK
+  character, to the positions of the entries containing it (delta-encoded)
+- A query intersects the postings of its bigrams (rarest first); queries longer
+  than one bigram are verified against the candidates' fields, so results are
+  exactly "some field contains the query"
+
+Positions are indexes into the dataset's entries (the order of mobile/data/*.json
+and of loadDataset() in the app). The fold table is stored in the index so the
+app folds queries exactly like this script; query characters missing from the
+table fall back to NFD with the combining marks stripped, on both sides.
+
+Output: mobile/data/search/<dataset>.json plus an index.js of lazy loaders.
+
+Usage:
+    python scripts/search_index.py
+    python scripts/search_index.py --dataset hsk1 --query "xue sheng"
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+import unicodedata
+from pathlib import Path
+
+from data_shards import datasets_by_file
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+SEARCH_DIR = MOBILE_DATA_DIR / "search"
+
+SEARCH_INDEX_VERSION = 1
+CJK_START = 0x2E80  # Characters from here on are indexed on their own as well
+
+# Searchable fields per dataset kind
+SEARCH_FIELDS = {
+    "hsk": (
+        "simplifiedChinese",
+        "traditionalChinese",
+        "pinyin",
+        "jyutping",
+        "hanviet",
+        "vietnamese",
+        "english",
+    ),
+    "tocfl": (
+        "simplifiedChinese",
+        "traditionalChinese",
+        "pinyin",
+        "jyutping",
+        "hanviet",
+        "vietnamese",
+        "english",
+    ),
+    "kanji": ("kanji", "onyomi", "kunyomi", "hanviet", "viet", "english"),
+    "sentences": (
+        "simplifiedChinese",
+        "traditionalChinese",
+        "pinyin",
+        "jyutping",
+        "hanviet",
+        "viet",
+        "english",
+    ),
+}
+
+
+def fold_char(char):
+    """Base form of a lowercase character without diacritics"""
+    if char == "đ":
+        return "d"
+    decomposed = unicodedata.normalize("NFD", char)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)) or char
+
+
+def build_fold_table(texts):
+    """{character: folded form} for every character in texts that folding changes"""
+    table = {}
+    for text in texts:
+        for char in set(text):
+            if char not in table:
+                folded = fold_char(char)
+                if folded != char:
+                    table[char] = folded
+    return table
+
+
+def fold_text(text, fold_table):
+    """Lowercase and fold text with fold_table; characters missing from the table
+    (diacritics the dataset never uses) are folded with fold_char"""
+    return "".join(
+        fold_table.get(c) or (c if c.isascii() else fold_char(c)) for c in text.lower()
+    )
+
+
+def text_grams(folded):
+    """Bigrams of a folded text plus its single CJK characters"""
+    grams = {folded[i : i + 2] for i in range(len(folded) - 1)}
+    grams.update(c for c in folded if ord(c) >= CJK_START)
+    return grams
+
+
+def encode_postings(positions):
+    """Sorted positions as deltas (first value absolute)"""
+    return [positions[0]] + [b - a for a, b in zip(positions, positions[1:])]
+
+
+def decode_postings(deltas):
+    positions = []
+    total = 0
+    for delta in deltas:
+        total += delta
+        positions.append(total)
+    return positions
+
+
+def build_search_index(dataset, kind, entries):
+    """Index the searchable fields of entries (a list of dicts)"""
+    fields = SEARCH_FIELDS[kind]
+    texts = [[str(entry.get(field, "")).lower() for field in fields] for entry in entries]
+    fold_table = build_fold_table(text for row in texts for text in row)
+
+    postings = {}
+    for position, row in enumerate(texts):
+        grams = set()
+        for text in row:
+            grams |= text_grams(fold_text(text, fold_table))
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "dataset": dataset,
+        "count": len(entries),
+        "fields": list(fields),
+        "fold": dict(sorted(fold_table.items())),
+        "postings": {gram: encode_postings(p) for gram, p in sorted(postings.items())},
+    }
+
+
+class SearchIndex:
+    """Query side of an index built by build_search_index()"""
+
+    def __init__(self, index, entries):
+        if index.get("version") != SEARCH_INDEX_VERSION:
+            raise ValueError(f"Search index version {index.get('version')} is not supported")
+        self.fields = index["fields"]
+        self.fold_table = index["fold"]
+        self.postings = index["postings"]
+        self.entries = entries
+        self._decoded = {}
+
+    def positions(self, gram):
+        if gram not in self._decoded:
+            self._decoded[gram] = decode_postings(self.postings.get(gram, []))
+        return self._decoded[gram]
+
+    def matches(self, position, folded_query):
+        entry = self.entries[position]
+        return any(
+            folded_query in fold_text(str(entry.get(field, "")), self.fold_table)
+            for field in self.fields
+        )
+
+    def search(self, query):
+        """Positions of the entries with a field containing query (ascending)"""
+        folded = fold_text(query.strip(), self.fold_table)
+        if not folded:
+            return list(range(len(self.entries)))
+        grams = text_grams(folded)
+        if not grams:
+            # A single Latin letter matches most entries anyway: scan
+            return [p for p in range(len(self.entries)) if self.matches(p, folded)]
+
+        lists = sorted((self.positions(g) for g in grams), key=len)
+        candidates = set(lists[0])
+        for positions in lists[1:]:
+            candidates.intersection_update(positions)
+            if not candidates:
+                return []
+        if len(folded) <= 2:
+            # The postings are exact for a single bigram or character
+            return sorted(candidates)
+        return sorted(p for p in candidates if self.matches(p, folded))
+
+
+def load_search_index(dataset, data_dir=MOBILE_DATA_DIR, search_dir=SEARCH_DIR):
+    """SearchIndex for a dataset from the generated index and its data file"""
+    for file_name, spec in datasets_by_file().items():
+        if spec.name == dataset:
+            break
+    else:
+        raise KeyError(f"Unknown dataset: {dataset}")
+    with open(Path(data_dir) / file_name, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    with open(Path(search_dir) / f"{dataset}.json", "r", encoding="utf-8") as f:
+        index = json.load(f)
+    return SearchIndex(index, entries)
+
+
+def build_all(data_dir=MOBILE_DATA_DIR):
+    """{dataset: index} for every known data file in data_dir"""
+    indexes = {}
+    for file_name, spec in sorted(datasets_by_file().items(), key=lambda kv: kv[1].name):
+        path = Path(data_dir) / file_name
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        indexes[spec.name] = build_search_index(spec.name, spec.kind, entries)
+    return indexes
+
+
+def loader_module(indexes):
+    lines = [
+        "// Generated by scripts/search_index.py - do not edit.",
+        "// Each index is only evaluated the first time its loader is called.",
+        "export const searchIndexLoaders = {",
+    ]
+    for dataset in indexes:
+        lines.append(f"  {dataset}: () => require('./{dataset}.json'),")
+    lines += ["};", ""]
+    return "\n".join(lines)
+
+
+def write_all(indexes, search_dir=SEARCH_DIR):
+    if Path(search_dir).exists():
+        shutil.rmtree(search_dir)
+    os.makedirs(search_dir)
+    for dataset, index in indexes.items():
+        path = Path(search_dir) / f"{dataset}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        print(
+            f"✅ {dataset}: {index['count']} entries, {len(index['postings'])} grams "
+            f"({os.path.getsize(path) / 1024:,.0f} KB)"
+        )
+    (Path(search_dir) / "index.js").write_text(loader_module(indexes), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the search indexes.")
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Input directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output-dir", default=str(SEARCH_DIR), help="Output directory (default: %(default)s)"
+    )
+    parser.add_argument("--dataset", help="Dataset to query (with --query)")
+    parser.add_argument("--query", help="Search an existing index instead of building")
+    args = parser.parse_args()
+
+    if args.query is not None:
+        index = load_search_index(args.dataset or "hsk1", args.data_dir, args.output_dir)
+        start = time.perf_counter()
+        positions = index.search(args.query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🔍 {len(positions)} matches in {elapsed:.2f} ms")
+        for position in positions[:20]:
+            entry = index.entries[position]
+            print(f"   {position:>5}  " + " | ".join(str(entry.get(f, "")) for f in index.fields[:4]))
+        return
+
+    write_all(build_all(args.data_dir), args.output_dir)
+    print(f"📁 Search indexes → {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
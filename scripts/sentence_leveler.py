@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Incremental HSK/TOCFL leveling of the sentence corpus (vocabCsv/sentences.csv).
+- Classifies sentences exactly like check_all_levels.c: a sentence's level is
+  the lowest level L whose vocabulary (levels 1..L) segments every Chinese
+  character of it, greedily taking the longest word at each position
+  (0 when no level does)
+- Keeps a character → sentence inverted index, so a vocabulary change only
+  reclassifies the sentences containing a changed word instead of all 18.9k
+- Reports the sentences whose level changes; --write updates just those rows
+  of sentences.csv (every other line is left byte for byte)
+
+A word's effective level is the lowest level listing it, so a diff is the set
+of words whose effective level changed (added, removed or moved). The new
+vocabulary comes from --new-vocab (another directory of <kind>_level<N>_sorted.csv
+files), --lexicon (the current mobile data, see build_lexicon.py) or --diff,
+a JSON file like {"hsk": {"词语": 3, "旧词": null}, "tocfl": {...}}. --write only
+touches the sentence file: regenerate the word lists themselves
+(build_lexicon.py --vocab-csv) so that later runs start from the new vocabulary.
+The word lists are build outputs, not committed: without them the script stops
+with an error (a missing list would quietly move sentences to level 0) unless
+--vocab-from-lexicon takes the current vocabulary from the mobile data (which
+only covers the levels that have a data file).
+
+Usage:
+    python scripts/sentence_leveler.py --lexicon
+    python scripts/sentence_leveler.py --diff vocab_diff.json --write
+    python scripts/sentence_leveler.py --new-vocab /tmp/new_vocab --report changes.json
+    python scripts/sentence_leveler.py --full
+    python scripts/sentence_leveler.py --full --vocab-from-lexicon
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+VOCAB_CSV_DIR = PROJECT_ROOT / "vocabCsv"
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+SENTENCES_CSV = VOCAB_CSV_DIR / "sentences.csv"
+
+# Same limits as check_all_levels.c
+MAX_LEVELS = {"hsk": 7, "tocfl": 5}
+MAX_WORD_BYTES = 99
+LEVEL_COLUMNS = {"hsk": "HSK Level", "tocfl": "TOCFL Level"}
+
+
+def is_chinese_char(char):
+    """3-byte UTF-8 character with lead byte E4-E9 (the C classifier's test)"""
+    return 0x4000 <= ord(char) <= 0x9FFF
+
+
+def vocab_paths(vocab_dir, kind):
+    """Word list paths of levels 1..N. Raises FileNotFoundError when there are none, or
+    when a level is missing below one that exists (every word above it would move down);
+    levels past the last list are simply not built (no data for them)"""
+    paths = [
+        Path(vocab_dir) / f"{kind}_level{level}_sorted.csv"
+        for level in range(1, MAX_LEVELS[kind] + 1)
+    ]
+    present = [path.exists() for path in paths]
+    if not any(present):
+        raise FileNotFoundError(
+            f"No {kind}_level<N>_sorted.csv word lists in {vocab_dir}: generate them with "
+            f"build_lexicon.py --vocab-csv, or use --vocab-from-lexicon"
+        )
+    last = max(index for index, exists in enumerate(present) if exists)
+    missing = [str(path) for path, exists in zip(paths[:last], present) if not exists]
+    if missing:
+        raise FileNotFoundError(f"Missing {kind} word lists: {', '.join(missing)}")
+    return paths[: last + 1]
+
+
+def load_vocab(vocab_dir, kind):
+    """{word: lowest level listing it} from <kind>_level<N>_sorted.csv"""
+    vocab = {}
+    for level, path in enumerate(vocab_paths(vocab_dir, kind), 1):
+        with open(path, "r", encoding="utf-8") as f:
+            next(f, None)  # Header
+            for line in f:
+                word = line.rstrip("\r\n").split(",", 1)[0]
+                if word and len(word.encode("utf-8")) <= MAX_WORD_BYTES:
+                    vocab.setdefault(word, level)
+    return vocab
+
+
+def lexicon_vocab(data_dir, kind):
+    """{word: lowest level} from the lexicon of the mobile data"""
+    from build_lexicon import build_lexicon, level_words
+
+    lexicon = build_lexicon(data_dir)
+    vocab = {}
+    for level in range(1, MAX_LEVELS[kind] + 1):
+        for word in level_words(lexicon, kind, level):
+            vocab.setdefault(word, level)
+    return vocab
+
+
+def apply_diff(vocab, changes):
+    """Copy of vocab with {word: new level or None (removed)} applied"""
+    updated = dict(vocab)
+    for word, level in changes.items():
+        if level is None:
+            updated.pop(word, None)
+        else:
+            updated[word] = int(level)
+    return updated
+
+
+def vocab_diff(old, new):
+    """{word: (old level, new level)} for words whose effective level changed"""
+    return {
+        word: (old.get(word), new.get(word))
+        for word in old.keys() | new.keys()
+        if old.get(word) != new.get(word)
+    }
+
+
+def can_segment(text, vocab, max_level, longest):
+    """Greedy longest-match segmentation with the words of levels 1..max_level"""
+    position = 0
+    while position < len(text):
+        if not is_chinese_char(text[position]):
+            position += 1
+            continue
+        for length in range(min(longest, len(text) - position), 0, -1):
+            level = vocab.get(text[position : position + length])
+            if level is not None and level <= max_level:
+                position += length
+                break
+        else:
+            return False
+    return True
+
+
+def classify(text, vocab, max_levels, longest):
+    """Lowest level that segments text, 0 if none"""
+    for level in range(1, max_levels + 1):
+        if can_segment(text, vocab, level, longest):
+            return level
+    return 0
+
+
+def longest_word(vocab):
+    return max((len(word) for word in vocab), default=1)
+
+
+class SentenceLeveler:
+    """Sentences, their current levels and a character → sentence index"""
+
+    def __init__(self, texts, levels, vocabs):
+        self.texts = texts
+        self.levels = levels  # {kind: [level per sentence]}
+        self.vocabs = vocabs  # {kind: {word: level}}
+        self.index = {}
+        for sentence_id, text in enumerate(texts):
+            for char in set(text):
+                if is_chinese_char(char):
+                    self.index.setdefault(char, []).append(sentence_id)
+
+    def sentences_with(self, word):
+        """Ids of the sentences containing word"""
+        chars = {c for c in word if is_chinese_char(c)}
+        if not chars:
+            return set()
+        postings = sorted((self.index.get(c, []) for c in chars), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+        return {s for s in candidates if word in self.texts[s]}
+
+    def affected(self, diff):
+        """Sentences whose classification may depend on the changed words"""
+        sentence_ids = set()
+        for word in diff:
+            sentence_ids |= self.sentences_with(word)
+        return sentence_ids
+
+    def relevel(self, kind, new_vocab):
+        """Reclassify the sentences affected by new_vocab
+
+        Returns (diff, rechecked sentence count, changes), changes being a list
+        of (sentence id, old level, new level). The leveler then holds
+        new_vocab and the new levels.
+        """
+        diff = vocab_diff(self.vocabs[kind], new_vocab)
+        affected = self.affected(diff)
+        longest = longest_word(new_vocab)
+        changes = []
+        for sentence_id in sorted(affected):
+            level = classify(self.texts[sentence_id], new_vocab, MAX_LEVELS[kind], longest)
+            if level != self.levels[kind][sentence_id]:
+                changes.append((sentence_id, self.levels[kind][sentence_id], level))
+                self.levels[kind][sentence_id] = level
+        self.vocabs[kind] = new_vocab
+        return diff, len(affected), changes
+
+    def classify_all(self, kind):
+        """Full reclassification with the current vocabulary (like the C tool)"""
+        vocab = self.vocabs[kind]
+        longest = longest_word(vocab)
+        return [classify(text, vocab, MAX_LEVELS[kind], longest) for text in self.texts]
+
+
+def parse_level(value):
+    value = value.strip()
+    return int(value) if value.isdigit() else 0
+
+
+def read_sentences(path=SENTENCES_CSV):
+    """(raw lines, texts, {kind: levels}) of sentences.csv"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        lines = f.read().splitlines(keepends=True)
+    reader = csv.DictReader(io.StringIO("".join(lines)))
+    rows = list(reader)
+    if reader.fieldnames[-2:] != list(LEVEL_COLUMNS.values()):
+        raise ValueError(f"{path}: run check_all_levels.c once to add the level columns")
+    if len(rows) != len(lines) - 1:
+        raise ValueError(f"{path}: expected one sentence per line")
+    texts = [row["Characters"] for row in rows]
+    levels = {
+        kind: [parse_level(row.get(column) or "") for row in rows]
+        for kind, column in LEVEL_COLUMNS.items()
+    }
+    return lines, texts, levels
+
+
+def write_levels(path, lines, changes):
+    """Rewrite the level columns of the changed rows only"""
+    updated = list(lines)
+    for kind, kind_changes in changes.items():
+        column = -2 if kind == "hsk" else -1  # The level columns come last
+        for sentence_id, _, level in kind_changes:
+            line = updated[sentence_id + 1]
+            ending = line[len(line.rstrip("\r\n")) :]
+            fields = line.rstrip("\r\n").rsplit(",", 2)
+            fields[column] = str(level)
+            updated[sentence_id + 1] = ",".join(fields) + ending
+    temp_path = Path(path).with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8", newline="") as f:
+        f.writelines(updated)
+    os.replace(temp_path, path)
+
+
+def print_changes(kind, texts, diff, affected, changes, limit=20):
+    print(
+        f"📚 {kind.upper()}: {len(diff)} changed words, {affected} sentences rechecked, "
+        f"{len(changes)} level changes"
+    )
+    moves = {}
+    for _, old, new in changes:
+        moves[(old, new)] = moves.get((old, new), 0) + 1
+    for (old, new), count in sorted(moves.items()):
+        print(f"   level {old} → {new}: {count}")
+    for sentence_id, old, new in changes[:limit]:
+        print(f"   {sentence_id:>6}  {old} → {new}  {texts[sentence_id]}")
+    if len(changes) > limit:
+        print(f"   ... and {len(changes) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reclassify only the sentences affected by a vocabulary change."
+    )
+    parser.add_argument(
+        "--sentences", default=str(SENTENCES_CSV), help="Sentence corpus (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--vocab-dir",
+        default=str(VOCAB_CSV_DIR),
+        help="Current classifier word lists (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--vocab-from-lexicon",
+        action="store_true",
+        help="Take the current vocabulary from the --data-dir lexicon instead of --vocab-dir",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--new-vocab", help="Directory with the new word lists")
+    source.add_argument(
+        "--lexicon", action="store_true", help="New word lists from the mobile data lexicon"
+    )
+    source.add_argument("--diff", help="JSON file of {kind: {word: new level or null}}")
+    source.add_argument(
+        "--full",
+        action="store_true",
+        help="Reclassify every sentence with the current word lists and compare",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=str(MOBILE_DATA_DIR),
+        help="Mobile data for --lexicon and --vocab-from-lexicon",
+    )
+    parser.add_argument("--report", help="Write the level changes to this JSON file")
+    parser.add_argument(
+        "--write", action="store_true", help="Update the changed rows of the sentence file"
+    )
+    args = parser.parse_args()
+
+    lines, texts, levels = read_sentences(args.sentences)
+    try:
+        if args.vocab_from_lexicon:
+            vocabs = {kind: lexicon_vocab(args.data_dir, kind) for kind in MAX_LEVELS}
+        else:
+            vocabs = {kind: load_vocab(args.vocab_dir, kind) for kind in MAX_LEVELS}
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        exit(1)
+    leveler = SentenceLeveler(texts, levels, vocabs)
+    print(f"📖 {len(texts)} sentences, {len(leveler.index)} indexed characters")
+
+    if args.diff:
+        with open(args.diff, "r", encoding="utf-8") as f:
+            requested = json.load(f)
+    changes = {}
+    report = {}
+    start = time.perf_counter()
+    for kind in MAX_LEVELS:
+        if args.full:
+            new_levels = leveler.classify_all(kind)
+            diff = {}
+            affected = len(texts)
+            changes[kind] = [
+                (s, old, new)
+                for s, (old, new) in enumerate(zip(levels[kind], new_levels))
+                if old != new
+            ]
+        else:
+            if args.new_vocab:
+                new_vocab = load_vocab(args.new_vocab, kind)
+            elif args.lexicon:
+                new_vocab = lexicon_vocab(args.data_dir, kind)
+            else:
+                new_vocab = apply_diff(vocabs[kind], requested.get(kind, {}))
+            diff, affected, changes[kind] = leveler.relevel(kind, new_vocab)
+        print_changes(kind, texts, diff, affected, changes[kind])
+        report[kind] = {
+            "changedWords": {word: list(levels_) for word, levels_ in sorted(diff.items())},
+            "rechecked": affected,
+            "changes": [
+                {"sentence": s, "text": texts[s], "old": old, "new": new}
+                for s, old, new in changes[kind]
+            ],
+        }
+    print(f"⏱️  Leveled in {time.perf_counter() - start:.2f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 Report → {args.report}")
+    if args.write and any(changes.values()):
+        write_levels(args.sentences, lines, changes)
+        print(f"💾 Updated {sum(len(c) for c in changes.values())} levels in {args.sentences}")
+
+
+if __name__ == "__main__":
+    main()
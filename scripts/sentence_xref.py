@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Vocabulary → example sentence cross-reference.
+- An Aho–Corasick automaton over every HSK/TOCFL headword of the lexicon
+  (variants like 爸爸｜爸 and 白（形） become plain words, see build_lexicon.py)
+  finds every occurrence of every word in one pass over each sentence, instead
+  of scanning all sentences once per word
+- For each headword: the ids of the sentences containing it, ranked by the
+  sentence's level (HSK level for HSK words, TOCFL level otherwise; unleveled
+  sentences last), then by length, plus its corpus frequency (occurrences;
+  overlapping variants such as 爸爸 and 爸 in 爸爸 count once)
+
+Two outputs:
+- vocabCsv/sentence_xref.json for the build tools, over vocabCsv/sentences.csv
+  (sentence id = row number after the header, from 0)
+- mobile/data/xref/sentences.json for the app, over the app's sentences
+  (sentence id = position in loadDataset('sentences')), plus an index.js loader
+
+Usage:
+    python scripts/sentence_xref.py
+    python scripts/sentence_xref.py --word 朋友
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+
+from build_lexicon import build_lexicon, classifier_words
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+VOCAB_CSV_DIR = PROJECT_ROOT / "vocabCsv"
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+SENTENCES_CSV = VOCAB_CSV_DIR / "sentences.csv"
+CORPUS_XREF_FILE = VOCAB_CSV_DIR / "sentence_xref.json"
+APP_SENTENCES_FILE = MOBILE_DATA_DIR / "sentances.json"
+APP_XREF_DIR = MOBILE_DATA_DIR / "xref"
+
+XREF_VERSION = 1
+UNLEVELED = 99  # Sort key for sentences without a level
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one pass"""
+
+    def __init__(self):
+        self.goto = [{}]  # node -> {character: node}
+        self.fail = [0]
+        self.outputs = [[]]  # node -> values of the patterns ending exactly here
+        self.output_link = [None]  # nearest node on the fail chain with outputs
+        self.depth = [0]  # node -> length of the pattern ending there
+        self.built = False
+
+    def add(self, pattern, value):
+        if self.built:
+            raise RuntimeError("Cannot add patterns after build()")
+        node = 0
+        for char in pattern:
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.output_link.append(None)
+                self.depth.append(self.depth[node] + 1)
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        self.outputs[node].append(value)
+
+    def build(self):
+        """Compute the failure and output links (breadth first)"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                fallback = self.goto[state].get(char, 0)
+                self.fail[child] = fallback
+                self.output_link[child] = (
+                    fallback if self.outputs[fallback] else self.output_link[fallback]
+                )
+        self.built = True
+        return self
+
+    def iter_matches(self, text):
+        """Yield (end index, value) for every pattern occurrence in text"""
+        for _, end, value in self.iter_spans(text):
+            yield end - 1, value
+
+    def iter_spans(self, text):
+        """Yield (start, end, value) for every pattern occurrence in text[start:end]"""
+        if not self.built:
+            self.build()
+        goto, fail, outputs, output_link = self.goto, self.fail, self.outputs, self.output_link
+        depth = self.depth
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match = node if outputs[node] else output_link[node]
+            while match is not None:
+                for value in outputs[match]:
+                    yield index + 1 - depth[match], index + 1, value
+                match = output_link[match]
+
+    def __len__(self):
+        return len(self.goto)
+
+
+def headword_automaton(lexicon):
+    """(automaton, headwords, kinds): patterns map to indexes into headwords"""
+    headwords = []
+    kinds = []
+    index = {}
+    automaton = AhoCorasick()
+    for record in lexicon["entries"]:
+        headword = record["simplifiedChinese"]
+        if headword not in index:
+            index[headword] = len(headwords)
+            headwords.append(headword)
+            kinds.append("hsk" if record["hsk"] else "tocfl")
+            for word in classifier_words(headword):
+                automaton.add(word, index[headword])
+        elif record["hsk"]:
+            kinds[index[headword]] = "hsk"
+    return automaton.build(), headwords, kinds
+
+
+def read_corpus_sentences(path=SENTENCES_CSV):
+    """[(text, hsk level, tocfl level)] of the sentence corpus"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            (row["Characters"], row.get("HSK Level", ""), row.get("TOCFL Level", ""))
+            for row in csv.DictReader(f)
+        ]
+
+
+def read_app_sentences(path=APP_SENTENCES_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            (entry["simplifiedChinese"], entry["hsk_level"], entry["tocfl_level"])
+            for entry in json.load(f)
+        ]
+
+
+def level_key(level):
+    level = str(level).strip()
+    return int(level) if level.isdigit() and int(level) > 0 else UNLEVELED
+
+
+def count_occurrences(spans):
+    """Occurrences of one headword from the (start, end) spans of its variants:
+    leftmost-longest, so a variant inside a counted span is not counted again"""
+    if len(spans) == 1:
+        return 1
+    count = 0
+    covered = 0
+    for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if start >= covered:
+            count += 1
+            covered = end
+    return count
+
+
+def build_xref(sentences, automaton, headwords, kinds):
+    """{"version", "sentences", "words": {headword: {"frequency", "sentences"}}}"""
+    frequency = [0] * len(headwords)
+    postings = [[] for _ in headwords]
+    for sentence_id, (text, _, _) in enumerate(sentences):
+        spans = {}
+        for start, end, word in automaton.iter_spans(text):
+            spans.setdefault(word, []).append((start, end))
+        for word, found in spans.items():
+            frequency[word] += count_occurrences(found)
+            postings[word].append(sentence_id)
+
+    keys = {
+        kind: [
+            (level_key(levels[0] if kind == "hsk" else levels[1]), len(text))
+            for text, *levels in sentences
+        ]
+        for kind in ("hsk", "tocfl")
+    }
+    words = {}
+    for word, headword in enumerate(headwords):
+        if not postings[word]:
+            continue
+        sort_keys = keys[kinds[word]]
+        words[headword] = {
+            "frequency": frequency[word],
+            "sentences": sorted(postings[word], key=lambda s: (sort_keys[s], s)),
+        }
+    return {"version": XREF_VERSION, "sentences": len(sentences), "words": words}
+
+
+def write_xref(xref, path):
+    os.makedirs(Path(path).parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(xref, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_app_xref(xref, xref_dir=APP_XREF_DIR):
+    if Path(xref_dir).exists():
+        shutil.rmtree(xref_dir)
+    write_xref(xref, Path(xref_dir) / "sentences.json")
+    (Path(xref_dir) / "index.js").write_text(
+        "// Generated by scripts/sentence_xref.py - do not edit.\n"
+        "export const sentenceXrefLoader = () => require('./sentences.json');\n",
+        encoding="utf-8",
+    )
+
+
+def print_summary(name, xref, headwords, elapsed):
+    words = xref["words"]
+    postings = sum(len(w["sentences"]) for w in words.values())
+    print(
+        f"✅ {name}: {len(words)}/{len(headwords)} words found in {xref['sentences']} "
+        f"sentences, {postings} postings ({elapsed:.2f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cross-reference vocabulary words and example sentences."
+    )
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Vocabulary data (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--corpus", default=str(SENTENCES_CSV), help="Sentence corpus (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output", default=str(CORPUS_XREF_FILE), help="Corpus index (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--app-dir", default=str(APP_XREF_DIR), help="App index directory (default: %(default)s)"
+    )
+    parser.add_argument("--word", help="Print the top example sentences of a headword")
+    args = parser.parse_args()
+
+    lexicon = build_lexicon(args.data_dir)
+    automaton, headwords, kinds = headword_automaton(lexicon)
+    print(f"🔤 {len(headwords)} headwords, automaton of {len(automaton)} states")
+
+    sentences = read_corpus_sentences(args.corpus)
+    start = time.perf_counter()
+    xref = build_xref(sentences, automaton, headwords, kinds)
+    print_summary("corpus", xref, headwords, time.perf_counter() - start)
+
+    if args.word:
+        info = xref["words"].get(args.word)
+        if not info:
+            print(f"❌ '{args.word}' does not occur in the corpus")
+            exit(1)
+        print(f"🔍 {args.word}: {info['frequency']} occurrences in {len(info['sentences'])} sentences")
+        for sentence_id in info["sentences"][:10]:
+            text, hsk_level, tocfl_level = sentences[sentence_id]
+            print(f"   {sentence_id:>6}  HSK {hsk_level or '-'} TOCFL {tocfl_level or '-'}  {text}")
+        return
+
+    write_xref(xref, args.output)
+    print(f"📁 Corpus index → {args.output}")
+
+    app_sentences = read_app_sentences(Path(args.data_dir) / APP_SENTENCES_FILE.name)
+    start = time.perf_counter()
+    app_xref = build_xref(app_sentences, automaton, headwords, kinds)
+    print_summary("app", app_xref, headwords, time.perf_counter() - start)
+    write_app_xref(app_xref, args.app_dir)
+    print(f"📁 App index → {args.app_dir}")
+
+
+if __name__ == "__main__":
+    main()
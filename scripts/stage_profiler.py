@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+--profile cpu|mem for the build entry points, one profile per build stage.
+- cpu: a cProfile profile per stage (<stage>.pstats, for pstats/snakeviz) and
+  a sampled call stack of every thread every few milliseconds, written as
+  <stage>.collapsed ("frame;frame;frame count" lines) for flamegraph.pl,
+  speedscope or inferno
+- mem: tracemalloc per stage: the peak traced memory above the stage's
+  starting point, the top allocators (<stage>.top.txt, net bytes per source
+  line), the allocation stacks as <stage>.collapsed (weighted by bytes) and a
+  snapshot at the stage's end (<stage>.tracemalloc, for
+  tracemalloc.Snapshot.load)
+- Everything goes to one run directory (profiles/<timestamp>-<mode> by default)
+  together with summary.json; the scripts print a summary table at the end
+
+A stage that runs several times (per dataset, per batch) accumulates into one
+profile. Stages do not nest: a stage started while another one is active counts
+towards the outer stage. cProfile only sees the thread that runs the stage and
+worker processes are not profiled at all, so profile the build with
+--sequential for per-stage numbers; the staged build is one "build" stage.
+
+Usage (through the entry points):
+    python scripts/build_pipeline.py hsk1 --stub --sequential --profile cpu
+    python scripts/process_sentences.py --tocfl-level 1 --profile mem
+    flamegraph.pl profiles/<run>/translate-vi.collapsed > translate.svg
+"""
+
+import cProfile
+import contextlib
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+PROFILES_DIR = PROJECT_ROOT / "profiles"
+
+PROFILE_MODES = ("cpu", "mem")
+SAMPLE_INTERVAL = 0.005  # Seconds between stack samples (cpu)
+# Stack depth kept per allocation (mem). Tracing cost grows with the depth:
+# annotating hsk1 takes ~6s with 1 frame and ~40s with 8
+TRACEMALLOC_FRAMES = 4
+TOP_ALLOCATORS = 25
+
+
+def frame_label(code):
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of every other thread and attributes them to the active stage"""
+
+    def __init__(self, profiler, interval=SAMPLE_INTERVAL):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.labels = {}  # code object -> frame label
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            stage = self.profiler.active
+            if stage is None:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code not in self.labels:
+                        self.labels[code] = frame_label(code)
+                    stack.append(self.labels[code])
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stage.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class StageProfile:
+    """Accumulated profile of one stage name"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.profile = None  # cProfile.Profile (cpu)
+        self.samples = Counter()  # collapsed stack -> samples (cpu) or bytes (mem)
+        self.peak = 0  # Bytes above the stage's starting point (mem)
+        self.allocators = Counter()  # "file:line" -> net bytes (mem)
+        self.snapshot = None
+
+
+class StageProfiler:
+    """No-op until start(); then stage() profiles the code inside it"""
+
+    def __init__(self):
+        self.mode = None
+        self.run_dir = None
+        self.stages = {}
+        self.active = None
+        self.sampler = None
+        self.started = None
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def start(self, mode, run_dir=None, frames=TRACEMALLOC_FRAMES):
+        """Enable profiling; returns the run directory"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', choose from {PROFILE_MODES}")
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.run_dir = Path(run_dir or PROFILES_DIR / f"{stamp}-{mode}")
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.mode = mode
+        self.started = time.perf_counter()
+        if mode == "cpu":
+            self.sampler = StackSampler(self)
+            self.sampler.start()
+        else:
+            tracemalloc.start(frames)
+        return self.run_dir
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enabled or self.active is not None:
+            yield
+            return
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageProfile(name)
+        if self.mode == "mem":
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        elif stage.profile is None:
+            stage.profile = cProfile.Profile()
+        self.active = stage
+        start = time.perf_counter()
+        if self.mode == "cpu":
+            stage.profile.enable()
+        try:
+            yield
+        finally:
+            if self.mode == "cpu":
+                stage.profile.disable()
+            stage.seconds += time.perf_counter() - start
+            stage.calls += 1
+            self.active = None
+            if self.mode == "mem":
+                self._record_memory(stage, before, baseline)
+
+    def _record_memory(self, stage, before, baseline):
+        peak = tracemalloc.get_traced_memory()[1]
+        stage.peak = max(stage.peak, peak - baseline)
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        for diff in snapshot.compare_to(before, "traceback"):
+            if diff.size_diff <= 0:
+                continue
+            frames = diff.traceback  # Oldest call first
+            top = frames[-1]
+            stage.allocators[f"{top.filename}:{top.lineno}"] += diff.size_diff
+            stack = ";".join(f"{Path(frame.filename).stem}:{frame.lineno}" for frame in frames)
+            stage.samples[stack] += diff.size_diff
+        stage.snapshot = snapshot
+
+    def finish(self):
+        """Write every stage's files and summary.json; returns the summary"""
+        if not self.enabled:
+            return None
+        if self.sampler:
+            self.sampler.stop()
+        summary = {
+            "mode": self.mode,
+            "wall": round(time.perf_counter() - self.started, 3),
+            "python": sys.version.split()[0],
+            "stages": {},
+        }
+        for name, stage in self.stages.items():
+            summary["stages"][name] = self._write_stage(stage)
+        with open(self.run_dir / "summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        if self.mode == "mem":
+            tracemalloc.stop()
+        self.mode = None
+        return summary
+
+    def _write_stage(self, stage):
+        base = self.run_dir / stage.name
+        result = {"calls": stage.calls, "seconds": round(stage.seconds, 4)}
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, weight in sorted(stage.samples.items()):
+                f.write(f"{stack} {weight}\n")
+        if self.mode == "cpu":
+            stage.profile.dump_stats(f"{base}.pstats")
+            stats = pstats.Stats(stage.profile)
+            functions = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+            result["samples"] = sum(stage.samples.values())
+            result["top"] = [
+                {
+                    "function": f"{Path(file).name}:{line}({function})",
+                    "calls": calls,
+                    "cumulative": round(cumulative, 4),
+                }
+                for (file, line, function), (_, calls, _, cumulative, _) in functions[:10]
+            ]
+        else:
+            stage.snapshot.dump(f"{base}.tracemalloc")
+            with open(f"{base}.top.txt", "w", encoding="utf-8") as f:
+                f.write(f"Peak above stage start: {stage.peak / 1024:,.0f} KB\n")
+                for location, size in stage.allocators.most_common(TOP_ALLOCATORS):
+                    f.write(f"{size / 1024:>12,.1f} KB  {location}\n")
+            result["peak"] = stage.peak
+            result["top"] = [
+                {"location": location, "bytes": size}
+                for location, size in stage.allocators.most_common(10)
+            ]
+        return result
+
+
+PROFILER = StageProfiler()
+
+
+def print_profile_summary(summary, run_dir):
+    print(f"🔬 {summary['mode'].upper()} profile ({summary['wall']:.1f}s) → {run_dir}")
+    for name, stage in summary["stages"].items():
+        line = f"   {name:<24} {stage['calls']:>6} calls {stage['seconds']:>9.3f}s"
+        if summary["mode"] == "mem":
+            line += f"  peak {stage['peak'] / 1024 / 1024:>8.1f} MB"
+            if stage["top"]:
+                line += f"  top {Path(stage['top'][0]['location']).name}"
+        elif stage["top"]:
+            line += f"  {stage['samples']:>6} samples  top {stage['top'][0]['function']}"
+        print(line)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help="Profile every stage (CPU: pstats + flamegraph stacks, mem: tracemalloc)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help=f"Run directory for --profile (default: {PROFILES_DIR}/<timestamp>-<mode>)",
+    )
+    parser.add_argument(
+        "--profile-frames",
+        type=int,
+        default=TRACEMALLOC_FRAMES,
+        help="Stack frames kept per allocation with --profile mem (default: %(default)s)",
+    )
+
+
+def start_from_args(args):
+    """Start PROFILER when the entry point was given --profile"""
+    if args.profile:
+        run_dir = PROFILER.start(args.profile, args.profile_dir, args.profile_frames)
+        print(f"🔬 Profiling ({args.profile}) into {run_dir}")
+
+
+def finish_and_print():
+    run_dir = PROFILER.run_dir
+    summary = PROFILER.finish()
+    if summary:
+        print_profile_summary(summary, run_dir)
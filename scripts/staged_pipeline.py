@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Staged (pipelined) execution of the dataset build.
+The per-dataset scripts run every batch in lockstep: translate (network), then
+Jyutping/Han Viet (CPU), then sleep. Here each kind of work is its own stage and
+the stages overlap:
+
+    read CSV ──▶ translate (asyncio) ──▶ annotate (process pool) ──▶ ordered sink
+              queue                  queue                       queue
+
+- Read: parses the CSVs on a worker thread and emits numbered batches
+- Translate: several coroutines run the dataset's translation steps on a batch
+  (cache first, fault-isolating batches) while other batches are on the wire
+- Annotate: Jyutping, Han Viet and character counts in worker processes; each
+  worker loads the Jyutping dictionary and Han Viet table once
+- Sink: writes each dataset's JSON incrementally, in source order, even though
+  batches finish out of order
+
+Queues are bounded, so a slow stage holds back the ones before it and memory stays
+flat regardless of input size. Output is identical to the sequential build.
+
+Used by build_pipeline.py (the default mode); --sequential runs the old path.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from build_metrics import METRICS
+from build_pipeline import (
+    HANVIET_FILE,
+    Annotator,
+    iter_records,
+    output_path,
+    translate_texts,
+)
+
+DEFAULT_QUEUE_SIZE = 4  # Batches waiting between two stages
+DEFAULT_ANNOTATION_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_STOP = object()  # End-of-stream marker passed through the queues
+
+# Annotator of the current worker process (set by the pool initializer)
+_worker_annotator = None
+
+
+def _init_annotation_worker(hanviet_file):
+    global _worker_annotator
+    METRICS.reset()  # Forked workers start with a copy of the parent's metrics
+    _worker_annotator = Annotator(hanviet_file)
+    _worker_annotator.hanviet_data  # Load the table once per process
+
+
+def annotate_batch(kind, records):
+    """Build output entries for one batch (runs in a worker process)
+
+    Returns (entries, metrics): the worker's metrics since its last batch, which
+    the parent merges into its own registry.
+    """
+    entries = [_worker_annotator.finish(kind, record) for record in records]
+    return entries, METRICS.drain()
+
+
+@dataclass
+class Batch:
+    spec: object  # DatasetSpec
+    seq: int  # Position of the batch within its dataset
+    records: list
+    entries: list = None
+
+
+class OrderedJsonWriter:
+    """Writes a JSON array incrementally, accepting batches in any order. The array goes to
+    <path>.tmp and replaces path only on close(), so a failed build never leaves a
+    truncated file behind; abort() (or leaving a with block by an exception) removes it"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.temp_path = Path(f"{self.path}.tmp")
+        os.makedirs(self.path.parent, exist_ok=True)
+        self.file = open(self.temp_path, "w", encoding="utf-8")
+        self.pending = {}  # seq -> entries that arrived early
+        self.next_seq = 0
+        self.count = 0
+
+    def add(self, seq, entries):
+        self.pending[seq] = entries
+        while self.next_seq in self.pending:
+            for entry in self.pending.pop(self.next_seq):
+                self._write(entry)
+            self.next_seq += 1
+
+    def _write(self, entry):
+        # Same layout as json.dump(entries, f, ensure_ascii=False, indent=2)
+        text = json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.file.write(("[\n  " if self.count == 0 else ",\n  ") + text)
+        self.count += 1
+
+    def close(self):
+        if self.pending:
+            self.abort()
+            raise RuntimeError(f"{self.path}: batches {sorted(self.pending)} never written")
+        self.file.write("[]" if self.count == 0 else "\n]")
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """Drop everything written so far; path keeps its previous contents"""
+        self.file.close()
+        if self.temp_path.exists():
+            self.temp_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def _take(iterator, size):
+    return list(islice(iterator, size))
+
+
+async def _read_stage(specs, options, out_queue, totals):
+    """Parse the inputs on a thread and emit numbered batches"""
+    for spec in specs:
+        rows = iter_records(spec, options)
+        seq = 0
+        while True:
+            with METRICS.timer("read"):
+                records = await asyncio.to_thread(_take, rows, spec.batch_size)
+            if not records:
+                break
+            METRICS.increment("rows_read", len(records), dataset=spec.name)
+            await out_queue.put(Batch(spec, seq, records))
+            seq += 1
+        totals[spec.name] = seq
+
+
+async def _translate_stage(in_queue, out_queue, provider, cache):
+    while True:
+        batch = await in_queue.get()
+        if batch is _STOP:
+            return
+        spec = batch.spec
+        context = {"dataset": spec.name, "batch": batch.seq}
+        # Steps of one batch are sequential (later steps read earlier results)
+        for step in spec.steps:
+            texts = [r.get(step.source_field, "") for r in batch.records]
+            with METRICS.timer("translate", target=step.target):
+                translations = await translate_texts(
+                    texts, step, provider, cache, spec.batch_size, context
+                )
+            for record, translation in zip(batch.records, translations):
+                record[step.field] = translation
+        await out_queue.put(batch)
+
+
+async def _annotate_stage(in_queue, out_queue, executor):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await in_queue.get()
+        if batch is _STOP:
+            return
+        with METRICS.timer("annotate"):
+            batch.entries, worker_metrics = await loop.run_in_executor(
+                executor, annotate_batch, batch.spec.kind, batch.records
+            )
+        METRICS.merge(worker_metrics)
+        batch.records = None
+        await out_queue.put(batch)
+
+
+async def _sink_stage(in_queue, specs, options, totals):
+    writers = {}
+    finished = {}
+
+    def finish(spec):
+        writer = writers.pop(spec.name, None) or OrderedJsonWriter(output_path(spec, options))
+        writer.close()
+        finished[spec.name] = writer.count
+        METRICS.increment("entries_written", writer.count, dataset=spec.name)
+        print(f"✅ {spec.name}: {writer.count} entries → {writer.path}")
+
+    try:
+        while True:
+            batch = await in_queue.get()
+            if batch is _STOP:
+                break
+            spec = batch.spec
+            if spec.name not in writers:
+                writers[spec.name] = OrderedJsonWriter(output_path(spec, options))
+            writer = writers[spec.name]
+            with METRICS.timer("write"):
+                writer.add(batch.seq, batch.entries)
+            if totals.get(spec.name) == writer.next_seq:
+                finish(spec)
+
+        # Datasets without rows never produced a batch
+        for spec in specs:
+            if spec.name not in finished:
+                finish(spec)
+    except BaseException:
+        # Failed or cancelled: unfinished datasets keep their previous file
+        for writer in writers.values():
+            writer.abort()
+        raise
+    return finished
+
+
+async def _run_workers(workers, out_queue, consumers):
+    """Wait for a stage's workers, then tell each consumer the stream has ended"""
+    await asyncio.gather(*workers)
+    for _ in range(consumers):
+        await out_queue.put(_STOP)
+
+
+async def run_staged_build(
+    specs,
+    provider,
+    cache,
+    options,
+    annotation_workers=DEFAULT_ANNOTATION_WORKERS,
+    translation_workers=None,
+    queue_size=DEFAULT_QUEUE_SIZE,
+):
+    """Build the datasets with overlapping read/translate/annotate/write stages"""
+    translation_workers = translation_workers or max(2, provider.limits.max_concurrency)
+    read_queue = asyncio.Queue(queue_size)
+    translated_queue = asyncio.Queue(queue_size)
+    annotated_queue = asyncio.Queue(queue_size)
+    totals = {}  # dataset -> batch count, known once the reader has finished it
+
+    print(
+        f"🚀 Staged build: {len(specs)} datasets, {translation_workers} translation "
+        f"workers, {annotation_workers} annotation processes, queues of {queue_size}"
+    )
+    start = time.perf_counter()
+    executor = ProcessPoolExecutor(
+        max_workers=annotation_workers,
+        initializer=_init_annotation_worker,
+        initargs=(HANVIET_FILE,),
+    )
+    tasks = []
+    try:
+        reader = asyncio.create_task(_read_stage(specs, options, read_queue, totals))
+        translators = [
+            asyncio.create_task(_translate_stage(read_queue, translated_queue, provider, cache))
+            for _ in range(translation_workers)
+        ]
+        annotators = [
+            asyncio.create_task(_annotate_stage(translated_queue, annotated_queue, executor))
+            for _ in range(annotation_workers)
+        ]
+        sink = asyncio.create_task(_sink_stage(annotated_queue, specs, options, totals))
+        tasks = [reader, *translators, *annotators, sink]
+
+        await asyncio.gather(
+            _run_workers([reader], read_queue, translation_workers),
+            _run_workers(translators, translated_queue, annotation_workers),
+            _run_workers(annotators, annotated_queue, 1),
+            sink,
+        )
+        finished = sink.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let cancelled stages clean up (the sink removes unfinished output files)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(cancel_futures=True)
+        await provider.close()
+
+    print(
+        f"📊 {sum(finished.values())} entries in {time.perf_counter() - start:.1f}s"
+    )
+    return finished
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the translation APIs, for measuring and testing the pipeline
+without network access or API costs.
+Mimics the request/response shapes of:
+  - Google Cloud Translation V3 REST: POST /v3/projects/{project}/locations/{location}:translateText
+  - Google Cloud Translation V2:       GET/POST /language/translate/v2
+  - Microsoft (Bing) Translator V3:   POST /translate?api-version=3.0&from=..&to=..
+
+Latency and errors are configurable (server errors, quota errors, and a "poison"
+substring that makes any batch containing it fail like malformed input).
+Translations are deterministic: Chinese targets echo the text, other targets
+return "[vi] <text>".
+
+Usage:
+    python scripts/stub_translation_server.py --port 8765 --latency 0.2 --error-rate 0.05
+Then point a provider at it:
+    GoogleV3Provider(endpoint="http://127.0.0.1:8765")
+    GoogleV2Provider(api_key="test", endpoint="http://127.0.0.1:8765")
+    BingProvider(api_key="test", endpoint="http://127.0.0.1:8765")
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from translation_providers import StubConfig, fake_translate
+
+V3_PATH = re.compile(r"^/v3/projects/[^/]+/locations/[^/:]+:translateText$")
+V2_PATH = "/language/translate/v2"
+BING_PATH = "/translate"
+
+# Error bodies in each API's own format: api -> outcome -> (status, body)
+ERROR_RESPONSES = {
+    "google": {
+        "error": (500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}}),
+        "quota": (
+            429,
+            {
+                "error": {
+                    "code": 429,
+                    "message": "Quota exceeded for quota metric 'Characters per minute'",
+                    "status": "RESOURCE_EXHAUSTED",
+                }
+            },
+        ),
+        "malformed": (
+            400,
+            {"error": {"code": 400, "message": "Invalid text", "status": "INVALID_ARGUMENT"}},
+        ),
+    },
+    "bing": {
+        "error": (500, {"error": {"code": 500000, "message": "An unexpected error occurred."}}),
+        "quota": (
+            429,
+            {"error": {"code": 429001, "message": "The server rejected the request because the client has exceeded request limits."}},
+        ),
+        "malformed": (400, {"error": {"code": 400000, "message": "One of the request inputs is not valid."}}),
+    },
+}
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    server_version = "StubTranslate/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _run(self, api, texts):
+        """Apply latency and error injection; returns an error tuple or None"""
+        config = self.server.config
+        with self.server.lock:
+            outcome = config.next_outcome(texts)
+        delay = config.delay_for(texts)
+        if delay:
+            time.sleep(delay)
+        if outcome != "ok":
+            return ERROR_RESPONSES[api][outcome]
+        return None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == V2_PATH:
+            query = parse_qs(url.query)
+            return self._handle_v2(query.get("q", []), query.get("target", [""])[0])
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            payload = self._read_json()
+        except ValueError:
+            return self._send_json(*ERROR_RESPONSES["google"]["malformed"])
+
+        if V3_PATH.match(url.path):
+            payload = payload or {}
+            texts = payload.get("contents", [])
+            target = payload.get("targetLanguageCode", "")
+            error = self._run("google", texts)
+            if error:
+                return self._send_json(*error)
+            return self._send_json(
+                200,
+                {"translations": [{"translatedText": fake_translate(t, target)} for t in texts]},
+            )
+
+        if url.path == V2_PATH:
+            payload = payload or {}
+            texts = payload.get("q", query.get("q", []))
+            if isinstance(texts, str):
+                texts = [texts]
+            target = payload.get("target", query.get("target", [""])[0])
+            return self._handle_v2(texts, target)
+
+        if url.path == BING_PATH:
+            texts = [item.get("Text", item.get("text", "")) for item in payload or []]
+            target = query.get("to", [""])[0]
+            error = self._run("bing", texts)
+            if error:
+                return self._send_json(*error)
+            target_code = {"zh-Hans": "zh-CN", "zh-Hant": "zh-TW"}.get(target, target)
+            return self._send_json(
+                200,
+                [
+                    {"translations": [{"text": fake_translate(t, target_code), "to": target}]}
+                    for t in texts
+                ],
+            )
+
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def _handle_v2(self, texts, target):
+        error = self._run("google", texts)
+        if error:
+            return self._send_json(*error)
+        self._send_json(
+            200,
+            {
+                "data": {
+                    "translations": [
+                        {"translatedText": fake_translate(t, target)} for t in texts
+                    ]
+                }
+            },
+        )
+
+
+def start_stub_server(config=None, host="127.0.0.1", port=0, verbose=False):
+    """
+    Start the stand-in server on a background thread.
+    Returns (server, base_url); call server.shutdown() when finished.
+    Use port=0 to pick a free port.
+    """
+    server = ThreadingHTTPServer((host, port), StubTranslationHandler)
+    server.daemon_threads = True
+    server.config = config or StubConfig()
+    server.lock = threading.Lock()
+    server.verbose = verbose
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the Google V2/V3 and Bing translation APIs."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument(
+        "--latency-per-char", type=float, default=0.0, help="Extra seconds per character"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Probability of a 500 response"
+    )
+    parser.add_argument(
+        "--quota-error-rate", type=float, default=0.0, help="Probability of a 429 response"
+    )
+    parser.add_argument(
+        "--poison", default="", help="Batches containing this substring get a 400 response"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        latency_per_char=args.latency_per_char,
+        error_rate=args.error_rate,
+        quota_error_rate=args.quota_error_rate,
+        poison=args.poison,
+        seed=args.seed,
+    )
+    server, base_url = start_stub_server(config, args.host, args.port, args.verbose)
+    print(f"✅ Stub translation server listening on {base_url}")
+    print(f"   Google V3: POST {base_url}/v3/projects/local/locations/global:translateText")
+    print(f"   Google V2: POST {base_url}{V2_PATH}")
+    print(f"   Bing:      POST {base_url}{BING_PATH}?api-version=3.0&to=vi")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopping ({config.calls} requests, {config.chars} characters served)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Synthetic scale corpora for load-testing the pipeline.
+- Learns a profile from the real files in vocabCsv/: headword length and
+  character distributions per kind, the sentence corpus' length distribution,
+  first/last characters and character bigrams, and the (HSK, TOCFL) level
+  pairs, English glosses, word classes and per-character pinyin/Han Viet
+- Writes a directory shaped like vocabCsv/ with every source `scale` times
+  larger: the HSK and TOCFL CSVs, the classifier word lists
+  (<kind>_level<N>_sorted.csv), sentences.csv and a hanviet.csv holding the
+  real table plus (scale - 1) times as many synthetic word entries
+- Files are streamed row by row and seeded (--seed), so the same arguments
+  give the same bytes. Only the classifier word lists are collected before
+  writing (they are sorted and deduplicated), one entry per distinct word, so
+  that part still grows with the scale
+
+Synthetic text is statistically, not linguistically, similar: sentences are
+character bigram chains of realistic length, pinyin uses the numbered syllables
+of hanviet.csv, and glosses are real glosses drawn at random.
+
+--report generates the corpora of every --scales factor (in --work-dir) and
+runs the pipeline stages against them: reading, Han Viet loading and lookups,
+character counting, stub translation, sentence leveling, the example sentence
+index and JSON serialization. Each stage runs in a freshly spawned process and
+reports that process' peak RSS (VmHWM; getrusage's ru_maxrss would carry over
+the parent's high-water mark through exec). Without /proc the peak is the
+tracemalloc peak of the stage, which leaves out interpreter overhead and slows
+the stage down. The table shows seconds, µs per row, peak memory and the
+growth exponent k of time ∝ rows^k between the smallest and largest scale
+(1 = linear). The corpora are generated from --source-dir.
+
+Usage:
+    python scripts/synthetic_corpus.py --scale 10 --output-dir /tmp/synthetic_x10
+    python scripts/synthetic_corpus.py --report --scales 1 10 100
+    python scripts/synthetic_corpus.py --report --scales 1 10 --stages hanviet_lookup level
+"""
+
+import argparse
+import asyncio
+import bisect
+import csv
+import dataclasses
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from build_pipeline import DATASETS, HANVIET_FILE, clean_word_type
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+VOCAB_CSV_DIR = PROJECT_ROOT / "vocabCsv"
+SENTENCES_CSV = VOCAB_CSV_DIR / "sentences.csv"
+MANIFEST_NAME = "synthetic.json"
+
+DEFAULT_SEED = 20240601
+DEFAULT_SCALES = (1, 10)
+LOOKUP_WORDS = 1000  # Fixed lookup count of hanviet_lookup: its cost grows with the table
+VOCAB_KINDS = ("hsk", "tocfl")
+
+
+def is_han(char):
+    return "一" <= char <= "鿿"
+
+
+class Distribution:
+    """Weighted random draws from a Counter (cumulative weights + bisect)"""
+
+    def __init__(self, counts):
+        self.values = list(counts)
+        self.cumulative = []
+        total = 0
+        for value in self.values:
+            total += counts[value]
+            self.cumulative.append(total)
+        self.total = total
+
+    def draw(self, rng):
+        return self.values[bisect.bisect_right(self.cumulative, rng.random() * self.total)]
+
+    def __bool__(self):
+        return bool(self.values)
+
+
+class CorpusProfile:
+    """Distributions of the real vocabulary, sentence corpus and Han Viet table"""
+
+    def __init__(self, source_dir=VOCAB_CSV_DIR):
+        source_dir = Path(source_dir)
+        self.source_dir = source_dir
+        self.vocab_rows = {}  # dataset name -> real row count
+        self.word_lengths = {kind: Counter() for kind in VOCAB_KINDS}
+        self.word_chars = {kind: Counter() for kind in VOCAB_KINDS}
+        glosses = Counter()
+        word_classes = Counter()
+        domains = Counter()
+        for spec in DATASETS.values():
+            path = source_dir / spec.input_file.name
+            if spec.kind not in VOCAB_KINDS or not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.vocab_rows[spec.name] = len(rows)
+            for row in rows:
+                if spec.kind == "hsk":
+                    word = row["Chinese"]
+                    glosses[row["English"]] += 1
+                else:
+                    word = clean_word_type(row["詞彙"])
+                    word_classes[row["詞類"]] += 1
+                    domains[row.get("任務領域", "")] += 1
+                han = [c for c in word if is_han(c)]
+                if han:
+                    self.word_lengths[spec.kind][len(han)] += 1
+                    self.word_chars[spec.kind].update(han)
+
+        with open(Path(source_dir) / SENTENCES_CSV.name, "r", encoding="utf-8") as f:
+            sentences = list(csv.DictReader(f))
+        self.sentence_rows = len(sentences)
+        lengths, first, last, chars, meanings, levels = (Counter() for _ in range(6))
+        bigrams = {}
+        for row in sentences:
+            text = row["Characters"]
+            if len(text) < 2:
+                continue
+            lengths[len(text)] += 1
+            first[text[0]] += 1
+            last[text[-1]] += 1
+            chars.update(text)
+            for a, b in zip(text, text[1:-1]):
+                bigrams.setdefault(a, Counter())[b] += 1
+            meanings[row["Meaning"]] += 1
+            levels[(row["HSK Level"], row["TOCFL Level"])] += 1
+
+        readings = {}
+        pinyin = {}
+        self.hanviet_rows = []
+        with open(Path(source_dir) / HANVIET_FILE.name, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.hanviet_rows.append(row)
+                char = row["char"]
+                reading = row["hanviet"].replace("['", "").replace("']", "").replace("'", "")
+                readings.setdefault(char, reading)
+                if row["pinyin"] and row["pinyin"] != "*":
+                    pinyin.setdefault(char, row["pinyin"])
+        self.readings = readings
+        self.pinyin = pinyin
+
+        self.lengths = {kind: Distribution(c) for kind, c in self.word_lengths.items()}
+        self.chars = {kind: Distribution(c) for kind, c in self.word_chars.items()}
+        # The classifier lists hold simplified words, drawn like the corpus text
+        self.simplified_chars = Distribution(
+            Counter({c: n for c, n in chars.items() if is_han(c)})
+        )
+        self.glosses = Distribution(glosses)
+        self.word_classes = Distribution(word_classes)
+        self.domains = Distribution(domains)
+        self.sentence_lengths = Distribution(lengths)
+        self.first = Distribution(first)
+        self.last = Distribution(last)
+        self.sentence_chars = Distribution(chars)
+        self.bigrams = {char: Distribution(following) for char, following in bigrams.items()}
+        self.meanings = Distribution(meanings)
+        self.levels = Distribution(levels)
+        self.word_hanviet_chars = Distribution(
+            Counter({c: n for c, n in self.word_chars["tocfl"].items() if c in readings})
+        )
+
+    def word(self, rng, kind, chars=None):
+        length = self.lengths[kind].draw(rng)
+        chars = chars or self.chars[kind]
+        return "".join(chars.draw(rng) for _ in range(length))
+
+    def word_pinyin(self, word):
+        return " ".join(self.pinyin.get(char, "") for char in word if is_han(char)).strip()
+
+    def sentence(self, rng):
+        length = self.sentence_lengths.draw(rng)
+        chars = [self.first.draw(rng)]
+        while len(chars) < length - 1:
+            following = self.bigrams.get(chars[-1])
+            chars.append((following or self.sentence_chars).draw(rng))
+        chars.append(self.last.draw(rng))
+        return "".join(chars)
+
+
+def write_vocab(profile, output_dir, scale, rng):
+    """HSK/TOCFL CSVs and classifier word lists; returns {file name: rows}"""
+    counts = {}
+    classifier_words = {kind: {} for kind in VOCAB_KINDS}
+    for name, real_rows in profile.vocab_rows.items():
+        spec = DATASETS[name]
+        path = Path(output_dir) / spec.input_file.name
+        rows = real_rows * scale
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if spec.kind == "hsk":
+                writer.writerow(["No", "Chinese", "Pinyin", "English"])
+            else:
+                writer.writerow(["任務領域", "詞彙", "漢語拼音", "詞類"])
+            for number in range(1, rows + 1):
+                word = profile.word(rng, spec.kind)
+                if spec.kind == "hsk":
+                    writer.writerow(
+                        [number, word, profile.word_pinyin(word), profile.glosses.draw(rng)]
+                    )
+                else:
+                    writer.writerow(
+                        [
+                            profile.domains.draw(rng),
+                            word,
+                            profile.word_pinyin(word),
+                            profile.word_classes.draw(rng),
+                        ]
+                    )
+                simplified = profile.word(rng, spec.kind, profile.simplified_chars)
+                classifier_words[spec.kind].setdefault(simplified, spec.level)
+        counts[path.name] = rows
+
+    for kind, words in classifier_words.items():
+        for level in sorted(set(words.values())):
+            path = Path(output_dir) / f"{kind}_level{level}_sorted.csv"
+            level_words = sorted(
+                (w for w, l in words.items() if l == level), key=lambda w: (-len(w), w)
+            )
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["simplified", "char_count"])
+                writer.writerows([word, len(word)] for word in level_words)
+            counts[path.name] = len(level_words)
+    return counts
+
+
+def write_sentences(profile, output_dir, scale, rng):
+    path = Path(output_dir) / SENTENCES_CSV.name
+    rows = profile.sentence_rows * scale
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Characters", "Pinyin", "Meaning", "HSK Level", "TOCFL Level"])
+        for _ in range(rows):
+            text = profile.sentence(rng)
+            meaning = profile.meanings.draw(rng)
+            hsk_level, tocfl_level = profile.levels.draw(rng)
+            writer.writerow([text, profile.word_pinyin(text), meaning, hsk_level, tocfl_level])
+    return {path.name: rows}
+
+
+def write_hanviet(profile, output_dir, scale, rng):
+    """The real table plus (scale - 1) × its size synthetic multi-character words"""
+    path = Path(output_dir) / HANVIET_FILE.name
+    extra = len(profile.hanviet_rows) * (scale - 1)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["char", "hanviet", "pinyin"])
+        for row in profile.hanviet_rows:
+            writer.writerow([row["char"], row["hanviet"], row["pinyin"]])
+        for _ in range(extra):
+            word = ""
+            while len(word) < 2:
+                word = profile.word(rng, "tocfl", profile.word_hanviet_chars)
+            reading = " ".join(profile.readings[char] for char in word)
+            writer.writerow([word, f"['{reading}']", "*"])
+    return {path.name: len(profile.hanviet_rows) + extra}
+
+
+def generate_corpus(output_dir, scale, seed=DEFAULT_SEED, profile=None):
+    """Write a synthetic vocabCsv/-shaped directory; returns its manifest"""
+    profile = profile or CorpusProfile()
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    files = {}
+    files.update(write_vocab(profile, output_dir, scale, rng))
+    files.update(write_sentences(profile, output_dir, scale, rng))
+    files.update(write_hanviet(profile, output_dir, scale, rng))
+    manifest = {
+        "scale": scale,
+        "seed": seed,
+        "source": str(profile.source_dir.resolve()),
+        "files": files,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    with open(Path(output_dir) / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_manifest(corpus_dir):
+    path = Path(corpus_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Scaling report: pipeline stages over a synthetic corpus ---
+
+
+def corpus_spec(corpus_dir, name):
+    spec = DATASETS[name]
+    return dataclasses.replace(spec, input_file=Path(corpus_dir) / spec.input_file.name)
+
+
+def corpus_vocab_specs(corpus_dir):
+    return [
+        corpus_spec(corpus_dir, spec.name)
+        for spec in DATASETS.values()
+        if spec.kind in VOCAB_KINDS and (Path(corpus_dir) / spec.input_file.name).exists()
+    ]
+
+
+def corpus_records(corpus_dir, name="sentences"):
+    from build_pipeline import BuildOptions, read_records
+
+    return read_records(corpus_spec(corpus_dir, name), BuildOptions())
+
+
+def corpus_words(corpus_dir):
+    from build_pipeline import BuildOptions, read_records
+
+    words = []
+    for spec in corpus_vocab_specs(corpus_dir):
+        field = "simplifiedChinese" if spec.kind == "hsk" else "traditionalChinese"
+        words.extend(record[field] for record in read_records(spec, BuildOptions()))
+    return words
+
+
+def corpus_hanviet(corpus_dir):
+    from add_hanviet_from_csv import load_hanviet_csv
+
+    with redirect_stdout(io.StringIO()):
+        return load_hanviet_csv(Path(corpus_dir) / HANVIET_FILE.name)
+
+
+def stage_read(corpus_dir):
+    start = time.perf_counter()
+    rows = len(corpus_records(corpus_dir)) + len(corpus_words(corpus_dir))
+    return rows, time.perf_counter() - start
+
+
+def stage_hanviet_load(corpus_dir):
+    start = time.perf_counter()
+    data = corpus_hanviet(corpus_dir)
+    return len(data), time.perf_counter() - start
+
+
+def stage_hanviet_lookup(corpus_dir):
+    """A fixed number of word lookups against a table that grows with the scale"""
+    from add_hanviet_from_csv import find_hanviet_reading_with_multiple
+
+    data = corpus_hanviet(corpus_dir)
+    words = corpus_words(corpus_dir)[:LOOKUP_WORDS]
+    start = time.perf_counter()
+    for word in words:
+        find_hanviet_reading_with_multiple({"traditionalChinese": word}, data)
+    return len(data), time.perf_counter() - start
+
+
+def stage_hanviet_sentences(corpus_dir):
+    from add_hanviet_from_csv import get_hanviet_with_preserved_chars
+
+    data = corpus_hanviet(corpus_dir)
+    texts = [record["simplifiedChinese"] for record in corpus_records(corpus_dir)]
+    start = time.perf_counter()
+    for text in texts:
+        get_hanviet_with_preserved_chars(text, data)
+    return len(texts), time.perf_counter() - start
+
+
+def stage_count(corpus_dir):
+    from cjk_text import count_chinese_characters
+
+    words = corpus_words(corpus_dir)
+    start = time.perf_counter()
+    for word in words:
+        count_chinese_characters(word)
+    return len(words), time.perf_counter() - start
+
+
+def stage_translate(corpus_dir):
+    """One translation step of every sentence through the stub and an in-memory cache"""
+    from build_pipeline import SENTENCE_STEPS, translate_texts
+    from translation_cache import TranslationCache
+    from translation_providers import StubProvider
+
+    texts = [record["simplifiedChinese"] for record in corpus_records(corpus_dir)]
+    cache = TranslationCache(":memory:")
+    provider = StubProvider()
+
+    async def translate():
+        try:
+            return await translate_texts(
+                texts, SENTENCE_STEPS[0], provider, cache, 50, {"dataset": "synthetic"}
+            )
+        finally:
+            await provider.close()
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        asyncio.run(translate())
+    elapsed = time.perf_counter() - start
+    cache.close()
+    return len(texts), elapsed
+
+
+def stage_level(corpus_dir):
+    """Index and fully classify the corpus for HSK and TOCFL"""
+    from sentence_leveler import MAX_LEVELS, SentenceLeveler, load_vocab, read_sentences
+
+    _, texts, levels = read_sentences(Path(corpus_dir) / SENTENCES_CSV.name)
+    vocabs = {kind: load_vocab(corpus_dir, kind) for kind in MAX_LEVELS}
+    start = time.perf_counter()
+    leveler = SentenceLeveler(texts, levels, vocabs)
+    for kind in MAX_LEVELS:
+        leveler.classify_all(kind)
+    return len(texts), time.perf_counter() - start
+
+
+def stage_xref(corpus_dir):
+    """Example sentence index of the HSK headwords over the corpus"""
+    from build_lexicon import classifier_words
+    from sentence_xref import AhoCorasick, build_xref, read_corpus_sentences
+
+    sentences = read_corpus_sentences(Path(corpus_dir) / SENTENCES_CSV.name)
+    headwords = list(dict.fromkeys(corpus_words(corpus_dir)))
+    start = time.perf_counter()
+    automaton = AhoCorasick()
+    for index, headword in enumerate(headwords):
+        for word in classifier_words(headword):
+            automaton.add(word, index)
+    build_xref(sentences, automaton.build(), headwords, ["hsk"] * len(headwords))
+    return len(sentences), time.perf_counter() - start
+
+
+def stage_write(corpus_dir):
+    """Serialize the sentence records like write_entries"""
+    from build_pipeline import write_entries
+
+    records = corpus_records(corpus_dir)
+    with tempfile.TemporaryDirectory(prefix="synthetic-") as temp_dir:
+        start = time.perf_counter()
+        write_entries(records, Path(temp_dir) / "sentences.json")
+        elapsed = time.perf_counter() - start
+    return len(records), elapsed
+
+
+STAGES = {
+    "read": stage_read,
+    "hanviet_load": stage_hanviet_load,
+    "hanviet_lookup": stage_hanviet_lookup,
+    "hanviet_sentences": stage_hanviet_sentences,
+    "count": stage_count,
+    "translate": stage_translate,
+    "level": stage_level,
+    "xref": stage_xref,
+    "write": stage_write,
+}
+
+
+def peak_rss_kb():
+    """High-water mark of this process' resident memory (VmHWM), or None without /proc"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run_stage(name, corpus_dir):
+    """{"rows", "seconds", "peak_mb"} of one stage (run in its own process)"""
+    if peak_rss_kb() is not None:
+        rows, seconds = STAGES[name](corpus_dir)
+        return {"rows": rows, "seconds": seconds, "peak_mb": peak_rss_kb() / 1024}
+    tracemalloc.start()
+    try:
+        rows, seconds = STAGES[name](corpus_dir)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"rows": rows, "seconds": seconds, "peak_mb": peak / 1024 / 1024}
+
+
+def measure_stage(name, corpus_dir):
+    # Spawned, not forked, so the child's memory starts from a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_stage, name, str(corpus_dir)).result()
+
+
+def growth_exponent(points):
+    """k of seconds ∝ rows^k between the first and last point"""
+    (rows_a, seconds_a), (rows_b, seconds_b) = points[0], points[-1]
+    if rows_a == rows_b or min(rows_a, rows_b, seconds_a, seconds_b) <= 0:
+        return None
+    return math.log(seconds_b / seconds_a) / math.log(rows_b / rows_a)
+
+
+def scaling_report(scales, work_dir, stages, seed=DEFAULT_SEED, source_dir=VOCAB_CSV_DIR):
+    """{"seed", "scales", "stages": {stage: {"points": [...], "exponent"}}}"""
+    profile = None
+    source = str(Path(source_dir).resolve())
+    corpora = {}
+    for scale in scales:
+        corpus_dir = Path(work_dir) / f"x{scale}"
+        manifest = load_manifest(corpus_dir)
+        if (
+            not manifest
+            or manifest["scale"] != scale
+            or manifest["seed"] != seed
+            or manifest.get("source") != source
+        ):
+            profile = profile or CorpusProfile(source_dir)
+            print(f"🧬 Generating the {scale}× corpus in {corpus_dir}")
+            manifest = generate_corpus(corpus_dir, scale, seed, profile)
+        corpora[scale] = corpus_dir
+
+    report = {"seed": seed, "scales": list(scales), "stages": {}}
+    for stage in stages:
+        points = []
+        for scale in scales:
+            point = {"scale": scale, **measure_stage(stage, corpora[scale])}
+            points.append(point)
+            print(
+                f"   {stage:<18} {scale:>5}×  {point['rows']:>10,} rows  "
+                f"{point['seconds']:>9.3f}s  {point['peak_mb']:>8.1f} MB"
+            )
+        exponent = growth_exponent([(p["rows"], p["seconds"]) for p in points])
+        report["stages"][stage] = {"points": points, "exponent": exponent}
+    return report
+
+
+def print_report(report):
+    print(f"📈 Scaling report (seed {report['seed']})")
+    header = "".join(f"{f'{scale}×':>24}" for scale in report["scales"])
+    print(f"   {'stage':<18}{header}   growth")
+    for stage, result in report["stages"].items():
+        cells = "".join(
+            f"{point['seconds'] * 1e6 / max(point['rows'], 1):>10.2f} µs/row "
+            f"{point['peak_mb']:>6.0f} MB"
+            for point in result["points"]
+        )
+        exponent = result["exponent"]
+        growth = f"n^{exponent:.2f}" if exponent is not None else "-"
+        print(f"   {stage:<18}{cells}   {growth}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic scale corpora and measure how the pipeline scales."
+    )
+    parser.add_argument("--scale", type=int, default=10, help="Size factor (default: 10)")
+    parser.add_argument("--output-dir", help="Directory for the generated corpus")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument(
+        "--source-dir", default=str(VOCAB_CSV_DIR), help="Real corpus (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--report", action="store_true", help="Run the pipeline stages at every --scales"
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SCALES),
+        help="Scales of the report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=list(STAGES),
+        default=list(STAGES),
+        help="Stages of the report (default: all)",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=os.path.join(tempfile.gettempdir(), "randomhanzi-synthetic"),
+        help="Where the report keeps its corpora (default: %(default)s)",
+    )
+    parser.add_argument("--report-file", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if args.report:
+        start = time.perf_counter()
+        report = scaling_report(
+            sorted(set(args.scales)), args.work_dir, args.stages, args.seed, args.source_dir
+        )
+        print_report(report)
+        print(f"⏱️  Report finished in {time.perf_counter() - start:.1f}s")
+        if args.report_file:
+            with open(args.report_file, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"📝 Report → {args.report_file}")
+        return
+
+    if not args.output_dir:
+        parser.error("--output-dir is required to generate a corpus")
+    profile = CorpusProfile(args.source_dir)
+    manifest = generate_corpus(args.output_dir, args.scale, args.seed, profile)
+    for name, rows in manifest["files"].items():
+        print(f"   {name:<32} {rows:>12,} rows")
+    print(f"✅ {args.scale}× corpus → {args.output_dir} in {manifest['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
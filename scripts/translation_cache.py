@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent translation cache shared by the build scripts.
+- SQLite file in the project root (translation_cache.sqlite)
+- One row per (source language, target language, source text)
+- Can be seeded from the JSON files already in mobile/data, so texts that were
+  translated by earlier runs are never paid for twice
+
+Usage:
+    python scripts/translation_cache.py --seed-from-data
+    python scripts/translation_cache.py --stats
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from build_metrics import METRICS
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_CACHE_FILE = PROJECT_ROOT / "translation_cache.sqlite"
+DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+
+SQLITE_MAX_VARIABLES = 900  # Stay below SQLite's bound-parameter limit
+
+# How existing output files map to cached translations:
+# file prefix -> [(source field, source language, target field, target language)]
+SEED_FIELDS = {
+    "hsk_level": [
+        ("simplifiedChinese", "zh-CN", "traditionalChinese", "zh-TW"),
+        ("simplifiedChinese", "zh-CN", "vietnamese", "vi"),
+    ],
+    "tocfl_level": [
+        ("traditionalChinese", "zh-TW", "simplifiedChinese", "zh-CN"),
+        ("traditionalChinese", "zh-TW", "vietnamese", "vi"),
+        ("traditionalChinese", "zh-TW", "english", "en"),
+    ],
+    "sentances": [
+        ("simplifiedChinese", "zh-CN", "traditionalChinese", "zh-TW"),
+        ("traditionalChinese", "zh-TW", "viet", "vi"),
+        ("traditionalChinese", "zh-TW", "english", "en"),
+        ("traditionalChinese", "zh-TW", "writtenCantonese", "yue"),
+    ],
+    "kanji_grade": [("english", "en", "viet", "vi")],
+}
+
+
+class TranslationCache:
+    """Key-value store of translations keyed by language pair and source text"""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, shared=False, read_only=False):
+        self.path = str(path)
+        self.hits = 0
+        self.misses = 0
+        if read_only:
+            # Lookups only (e.g. planning): never create, migrate or write the file
+            uri = f"{Path(self.path).resolve().as_uri()}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, timeout=30)
+            return
+        # Several build workers may share one cache file. WAL needs shared memory,
+        # so a file shared over a network file system uses the rollback journal
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        if self.path != ":memory:":
+            self.conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                provider TEXT,
+                created REAL,
+                PRIMARY KEY (source, target, text)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get_many(self, source, target, texts):
+        """Return {text: translation} for the texts that are cached"""
+        unique = list(dict.fromkeys(texts))
+        found = {}
+        for start in range(0, len(unique), SQLITE_MAX_VARIABLES):
+            chunk = unique[start : start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT text, translation FROM translations "
+                f"WHERE source = ? AND target = ? AND text IN ({placeholders})",
+                [source, target, *chunk],
+            )
+            found.update(rows)
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        METRICS.increment("cache_hits", len(found), target=target)
+        METRICS.increment("cache_misses", len(unique) - len(found), target=target)
+        return found
+
+    def put_many(self, source, target, pairs, provider=None):
+        """Store (text, translation) pairs; empty translations are not cached"""
+        now = time.time()
+        rows = [
+            (source, target, text, translation, provider, now)
+            for text, translation in pairs
+            if text and translation
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self.conn.commit()
+        METRICS.increment("cache_writes", len(rows), target=target)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def counts_by_pair(self):
+        return self.conn.execute(
+            "SELECT source, target, COUNT(*) FROM translations GROUP BY source, target"
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def seed_from_data(cache, data_dir=DATA_DIR):
+    """Fill the cache from the translations already present in mobile/data"""
+    added = 0
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        name = Path(path).stem
+        fields = next(
+            (f for prefix, f in SEED_FIELDS.items() if name.startswith(prefix)), None
+        )
+        if not fields:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for source_field, source, target_field, target in fields:
+            pairs = [
+                (entry.get(source_field, ""), entry.get(target_field, ""))
+                for entry in entries
+            ]
+            cache.put_many(source, target, pairs, provider="seed")
+            added += sum(1 for text, translation in pairs if text and translation)
+        print(f"  🌱 {name}: {len(entries)} entries")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the translation cache.")
+    parser.add_argument(
+        "--cache",
+        default=str(DEFAULT_CACHE_FILE),
+        help="Cache file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed-from-data",
+        action="store_true",
+        help="Add the translations already in mobile/data to the cache",
+    )
+    parser.add_argument("--stats", action="store_true", help="Show cache contents")
+    args = parser.parse_args()
+
+    cache = TranslationCache(args.cache)
+    if args.seed_from_data:
+        print("🌱 Seeding translation cache from mobile/data...")
+        added = seed_from_data(cache)
+        print(f"✅ Seeded {added} translations")
+
+    print(f"📊 {cache.count()} cached translations in {args.cache}")
+    if args.stats:
+        for source, target, count in cache.counts_by_pair():
+            print(f"   {source} → {target}: {count}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Pluggable translation providers with one async batch interface.
+- GoogleV3Provider: Cloud Translation V3 (gRPC client library, or REST when an
+  endpoint is given, e.g. the local stand-in server)
+- GoogleV2Provider: Cloud Translation V2 REST with an API key
+- BingProvider: Microsoft Translator V3 REST
+- StubProvider: in-process fake with configurable latency and error injection
+
+Every provider exposes:
+    await provider.translate_batch(texts, source, target) -> list[str]
+and declares its ProviderLimits (batch size, characters per request, concurrency,
+characters per minute) and ProviderCapabilities (languages, batching).
+Batches larger than a provider's limits are split automatically.
+
+Errors are normalised to TranslationError / QuotaExceededError /
+ProviderAuthError so callers handle every provider the same way.
+
+Language codes used across the scripts: zh-CN, zh-TW, vi, en, yue.
+"""
+
+import asyncio
+import collections
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from build_metrics import METRICS
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+
+class TranslationError(Exception):
+    """A translation request failed"""
+
+    fatal = False
+
+    def __init__(self, message, provider=None, status=None):
+        super().__init__(message)
+        self.provider = provider
+        self.status = status
+
+
+class QuotaExceededError(TranslationError):
+    """The provider rejected the request because a quota or rate limit was hit"""
+
+
+class ProviderAuthError(TranslationError):
+    """Credentials were rejected; every further request will fail too"""
+
+    fatal = True
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    max_batch_items: int = 128  # Texts per request
+    max_batch_chars: int = 5000  # Characters per request
+    max_concurrency: int = 4  # Requests in flight at once
+    chars_per_minute: Optional[int] = None  # Billing/quota limit, None = unlimited
+
+
+@dataclass(frozen=True)
+class ProviderCapabilities:
+    batch: bool = True  # Accepts several texts per request
+    languages: Optional[frozenset] = None  # Supported codes, None = any
+    auto_detect: bool = True  # Source language may be omitted
+
+    def supports(self, source, target):
+        if self.languages is None:
+            return True
+        return target in self.languages and (not source or source in self.languages)
+
+
+class CharacterWindow:
+    """Tracks characters sent in the last `window` seconds (sliding window)"""
+
+    def __init__(self, limit, window=60.0):
+        self.limit = limit
+        self.window = window
+        self._events = collections.deque()
+        self._total = 0
+
+    def _expire(self, now):
+        while self._events and now - self._events[0][0] >= self.window:
+            self._total -= self._events.popleft()[1]
+
+    def used(self, now=None):
+        self._expire(time.monotonic() if now is None else now)
+        return self._total
+
+    def headroom(self, now=None):
+        if self.limit is None:
+            return float("inf")
+        return self.limit - self.used(now)
+
+    def record(self, chars, now=None):
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        self._events.append((now, chars))
+        self._total += chars
+
+    def wait_time(self, chars, now=None):
+        """Seconds until `chars` more characters fit in the window"""
+        if self.limit is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        excess = self._total + chars - self.limit
+        if excess <= 0:
+            return 0.0
+        # A chunk over the limit on its own goes out once the window is empty
+        excess = min(excess, self._total)
+        if excess <= 0:
+            return 0.0
+        freed = 0
+        for timestamp, count in self._events:
+            freed += count
+            if freed >= excess:
+                return max(0.0, timestamp + self.window - now)
+        return self.window
+
+
+def pack_batches(texts, max_items, max_chars):
+    """Split texts into consecutive batches that respect item and character limits"""
+    batches = []
+    current = []
+    current_chars = 0
+    for text in texts:
+        if current and (
+            len(current) >= max_items or current_chars + len(text) > max_chars
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslationProvider:
+    """Base class: chunking, concurrency and rate limiting around _translate_chunk()"""
+
+    name = "provider"
+    limits = ProviderLimits()
+    capabilities = ProviderCapabilities()
+    enforce_rate_limit = True  # Turned off when a scheduler does the accounting
+
+    def __init__(self, limits=None, name=None):
+        if limits is not None:
+            self.limits = limits
+        if name is not None:
+            self.name = name
+        self._semaphore = None
+        self._window_lock = None  # Serialises check-and-reserve on the window
+        self._window = CharacterWindow(self.limits.chars_per_minute)
+
+    def supports(self, source, target):
+        return self.capabilities.supports(source, target)
+
+    async def translate_batch(self, texts, source, target):
+        """Translate texts from source to target, preserving order"""
+        if not texts:
+            return []
+        if not self.supports(source, target):
+            raise TranslationError(
+                f"{self.name} does not support {source} → {target}", self.name
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limits.max_concurrency)
+            self._window_lock = asyncio.Lock()
+
+        max_items = self.limits.max_batch_items if self.capabilities.batch else 1
+        chunks = pack_batches(list(texts), max_items, self.limits.max_batch_chars)
+        results = await asyncio.gather(
+            *(self._run_chunk(chunk, source, target) for chunk in chunks)
+        )
+        return [text for chunk in results for text in chunk]
+
+    async def _run_chunk(self, chunk, source, target):
+        chars = sum(len(t) for t in chunk)
+        labels = {"provider": self.name, "target": target}
+        async with self._semaphore:
+            if self.enforce_rate_limit:
+                await self._reserve(chars)
+            METRICS.increment("requests", **labels)
+            METRICS.increment("chars_sent", chars, **labels)
+            METRICS.increment("texts_sent", len(chunk), **labels)
+            start = time.perf_counter()
+            try:
+                translations = await self._translate_chunk(chunk, source, target)
+            except Exception as e:
+                METRICS.increment("request_errors", error=type(e).__name__, **labels)
+                raise
+            finally:
+                METRICS.observe("request_latency", time.perf_counter() - start, **labels)
+        if len(translations) != len(chunk):
+            raise TranslationError(
+                f"{self.name} returned {len(translations)} translations for {len(chunk)} texts",
+                self.name,
+            )
+        return translations
+
+    async def _reserve(self, chars):
+        """Wait until chars fit in the window and record them before anyone else checks.
+        Waiters queue on the lock, so a chunk that wakes up finds the window as it left it
+        (minus what expired); the loop re-checks anyway"""
+        async with self._window_lock:
+            while True:
+                delay = self._window.wait_time(chars)
+                if not delay:
+                    break
+                METRICS.add_time("rate_limit_wait", delay, provider=self.name)
+                await asyncio.sleep(delay)
+            self._window.record(chars)
+
+    async def _translate_chunk(self, texts, source, target):
+        raise NotImplementedError
+
+    async def close(self):
+        """Release network sessions"""
+
+
+class _HttpProvider(TranslationProvider):
+    """Shared aiohttp session handling and HTTP status → error mapping"""
+
+    def __init__(self, endpoint, limits=None, name=None):
+        super().__init__(limits, name)
+        self.endpoint = endpoint.rstrip("/")
+        self._session = None
+
+    async def _get_session(self):
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+        return self._session
+
+    async def _request_json(self, method, url, **kwargs):
+        session = await self._get_session()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.text()
+                if response.status == 200:
+                    return json.loads(body)
+                raise self._error_for(response.status, body)
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"{self.name}: {e}", self.name) from e
+
+    def _error_for(self, status, body):
+        message = f"{self.name} HTTP {status}: {body[:200]}"
+        if status == 429 or (status == 403 and "limit" in body.lower()):
+            return QuotaExceededError(message, self.name, status)
+        if status in (401, 403):
+            return ProviderAuthError(message, self.name, status)
+        return TranslationError(message, self.name, status)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class GoogleV3Provider(_HttpProvider):
+    """Google Cloud Translation V3 (same API the HSK and sentence scripts use)"""
+
+    name = "google_v3"
+    limits = ProviderLimits(
+        max_batch_items=1024, max_batch_chars=30000, max_concurrency=4
+    )
+
+    def __init__(
+        self,
+        credentials_file=PROJECT_ROOT / "translateKey.json",
+        project_id=None,
+        location="global",
+        endpoint=None,
+        limits=None,
+        name=None,
+    ):
+        super().__init__(endpoint or "", limits, name)
+        self.credentials_file = str(credentials_file)
+        self.project_id = project_id
+        self.location = location
+        self.use_rest = bool(endpoint)
+        self._client = None
+        if self.project_id is None and os.path.exists(self.credentials_file):
+            with open(self.credentials_file, "r") as f:
+                self.project_id = json.load(f).get("project_id")
+        if self.project_id is None:
+            self.project_id = "local"
+
+    @property
+    def parent(self):
+        return f"projects/{self.project_id}/locations/{self.location}"
+
+    def _get_client(self):
+        if self._client is None:
+            from google.cloud import translate_v3 as translate
+            from google.oauth2 import service_account
+
+            credentials = service_account.Credentials.from_service_account_file(
+                self.credentials_file,
+                scopes=["https://www.googleapis.com/auth/cloud-translation"],
+            )
+            self._client = translate.TranslationServiceClient(credentials=credentials)
+        return self._client
+
+    def _translate_grpc(self, texts, source, target):
+        from google.api_core import exceptions as google_exceptions
+
+        try:
+            response = self._get_client().translate_text(
+                request={
+                    "parent": self.parent,
+                    "contents": texts,
+                    "mime_type": "text/plain",
+                    "source_language_code": source,
+                    "target_language_code": target,
+                }
+            )
+        except google_exceptions.ResourceExhausted as e:
+            raise QuotaExceededError(str(e), self.name, 429) from e
+        except (
+            google_exceptions.PermissionDenied,
+            google_exceptions.Unauthenticated,
+        ) as e:
+            raise ProviderAuthError(str(e), self.name, 403) from e
+        except Exception as e:
+            raise TranslationError(str(e), self.name) from e
+        return [trans.translated_text for trans in response.translations]
+
+    async def _translate_chunk(self, texts, source, target):
+        if not self.use_rest:
+            return await asyncio.to_thread(self._translate_grpc, texts, source, target)
+
+        result = await self._request_json(
+            "POST",
+            f"{self.endpoint}/v3/{self.parent}:translateText",
+            json={
+                "contents": texts,
+                "mimeType": "text/plain",
+                "sourceLanguageCode": source,
+                "targetLanguageCode": target,
+            },
+        )
+        return [t["translatedText"] for t in result.get("translations", [])]
+
+
+class GoogleV2Provider(_HttpProvider):
+    """Google Cloud Translation V2 REST (used by the kanji script)"""
+
+    name = "google_v2"
+    limits = ProviderLimits(max_batch_items=128, max_batch_chars=5000, max_concurrency=4)
+
+    def __init__(
+        self,
+        api_key=None,
+        endpoint="https://translation.googleapis.com",
+        limits=None,
+        name=None,
+    ):
+        super().__init__(endpoint, limits, name)
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+
+    async def _translate_chunk(self, texts, source, target):
+        payload = {"q": texts, "target": target, "format": "text"}
+        if source:
+            payload["source"] = source
+        result = await self._request_json(
+            "POST",
+            f"{self.endpoint}/language/translate/v2",
+            params={"key": self.api_key or ""},
+            json=payload,
+        )
+        return [t["translatedText"] for t in result["data"]["translations"]]
+
+
+class BingProvider(_HttpProvider):
+    """Microsoft (Bing) Translator V3 REST"""
+
+    name = "bing"
+    limits = ProviderLimits(
+        max_batch_items=1000, max_batch_chars=50000, max_concurrency=4
+    )
+    capabilities = ProviderCapabilities(
+        languages=frozenset({"zh-CN", "zh-TW", "vi", "en", "yue"})
+    )
+
+    # Repo language codes -> Microsoft Translator codes
+    LANGUAGE_CODES = {"zh-CN": "zh-Hans", "zh-TW": "zh-Hant"}
+
+    def __init__(
+        self,
+        api_key=None,
+        region=None,
+        endpoint="https://api.cognitive.microsofttranslator.com",
+        limits=None,
+        name=None,
+    ):
+        super().__init__(endpoint, limits, name)
+        self.api_key = (
+            api_key
+            or os.getenv("MICROSOFT_TRANSLATOR_API_KEY")
+            or os.getenv("BING_TRANSLATE_KEY")
+        )
+        self.region = region or os.getenv("BING_TRANSLATOR_REGION", "canadaeast")
+
+    async def _translate_chunk(self, texts, source, target):
+        params = {"api-version": "3.0", "to": self.LANGUAGE_CODES.get(target, target)}
+        if source:
+            params["from"] = self.LANGUAGE_CODES.get(source, source)
+        result = await self._request_json(
+            "POST",
+            f"{self.endpoint}/translate",
+            params=params,
+            headers={
+                "Ocp-Apim-Subscription-Key": self.api_key or "",
+                "Ocp-Apim-Subscription-Region": self.region,
+                "Content-Type": "application/json",
+            },
+            json=[{"text": text} for text in texts],
+        )
+        return [item["translations"][0]["text"] for item in result]
+
+
+def fake_translate(text, target):
+    """Deterministic stand-in translation (Chinese targets echo the text back)"""
+    if target.startswith("zh") or target == "yue":
+        return text
+    return f"[{target}] {text}"
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0  # Seconds per request
+    latency_per_char: float = 0.0  # Extra seconds per character sent
+    error_rate: float = 0.0  # Probability a request fails with a server error
+    quota_error_rate: float = 0.0  # Probability a request fails with a quota error
+    poison: str = ""  # Any batch containing this substring fails (malformed input)
+    seed: Optional[int] = None
+    calls: int = field(default=0, compare=False)
+    chars: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def next_outcome(self, texts):
+        """Decide what happens to a request: 'ok', 'error', 'quota' or 'malformed'"""
+        self.calls += 1
+        self.chars += sum(len(t) for t in texts)
+        if self.poison and any(self.poison in t for t in texts):
+            return "malformed"
+        roll = self._random.random()
+        if roll < self.quota_error_rate:
+            return "quota"
+        if roll < self.quota_error_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+    def delay_for(self, texts):
+        return self.latency + self.latency_per_char * sum(len(t) for t in texts)
+
+
+class StubProvider(TranslationProvider):
+    """In-process provider for tests and throughput measurements (no network)"""
+
+    name = "stub"
+    limits = ProviderLimits(max_batch_items=1024, max_batch_chars=30000, max_concurrency=8)
+
+    def __init__(self, config=None, limits=None, name=None):
+        super().__init__(limits, name)
+        self.config = config or StubConfig()
+
+    async def _translate_chunk(self, texts, source, target):
+        outcome = self.config.next_outcome(texts)
+        delay = self.config.delay_for(texts)
+        if delay:
+            await asyncio.sleep(delay)
+        if outcome == "quota":
+            raise QuotaExceededError(f"{self.name}: quota exceeded", self.name, 429)
+        if outcome == "error":
+            raise TranslationError(f"{self.name}: injected server error", self.name, 500)
+        if outcome == "malformed":
+            raise TranslationError(f"{self.name}: malformed input", self.name, 400)
+        return [fake_translate(text, target) for text in texts]
+
+
+PROVIDER_TYPES = {
+    "google_v3": GoogleV3Provider,
+    "google_v2": GoogleV2Provider,
+    "bing": BingProvider,
+    "stub": StubProvider,
+}
+
+
+def make_provider(config):
+    """
+    Build a provider from a dict, e.g.
+        {"type": "google_v3", "credentials_file": "translateKey.json"}
+        {"type": "bing", "api_key": "...", "region": "canadaeast", "chars_per_minute": 33000}
+        {"type": "stub", "latency": 0.2, "error_rate": 0.05}
+    Limit fields (max_batch_items, max_batch_chars, max_concurrency,
+    chars_per_minute) override the provider defaults.
+    """
+    config = dict(config)
+    provider_type = config.pop("type")
+    cls = PROVIDER_TYPES[provider_type]
+
+    limit_names = ("max_batch_items", "max_batch_chars", "max_concurrency", "chars_per_minute")
+    overrides = {k: config.pop(k) for k in limit_names if k in config}
+    limits = None
+    if overrides:
+        base = cls.limits
+        limits = ProviderLimits(
+            **{k: overrides.get(k, getattr(base, k)) for k in limit_names}
+        )
+
+    if provider_type == "stub":
+        stub_fields = ("latency", "latency_per_char", "error_rate", "quota_error_rate", "poison", "seed")
+        stub_config = StubConfig(**{k: config.pop(k) for k in stub_fields if k in config})
+        return StubProvider(stub_config, limits=limits, name=config.get("name"))
+
+    if "credentials_file" in config and not os.path.isabs(config["credentials_file"]):
+        config["credentials_file"] = PROJECT_ROOT / config["credentials_file"]
+    return cls(limits=limits, **config)
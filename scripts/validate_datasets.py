@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Validate every built dataset (mobile/data/*.json) against its source in vocabCsv/.
+- Source rows and output entries are hash-joined on stable keys instead of being
+  compared by position, so an inserted or deleted row is reported once as
+  missing/extra rather than shifting every following row:
+    hsk: simplified + pinyin     tocfl: traditional + pinyin
+    kanji: kanji                 sentences: simplified text
+  (repeated keys are numbered in order, so duplicates still pair up)
+- Checks every field copied from the source (ids, Chinese, pinyin, English,
+  readings, sentence levels) and the derived characterCount
+- Counts empty translations and missing Jyutping/Han Viet per field; rates above
+  --max-empty-rate are reported as warnings
+- Datasets are validated in parallel processes
+- Incremental: validation_state.json keeps each file's size, mtime and SHA-256
+  with the dataset's result. A rerun re-validates only the datasets whose source
+  or output content changed; an untouched dataset costs two stat() calls, so the
+  validator can run from an editor save or a commit hook. Changing the validator
+  (this file or build_pipeline.py) discards the state.
+
+The app's sentences are a subset of the corpus (the build's --tocfl-level
+filter), so only the source sentences with a TOCFL level present in the output
+are expected. Datasets that were never built (no output file) are skipped.
+
+Usage:
+    python scripts/validate_datasets.py
+    python scripts/validate_datasets.py hsk tocfl1 --report validation_report.json
+    python scripts/validate_datasets.py --no-state
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_pipeline import (
+    DATASET_GROUPS,
+    DATASETS,
+    BuildOptions,
+    iter_records,
+    resolve_datasets,
+)
+from cjk_text import count_chinese_characters
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MOBILE_DATA_DIR = PROJECT_ROOT / "mobile" / "data"
+DEFAULT_STATE_FILE = PROJECT_ROOT / "validation_state.json"
+
+REPORT_VERSION = 1
+STATE_VERSION = 2
+# Sources whose changes can change a validation result
+VALIDATOR_FILES = (Path(__file__), SCRIPT_DIR / "build_pipeline.py", SCRIPT_DIR / "cjk_text.py")
+DEFAULT_MAX_EMPTY_RATE = 0.05
+
+# Join key fields per dataset kind
+KEY_FIELDS = {
+    "hsk": ("simplifiedChinese", "pinyin"),
+    "tocfl": ("traditionalChinese", "pinyin"),
+    "kanji": ("kanji",),
+    "sentences": ("simplifiedChinese",),
+}
+# Source fields that must reach the output unchanged (besides the key)
+COPIED_FIELDS = {
+    "hsk": ("id", "english"),
+    "tocfl": ("id",),
+    "kanji": ("onyomi", "kunyomi", "english"),
+    "sentences": ("pinyin", "hsk_level", "tocfl_level"),
+}
+# Locally annotated fields that should not be empty
+ANNOTATION_FIELDS = {
+    "hsk": ("jyutping", "hanviet"),
+    "tocfl": ("jyutping", "hanviet"),
+    "kanji": ("hanviet",),
+    "sentences": ("jyutping", "hanviet", "cantoneseJyutping"),
+}
+# Text characterCount is derived from
+COUNT_SOURCE = {"hsk": "simplifiedChinese", "tocfl": "traditionalChinese"}
+
+
+def normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def keyed(rows, key_fields):
+    """{(key..., occurrence): row}; the nth row with the same key gets occurrence n"""
+    result = {}
+    seen = {}
+    for row in rows:
+        key = tuple(normalize(row.get(field, "")) for field in key_fields)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        result[key + (occurrence,)] = row
+    return result
+
+
+def key_label(key):
+    """Readable key: 班 bān (#2 for the second occurrence)"""
+    label = " ".join(str(part) for part in key[:-1])
+    return label if key[-1] == 0 else f"{label} #{key[-1] + 1}"
+
+
+def expected_rows(spec, entries):
+    rows = list(iter_records(spec, BuildOptions()))
+    if spec.kind == "sentences":
+        levels = {str(entry.get("tocfl_level", "")) for entry in entries}
+        rows = [row for row in rows if row["tocfl_level"] in levels]
+    return rows
+
+
+def file_fingerprint(path, previous=None):
+    """{"size", "mtime", "sha256"}; the file is only hashed when its stat changed"""
+    stat = os.stat(path)
+    if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime_ns:
+        return previous
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": digest}
+
+
+def validator_fingerprint():
+    digest = hashlib.sha256()
+    for path in VALIDATOR_FILES:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def load_state(path=DEFAULT_STATE_FILE):
+    """Previous validation state, or an empty one when missing or outdated"""
+    fingerprint = validator_fingerprint()
+    empty = {"version": STATE_VERSION, "validator": fingerprint, "datasets": {}}
+    if not Path(path).exists():
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if state.get("version") != STATE_VERSION or state.get("validator") != fingerprint:
+        return empty
+    return state
+
+
+def save_state(state, path=DEFAULT_STATE_FILE):
+    temp_path = Path(path).with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def compare_entry(kind, source, entry):
+    """[(field, source value, output value)] for the fields that differ"""
+    issues = []
+    for field in COPIED_FIELDS[kind]:
+        if normalize(source.get(field)) != normalize(entry.get(field)):
+            issues.append((field, source.get(field), entry.get(field)))
+    if kind in COUNT_SOURCE:
+        expected = count_chinese_characters(entry.get(COUNT_SOURCE[kind], ""))
+        if entry.get("characterCount") != expected:
+            issues.append(("characterCount", expected, entry.get("characterCount")))
+    return issues
+
+
+def empty_counts(spec, entries):
+    fields = [step.field for step in spec.steps] + list(ANNOTATION_FIELDS[spec.kind])
+    return {
+        field: sum(1 for entry in entries if not str(entry.get(field, "")).strip())
+        for field in dict.fromkeys(fields)
+    }
+
+
+def empty_warnings(empty, total, max_empty_rate):
+    return [
+        f"{field} empty in {count / total:.1%} of entries"
+        for field, count in empty.items()
+        if total and count / total > max_empty_rate
+    ]
+
+
+def dataset_files(name, data_dir):
+    spec = DATASETS[name]
+    return spec.input_file, Path(data_dir) / spec.output_file.name
+
+
+def validate_dataset(name, data_dir=MOBILE_DATA_DIR, max_empty_rate=DEFAULT_MAX_EMPTY_RATE):
+    """(result, state) of one dataset, both JSON-serializable dicts"""
+    spec = DATASETS[name]
+    source_file, output = dataset_files(name, data_dir)
+    if not output.exists() or not source_file.exists():
+        return {"dataset": name, "skipped": True}, None
+    with open(output, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    key_fields = KEY_FIELDS[spec.kind]
+    source = keyed(expected_rows(spec, entries), key_fields)
+    built = keyed(entries, key_fields)
+
+    # Comparing the fields is cheaper than any per-entry digest would be
+    mismatches = []
+    for key in source.keys() & built.keys():
+        for field, expected, actual in compare_entry(spec.kind, source[key], built[key]):
+            mismatches.append(
+                {"key": key_label(key), "field": field, "source": expected, "output": actual}
+            )
+    mismatches.sort(key=lambda m: (m["key"], m["field"]))
+
+    empty = empty_counts(spec, entries)
+    missing = sorted(key_label(k) for k in source.keys() - built.keys())
+    extra = sorted(key_label(k) for k in built.keys() - source.keys())
+    result = {
+        "dataset": name,
+        "skipped": False,
+        "cached": False,
+        "source": len(source),
+        "output": len(entries),
+        "matched": len(source.keys() & built.keys()),
+        "missing": missing,
+        "extra": extra,
+        "mismatches": mismatches,
+        "empty": empty,
+        "warnings": empty_warnings(empty, len(entries), max_empty_rate),
+        "ok": not (missing or extra or mismatches),
+    }
+    return result, {"result": result}
+
+
+def cached_result(name, data_dir, max_empty_rate, previous):
+    """(earlier result, file fingerprints); the result is None when a file changed"""
+    source_file, output = dataset_files(name, data_dir)
+    if not output.exists() or not source_file.exists():
+        return {"dataset": name, "skipped": True}, None
+    previous = previous or {}
+    files = {
+        "source": file_fingerprint(source_file, previous.get("source")),
+        "output": file_fingerprint(output, previous.get("output")),
+    }
+    unchanged = "result" in previous and all(
+        files[side]["sha256"] == previous[side]["sha256"] for side in files
+    )
+    if not unchanged:
+        return None, files
+    result = dict(previous["result"], cached=True)
+    result["warnings"] = empty_warnings(result["empty"], result["output"], max_empty_rate)
+    return result, files
+
+
+def validate_all(
+    names,
+    data_dir=MOBILE_DATA_DIR,
+    max_empty_rate=DEFAULT_MAX_EMPTY_RATE,
+    workers=None,
+    state=None,
+):
+    """{dataset: result}, validating the datasets in parallel
+
+    With a state (see load_state), datasets whose source and output files are
+    unchanged reuse their earlier result, and state is updated in place for
+    save_state().
+    """
+    datasets = state["datasets"] if state is not None else {}
+    results = {}
+    fingerprints = {}
+    for name in names:
+        if state is None:
+            results[name] = None
+            continue
+        results[name], fingerprints[name] = cached_result(
+            name, data_dir, max_empty_rate, datasets.get(name)
+        )
+    stale = [name for name, result in results.items() if result is None]
+
+    if workers == 1 or len(stale) <= 1:
+        validated = [validate_dataset(name, data_dir, max_empty_rate) for name in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            validated = list(
+                executor.map(
+                    validate_dataset,
+                    stale,
+                    [data_dir] * len(stale),
+                    [max_empty_rate] * len(stale),
+                )
+            )
+
+    for name, (result, dataset_state) in zip(stale, validated):
+        results[name] = result
+        if state is not None and dataset_state is not None:
+            datasets[name] = {**fingerprints[name], **dataset_state}
+    if state is not None:
+        for name, result in results.items():
+            if result["skipped"]:
+                datasets.pop(name, None)
+            elif result["cached"]:
+                datasets[name].update(fingerprints[name])  # Refresh the mtimes
+    return results
+
+
+def print_result(result, limit=5):
+    name = result["dataset"]
+    if result["skipped"]:
+        print(f"⏭️  {name}: not built")
+        return
+    status = "✅" if result["ok"] else "❌"
+    checked = "unchanged" if result.get("cached") else "checked"
+    print(
+        f"{status} {name}: {result['matched']}/{result['source']} matched, "
+        f"{len(result['missing'])} missing, {len(result['extra'])} extra, "
+        f"{len(result['mismatches'])} mismatched fields ({checked})"
+    )
+    for label, keys in (("missing", result["missing"]), ("extra", result["extra"])):
+        for key in keys[:limit]:
+            print(f"   {label}: {key}")
+    for mismatch in result["mismatches"][:limit]:
+        print(
+            f"   {mismatch['key']}: {mismatch['field']} "
+            f"'{mismatch['source']}' != '{mismatch['output']}'"
+        )
+    for warning in result["warnings"]:
+        print(f"   ⚠️  {warning}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate the built datasets against their sources."
+    )
+    parser.add_argument(
+        "datasets",
+        nargs="*",
+        default=["all"],
+        help=f"Datasets or groups (default: all). Groups: {', '.join(DATASET_GROUPS)}",
+    )
+    parser.add_argument(
+        "--data-dir", default=str(MOBILE_DATA_DIR), help="Built data (default: %(default)s)"
+    )
+    parser.add_argument("--report", help="Write the full JSON report to this file")
+    parser.add_argument(
+        "--max-empty-rate",
+        type=float,
+        default=DEFAULT_MAX_EMPTY_RATE,
+        help="Warn when a field is empty in more entries than this (default: %(default)s)",
+    )
+    parser.add_argument("--workers", type=int, help="Parallel processes (default: CPU count)")
+    parser.add_argument(
+        "--state",
+        default=str(DEFAULT_STATE_FILE),
+        help="Incremental validation state (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-state", action="store_true", help="Validate everything and leave the state alone"
+    )
+    args = parser.parse_args()
+
+    names = [spec.name for spec in resolve_datasets(args.datasets)]
+    start = time.perf_counter()
+    state = None if args.no_state else load_state(args.state)
+    results = validate_all(names, args.data_dir, args.max_empty_rate, args.workers, state)
+    if state is not None:
+        save_state(state, args.state)
+    elapsed = time.perf_counter() - start
+    for result in results.values():
+        print_result(result)
+
+    failed = [name for name, result in results.items() if not result.get("ok", True)]
+    print(f"⏱️  Validated {len(results)} datasets in {elapsed:.2f}s")
+    if args.report:
+        report = {
+            "version": REPORT_VERSION,
+            "elapsed": round(elapsed, 3),
+            "ok": not failed,
+            "datasets": results,
+        }
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 Report → {args.report}")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
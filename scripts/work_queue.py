@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed job queue for building the datasets with several worker processes.
+- enqueue: reads the source CSVs and stores one job per batch of rows
+- worker: claims jobs under a lease, translates and annotates them, and commits
+  the finished entries; any number of workers can share the queue file
+- merge: assembles mobile/data/*.json from the finished jobs in source order
+- status: progress per dataset
+
+Leases make workers safe to kill: a worker renews the lease of the job it is
+working on with a heartbeat, and a job whose lease runs out goes back to the
+queue. Completing a job only succeeds while the worker still holds the lease, so
+a job is committed exactly once even if two workers end up processing it.
+Jobs that keep failing are marked failed after MAX_ATTEMPTS and reported by merge.
+
+Workers on several machines can share the queue through a network file system
+that supports SQLite locking, but only with --shared on every command: WAL mode
+(the default, for workers on one machine) keeps its index in shared memory, which
+does not work across machines, so --shared uses the rollback journal instead.
+Each worker uses its own translation cache unless --cache points at a shared one,
+which --shared opens the same way.
+
+Usage:
+    python scripts/work_queue.py enqueue tocfl sentences
+    python scripts/work_queue.py worker --concurrency 2     # start several of these
+    python scripts/work_queue.py status
+    python scripts/work_queue.py merge
+    python scripts/work_queue.py --queue /mnt/build/queue.sqlite --shared worker
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+
+from batch_splitter import FatalTranslationError
+from build_metrics import print_summary, run_report
+from build_pipeline import (
+    DATASETS,
+    DEFAULT_POOL_FILE,
+    Annotator,
+    BuildOptions,
+    iter_records,
+    make_build_provider,
+    output_path,
+    resolve_datasets,
+    translate_texts,
+)
+from staged_pipeline import OrderedJsonWriter
+from translation_cache import TranslationCache, DEFAULT_CACHE_FILE
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_QUEUE_FILE = PROJECT_ROOT / "build_queue.sqlite"
+
+DEFAULT_LEASE = 120.0  # Seconds a claimed job stays reserved without a heartbeat
+MAX_ATTEMPTS = 3  # Claims of one job before it is marked failed
+IDLE_POLL = 2.0  # Seconds between claims while other workers hold the last jobs
+
+
+class WorkQueue:
+    """Batch jobs in a SQLite file shared by all workers"""
+
+    def __init__(self, path=DEFAULT_QUEUE_FILE, shared=False):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        # WAL relies on shared memory and fails on network file systems
+        self.conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS datasets (
+                name TEXT PRIMARY KEY,
+                output_file TEXT NOT NULL,
+                batches INTEGER NOT NULL,
+                rows INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                dataset TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                updated REAL,
+                UNIQUE (dataset, seq)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+            """
+        )
+
+    def enqueue(self, spec, options):
+        """Store the dataset's rows as batch jobs; returns (jobs, rows)"""
+        path = output_path(spec, options)
+        rows = iter_records(spec, options)
+        seq = 0
+        total = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-enqueueing starts the dataset over
+            self.conn.execute("DELETE FROM jobs WHERE dataset = ?", (spec.name,))
+            while True:
+                records = list(islice(rows, spec.batch_size))
+                if not records:
+                    break
+                self.conn.execute(
+                    "INSERT INTO jobs (dataset, seq, payload, updated) VALUES (?, ?, ?, ?)",
+                    (spec.name, seq, json.dumps(records, ensure_ascii=False), time.time()),
+                )
+                seq += 1
+                total += len(records)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)",
+                (spec.name, str(path), seq, total),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return seq, total
+
+    def claim(self, owner, lease=DEFAULT_LEASE):
+        """Reserve the next pending (or abandoned) job; returns (id, dataset, seq, records)"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT id, dataset, seq, payload, attempts FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            job_id, dataset, seq, payload, attempts = row
+            if attempts >= MAX_ATTEMPTS:
+                # Abandoned too often (e.g. the worker keeps crashing on it)
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                    ("lease expired too many times", now, job_id),
+                )
+                self.conn.execute("COMMIT")
+                return self.claim(owner, lease)
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated = ?
+                WHERE id = ?
+                """,
+                (owner, now + lease, now, job_id),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return job_id, dataset, seq, json.loads(payload)
+
+    def heartbeat(self, job_id, owner, lease=DEFAULT_LEASE):
+        """Extend the lease; False if the job is no longer held by this owner"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + lease, job_id, owner),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, owner, entries):
+        """Commit a job's entries; False (and nothing written) if the lease was lost"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (json.dumps(entries, ensure_ascii=False), time.time(), job_id, owner),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, owner, error):
+        """Return the job to the queue, or mark it failed after MAX_ATTEMPTS"""
+        self.conn.execute(
+            """
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                lease_owner = NULL, lease_expires = NULL, error = ?, updated = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'leased'
+            """,
+            (MAX_ATTEMPTS, str(error), time.time(), job_id, owner),
+        )
+
+    def remaining(self):
+        """Jobs that are pending or leased"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def status(self):
+        """{dataset: {"batches", "rows", "output", status: count}}"""
+        report = {}
+        for name, output_file, batches, rows in self.conn.execute(
+            "SELECT name, output_file, batches, rows FROM datasets ORDER BY rowid"
+        ):
+            report[name] = {"batches": batches, "rows": rows, "output": output_file}
+        for dataset, status, count in self.conn.execute(
+            "SELECT dataset, status, COUNT(*) FROM jobs GROUP BY dataset, status"
+        ):
+            report.setdefault(dataset, {})[status] = count
+        return report
+
+    def merge(self, dataset):
+        """Write a dataset's entries in source order; False if jobs are unfinished"""
+        row = self.conn.execute(
+            "SELECT output_file, batches FROM datasets WHERE name = ?", (dataset,)
+        ).fetchone()
+        if row is None:
+            return False
+        output_file, batches = row
+        done = self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE dataset = ? AND status = 'done'", (dataset,)
+        ).fetchone()[0]
+        if done != batches:
+            return False
+
+        with OrderedJsonWriter(output_file) as writer:
+            for seq, result in self.conn.execute(
+                "SELECT seq, result FROM jobs WHERE dataset = ? ORDER BY seq", (dataset,)
+            ):
+                writer.add(seq, json.loads(result))
+        return writer.count
+
+    def close(self):
+        self.conn.close()
+
+
+# --- Worker ---
+
+
+async def process_job(dataset, records, provider, cache, annotator):
+    """Translate and annotate one batch of records (same steps as the build)"""
+    spec = DATASETS[dataset]
+    for step in spec.steps:
+        texts = [r.get(step.source_field, "") for r in records]
+        translations = await translate_texts(
+            texts, step, provider, cache, spec.batch_size, {"dataset": dataset}
+        )
+        for record, translation in zip(records, translations):
+            record[step.field] = translation
+    return [annotator.finish(spec.kind, record) for record in records]
+
+
+async def _keep_lease(queue, job_id, owner, lease):
+    while True:
+        await asyncio.sleep(lease / 3)
+        if not queue.heartbeat(job_id, owner, lease):
+            print(f"  ⚠️  Lost the lease on job {job_id}")
+            return
+
+
+async def _work(queue, provider, cache, annotator, owner, lease, wait, counts):
+    while True:
+        job = queue.claim(owner, lease)
+        if job is None:
+            if wait and queue.remaining():
+                # Other workers still hold jobs; pick them up if their leases expire
+                await asyncio.sleep(IDLE_POLL)
+                continue
+            return
+        job_id, dataset, seq, records = job
+        heartbeat = asyncio.create_task(_keep_lease(queue, job_id, owner, lease))
+        try:
+            entries = await process_job(dataset, records, provider, cache, annotator)
+        except FatalTranslationError:
+            queue.fail(job_id, owner, "fatal translation error")
+            raise
+        except Exception as e:
+            print(f"  ❌ Job {dataset}#{seq} failed: {e}")
+            queue.fail(job_id, owner, e)
+            counts["failed"] += 1
+            continue
+        finally:
+            heartbeat.cancel()
+
+        if queue.complete(job_id, owner, entries):
+            counts["done"] += 1
+            print(f"  ✅ {dataset}#{seq}: {len(entries)} entries")
+        else:
+            counts["lost"] += 1
+            print(f"  ⚠️  {dataset}#{seq} was taken over by another worker, result dropped")
+
+
+async def run_worker(
+    queue, provider, cache, owner, lease=DEFAULT_LEASE, concurrency=1, wait=True
+):
+    """Process jobs until the queue is empty; returns counts of done/failed/lost jobs"""
+    annotator = Annotator()
+    counts = {"done": 0, "failed": 0, "lost": 0}
+    try:
+        await asyncio.gather(
+            *(
+                _work(queue, provider, cache, annotator, owner, lease, wait, counts)
+                for _ in range(concurrency)
+            )
+        )
+    finally:
+        await provider.close()
+    return counts
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# --- CLI ---
+
+
+def print_status(queue):
+    report = queue.status()
+    if not report:
+        print("📭 Queue is empty")
+        return
+    print(f"📊 Build queue {queue.path}:")
+    for name, info in report.items():
+        states = ", ".join(
+            f"{info[s]} {s}" for s in ("done", "leased", "pending", "failed") if info.get(s)
+        )
+        print(f"   {name:<10} {info.get('rows', 0):>6} rows in {info.get('batches', 0):>4} batches: {states}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker dataset build queue.")
+    parser.add_argument(
+        "--queue",
+        default=str(DEFAULT_QUEUE_FILE),
+        help="Queue file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--shared",
+        action="store_true",
+        help="Queue (and cache) on a network file system: use the rollback journal, not WAL",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add batch jobs for datasets")
+    enqueue.add_argument("datasets", nargs="+", help="Datasets or groups (as build_pipeline.py)")
+    enqueue.add_argument("--tocfl-level", type=int, help="Only sentences of this TOCFL level")
+    enqueue.add_argument("--max-rows", type=int, help="Only the first N matching sentences")
+    enqueue.add_argument("--output-dir", help="Merge into this directory instead of mobile/data")
+
+    worker = commands.add_parser("worker", help="Process jobs until the queue is drained")
+    worker.add_argument("--owner", default=default_owner(), help="Lease owner name")
+    worker.add_argument("--concurrency", type=int, default=1, help="Jobs processed at once")
+    worker.add_argument(
+        "--lease", type=float, default=DEFAULT_LEASE, help="Lease length in seconds"
+    )
+    worker.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Exit when nothing is claimable instead of waiting for other workers",
+    )
+    worker.add_argument(
+        "--cache",
+        default=str(DEFAULT_CACHE_FILE),
+        help="Translation cache file (default: %(default)s)",
+    )
+    worker.add_argument(
+        "--pool",
+        default=str(DEFAULT_POOL_FILE),
+        help="Credential pool file (default: %(default)s)",
+    )
+    worker.add_argument(
+        "--stub", action="store_true", help="Use the in-process stub translator (no network)"
+    )
+    worker.add_argument("--stub-latency", type=float, default=0.0, help="Seconds per stub request")
+
+    merge = commands.add_parser("merge", help="Write the JSON files of finished datasets")
+    merge.add_argument("datasets", nargs="*", help="Datasets to merge (default: all)")
+
+    commands.add_parser("status", help="Show progress per dataset")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue, shared=args.shared)
+    try:
+        if args.command == "enqueue":
+            options = BuildOptions(
+                tocfl_level=args.tocfl_level,
+                max_rows=args.max_rows,
+                output_dir=Path(args.output_dir) if args.output_dir else None,
+            )
+            for spec in resolve_datasets(args.datasets):
+                jobs, rows = queue.enqueue(spec, options)
+                print(f"📥 {spec.name}: {rows} rows in {jobs} jobs")
+
+        elif args.command == "worker":
+            cache = TranslationCache(args.cache, shared=args.shared)
+            print(f"👷 Worker {args.owner} on {args.queue}")
+            start = time.perf_counter()
+            try:
+                counts = asyncio.run(
+                    run_worker(
+                        queue,
+                        make_build_provider(args),
+                        cache,
+                        args.owner,
+                        lease=args.lease,
+                        concurrency=args.concurrency,
+                        wait=not args.no_wait,
+                    )
+                )
+            except FatalTranslationError as e:
+                print(f"❌ Translation API Exception: {e}")
+                print(f"🛑 Stopping worker due to error")
+                exit(1)
+            finally:
+                cache.close()
+            print(
+                f"🎉 {counts['done']} jobs done, {counts['failed']} failed, "
+                f"{counts['lost']} lost in {time.perf_counter() - start:.1f}s"
+            )
+            print_summary(run_report(wall=time.perf_counter() - start))
+
+        elif args.command == "merge":
+            report = queue.status()
+            names = args.datasets or list(report)
+            incomplete = False
+            for name in names:
+                count = queue.merge(name)
+                if count is False:
+                    info = report.get(name, {})
+                    print(
+                        f"⚠️  {name}: not finished ({info.get('done', 0)}/"
+                        f"{info.get('batches', 0)} jobs done, {info.get('failed', 0)} failed)"
+                    )
+                    incomplete = True
+                else:
+                    print(f"✅ {name}: {count} entries → {report[name]['output']}")
+            if incomplete:
+                exit(1)
+
+        else:
+            print_status(queue)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()